@@ -3,14 +3,16 @@ import json
 import yfinance as yf
 import pandas as pd
 
-from typing import List
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
 from app.services.data_provider import get_stock_data
 from app.core.features import generate_features
-from app.services.trainer import load_model, compare_models
+from app.services.trainer import load_model, compare_model, compare_models
+from app.services.executors import run_io, run_cpu
+from app.services.streaming import stream_batch
 
 router = APIRouter()
 
@@ -19,8 +21,13 @@ class PredictionRequest(BaseModel):
     data: List[str]
 
 
+def _read_report(json_path: str) -> dict:
+    with open(json_path, "r") as f:
+        return json.load(f)
+
+
 @router.get("/metrics/{ticker}")
-def get_metrics(ticker: str):
+async def get_metrics(ticker: str):
     base = "metrics"
     json_path = os.path.join(base, f"{ticker.upper()}_report.json")
     img_path = os.path.join(base, f"{ticker.upper()}_confusion_matrix.png")
@@ -28,8 +35,7 @@ def get_metrics(ticker: str):
     if not os.path.exists(json_path) or not os.path.exists(img_path):
         raise HTTPException(status_code=404, detail="Metrics not found for this ticker")
 
-    with open(json_path, "r") as f:
-        report = json.load(f)
+    report = await run_io(_read_report, json_path)
 
     return {
         "classification_report": report,
@@ -38,7 +44,7 @@ def get_metrics(ticker: str):
 
 
 @router.get("/metrics/{ticker}/image")
-def get_confusion_image(ticker: str):
+async def get_confusion_image(ticker: str):
     path = os.path.join("metrics", f"{ticker.upper()}_confusion_matrix.png")
     if not os.path.exists(path):
         raise HTTPException(status_code=404, detail="Image not found")
@@ -46,14 +52,25 @@ def get_confusion_image(ticker: str):
 
 
 @router.post("/compare")
-def compare_models_endpoint(tickers: List[str]):
-    return compare_models(tickers)
+async def compare_models_endpoint(
+    tickers: List[str],
+    stream: Optional[str] = Query(None, pattern="^(ndjson|sse)$", description="Stream results as ndjson or sse"),
+):
+    if stream:
+        async def compare_one(ticker: str):
+            result = await run_cpu(compare_model, ticker)
+            if "error" in result:
+                raise ValueError(result["error"])
+            return result
+
+        return stream_batch(tickers, compare_one, stream)
+    return await run_cpu(compare_models, tickers)
 
 
 @router.get("/latest-price/{ticker}")
-def get_latest_price(ticker: str):
+async def get_latest_price(ticker: str):
     stock = yf.Ticker(ticker.upper())
-    df = stock.history(period="1d", interval="1m")
+    df = await run_io(stock.history, period="1d", interval="1m")
 
     if df.empty:
         raise HTTPException(status_code=404, detail="No data available for this ticker.")
@@ -1,15 +1,16 @@
 from fastapi import APIRouter, HTTPException
 import yfinance as yf
+from app.services.executors import run_io
 
 router = APIRouter()
 
 @router.get("/latest-price/{ticker}")
-def get_latest_price(ticker: str):
+async def get_latest_price(ticker: str):
     """
     Fetch the most recent price data for a given ticker symbol.
     """
     stock = yf.Ticker(ticker.upper())
-    df = stock.history(period="1d", interval="1m")
+    df = await run_io(stock.history, period="1d", interval="1m")
 
     if df.empty:
         raise HTTPException(status_code=404, detail="No data available for this ticker.")
@@ -1,11 +1,21 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
 from app.services.data_provider import get_stock_data
-from app.core.optimizer import run_optimization
 from app.core.features import generate_features
-from app.services.trainer import load_model
-from app.core.version import API_VERSION, MODEL_VERSION
-import numpy as np
+from app.services.trainer import load_engine, get_model_version, ModelNotFoundError
+from app.services.job_queue import enqueue
+from app.api.routes.train_routes import accepted
+from app.services.predictor import generate_prediction_async
+from app.services.executors import run_io, run_cpu
+from app.services.batch_executor import run_batch
+from app.services.streaming import stream_batch
+from app.config.serving_config import (
+    BATCH_MAX_CONCURRENCY, BATCH_ITEM_TIMEOUT_S, BATCH_TOTAL_TIMEOUT_S, TRAINING_RETRY_AFTER_S
+)
+from app.services.signal_store import get_signal_store, is_completed_bar
+from app.core.version import API_VERSION, MODEL_VERSION, CORE_MODULE
 import logging
 
 router = APIRouter()
@@ -19,15 +29,18 @@ class PredictionRequest(BaseModel):
 
 class BatchPredictionRequest(BaseModel):
     tickers: list[str]
+    max_concurrency: int = Field(BATCH_MAX_CONCURRENCY, ge=1, le=64)
+    item_timeout: float = Field(BATCH_ITEM_TIMEOUT_S, gt=0)
+    total_timeout: float = Field(BATCH_TOTAL_TIMEOUT_S, gt=0)
 
 
 @router.get("/status")
-def status():
+async def status():
     return {"status": "LATTICE online", "trust": "Stable", "version": API_VERSION}
 
 
 @router.get("/version")
-def version():
+async def version():
     return {
         "api_version": API_VERSION,
         "model_version": MODEL_VERSION,
@@ -35,29 +48,83 @@ def version():
     }
 
 
-# === Prediction: GET (Shortcut) ===
-@router.get("/predict/{ticker}")
-def get_prediction(ticker: str):
+async def _queue_training(ticker: str) -> dict:
+    """Queue a baseline training job for a ticker with no model (deduplicated)."""
+    job, _ = await run_io(enqueue, "train", ticker)
+    return job
+
+
+def _model_unavailable(ticker: str, job: dict) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"No trained model for {ticker.upper()}; training job {job['id']} queued",
+        headers={"Retry-After": str(TRAINING_RETRY_AFTER_S)},
+    )
+
+
+# === History ===
+# Declared before /predict/{ticker}, which would otherwise capture "history" as a ticker
+@router.get("/predict/history")
+async def predict_history(
+    ticker: str,
+    start: Optional[str] = Query(None, alias="from", description="First bar date (YYYY-MM-DD), inclusive"),
+    end: Optional[str] = Query(None, alias="to", description="Last bar date (YYYY-MM-DD), inclusive"),
+    limit: int = Query(10, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    model_version: Optional[str] = None,
+):
+    """Signals previously emitted for `ticker`, newest first, read from the append-only signal log."""
+    try:
+        history, next_cursor = await run_io(
+            get_signal_store().history, ticker, start, end, limit, cursor, model_version
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {
+        "ticker": ticker.upper(),
+        "count": len(history),
+        "history": history,
+        "next_cursor": next_cursor,
+    }
+
+
+def _model_version_or_none(ticker: str):
     try:
-        df = get_stock_data(ticker)
-        X, _ = generate_features(df, ticker=ticker)
-        model = load_model(ticker)
+        return get_model_version(ticker)
+    except OSError:
+        return None
 
-        preds = model.predict(X)
-        probas = model.predict_proba(X)[:, 1]
-        latest_signal = preds[-1]
-        confidence = float(np.round(probas[-1] * 100, 2))
-        directive = "BUY" if latest_signal == 1 else "HOLD"
 
-        return {
-            "ticker": ticker.upper(),
-            "directive": directive,
-            "signal": int(latest_signal),
-            "trust_index": f"{confidence}%",
-            "confidence_raw": float(probas[-1]),
-            "explanation": "N/A"
-        }
+# === Prediction: GET (Shortcut) ===
+@router.get("/predict/{ticker}")
+async def get_prediction(ticker: str):
+    try:
+        # Daily bars change once per session: serve the precomputed signal when it is current
+        # Store open, stat and lookup are blocking (SQLite, store lock): keep them off the event loop
+        store = await run_io(get_signal_store)
+        model_version = await run_io(_model_version_or_none, ticker)
+
+        if model_version is not None:
+            cached = await run_io(store.get_fresh, ticker, model_version=model_version)
+            if cached is not None:
+                return {**cached, "source": "eod_table"}
+
+        prediction = await generate_prediction_async(ticker)
+        # A partial intraday bar is served but not stored, or it would pass as the session's signal
+        if is_completed_bar(prediction["date"]):
+            await run_io(store.upsert, prediction)
+        return {**prediction, "source": "live"}
 
+    except HTTPException:
+        raise
+    except ModelNotFoundError:
+        # Never train inside a request: queue it and serve the last known signal if there is one
+        job = await _queue_training(ticker)
+        store = await run_io(get_signal_store)
+        stale = await run_io(store.latest, ticker)
+        if stale is not None:
+            return {**stale[0], "source": "stale", "training_job": job["id"]}
+        raise _model_unavailable(ticker, job)
     except Exception as e:
         logger.error(f"[!] Failed GET prediction for {ticker}: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction failed for {ticker}")
@@ -65,66 +132,38 @@ def get_prediction(ticker: str):
 
 # === Prediction: POST ===
 @router.post("/predict")
-def predict(request: PredictionRequest):
-    return get_prediction(request.ticker)
+async def predict(request: PredictionRequest):
+    return await get_prediction(request.ticker)
 
 
 # === Batch Prediction ===
 @router.post("/predict/batch")
-def batch_predict(request: BatchPredictionRequest):
-    results = {}
-    for ticker in request.tickers:
-        try:
-            prediction = get_prediction(ticker)
-            results[ticker.upper()] = prediction
-        except Exception as e:
-            results[ticker.upper()] = {"error": str(e)}
-    return results
-
-
-# === History ===
-@router.get("/predict/history")
-def predict_history(ticker: str, limit: int = Query(10, ge=1, le=100)):
-    try:
-        df = get_stock_data(ticker)
-        X, _ = generate_features(df, ticker=ticker)
-        model = load_model(ticker)
-
-        preds = model.predict(X)
-        probas = model.predict_proba(X)[:, 1]
-        dates = df.index[-len(preds):]
-
-        history = [
-            {
-                "timestamp": str(dates[i]),
-                "signal": int(preds[i]),
-                "trust_index": f"{round(probas[i] * 100, 2)}%"
-            }
-            for i in range(-limit, 0)
-        ]
-
-        return {
-            "ticker": ticker.upper(),
-            "count": len(history),
-            "history": history[::-1]
-        }
+async def batch_predict(
+    request: BatchPredictionRequest,
+    stream: Optional[str] = Query(None, pattern="^(ndjson|sse)$", description="Stream results as ndjson or sse"),
+):
+    """Score tickers concurrently; slow or failing symbols are reported per ticker, not awaited forever."""
+    limits = {
+        "max_concurrency": request.max_concurrency,
+        "item_timeout": request.item_timeout,
+        "total_timeout": request.total_timeout,
+    }
+    if stream:
+        return stream_batch(request.tickers, get_prediction, stream, **limits)
+    return await run_batch(request.tickers, get_prediction, **limits)
 
-    except Exception as e:
-        logger.error(f"[!] History error for {ticker}: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/predict/{ticker}")
-def get_latest_prediction(ticker: str):
+async def get_latest_prediction(ticker: str):
     try:
-        df = get_stock_data(ticker)
+        df = await run_io(get_stock_data, ticker)
         if df is None or df.empty:
             raise HTTPException(status_code=404, detail=f"No data found for {ticker}")
 
-        model = load_model(ticker)
-        X, _ = generate_features(df, ticker=ticker)
+        engine = await run_cpu(load_engine, ticker)
+        X, _ = await run_cpu(generate_features, df, ticker=ticker)
 
-        preds = model.predict(X)
-        probas = model.predict_proba(X)[:, 1]
+        preds, probas = await run_cpu(engine.predict, X)
 
         latest_date = df.index[-1]
         latest_prediction = int(preds[-1])
@@ -139,31 +178,23 @@ def get_latest_prediction(ticker: str):
 
     except HTTPException:
         raise
+    except ModelNotFoundError:
+        raise _model_unavailable(ticker, await _queue_training(ticker))
     except Exception as e:
         logger.exception(f"[!] Prediction error for {ticker}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
 # === Train / Retrain ===
+# Optimization runs for minutes, so it is queued to the training workers;
+# poll GET /jobs/{job_id} for progress.
 @router.post("/train")
-def train(request: PredictionRequest):
-    try:
-        run_optimization(ticker=request.ticker, n_trials=50)
-        return {"status": "Model trained successfully"}
-    except Exception as e:
-        logger.error(f"[!] Training error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+async def train(request: PredictionRequest):
+    job, created = await run_io(enqueue, "optimize", request.ticker, {"n_trials": 50})
+    return accepted(job, created)
 
 
 @router.post("/retrain")
-def retrain(request: PredictionRequest):
-    try:
-        run_optimization(ticker=request.ticker, n_trials=100)
-        return {"status": "Model retrained with deeper optimization"}
-    except Exception as e:
-        logger.error(f"[!] Retraining error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-
-
+async def retrain(request: PredictionRequest):
+    job, created = await run_io(enqueue, "optimize", request.ticker, {"n_trials": 100})
+    return accepted(job, created)
@@ -0,0 +1,35 @@
+from typing import Optional
+from fastapi import APIRouter, Query
+from pydantic import BaseModel, Field
+from app.services.scanner import scan
+from app.services.executors import run_cpu
+from app.config.serving_config import SCAN_LATENCY_TARGET_MS
+
+router = APIRouter()
+
+
+class ScanRequest(BaseModel):
+    tickers: Optional[list[str]] = None
+    top: Optional[int] = Field(None, ge=1)
+    buy_only: bool = True
+    explain: bool = True
+    latency_target_ms: float = Field(SCAN_LATENCY_TARGET_MS, gt=0)
+
+
+@router.get("/scan")
+async def scan_universe(
+    top: Optional[int] = Query(None, ge=1),
+    buy_only: bool = True,
+    explain: bool = True,
+):
+    """Scan the configured SCAN_UNIVERSE and return ranked signals with stage timings."""
+    return await run_cpu(scan, None, top=top, buy_only=buy_only, explain=explain)
+
+
+@router.post("/scan")
+async def scan_tickers(request: ScanRequest):
+    """Scan the given tickers (or SCAN_UNIVERSE) and return ranked signals with stage timings."""
+    return await run_cpu(
+        scan, request.tickers, top=request.top, buy_only=request.buy_only,
+        latency_target_ms=request.latency_target_ms, explain=request.explain,
+    )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.services.model_cache import model_cache
+from app.services.inference_scheduler import inference_scheduler
+from app.services.executors import executor_stats
+from app.services.warmup import readiness
+from app.services.admission import admission_stats
+
+router = APIRouter()
+
+
+@router.get("/status/models")
+def model_cache_status():
+    """Model cache counters: hits, loads, evictions and load latency."""
+    return model_cache.stats()
+
+
+@router.get("/status/inference")
+def inference_status():
+    """Micro-batching counters: batches flushed, rows scored and average batch size."""
+    return {**inference_scheduler.stats(), "executors": executor_stats()}
+
+
+@router.get("/status/admission")
+def admission_status():
+    """Per cost class: limits, in-flight and queued requests, admissions and rejections."""
+    return admission_stats()
+
+
+@router.get("/ready")
+def ready():
+    """Readiness probe: 503 until the startup warm start has finished."""
+    state = readiness()
+    return state if state["ready"] else JSONResponse(status_code=503, content=state)
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from app.services.signal_store import get_signal_store
+from app.services.summary_aggregator import get_summary_aggregator
+
+router = APIRouter()
+
+
+@router.get("/api/summary")
+def get_summary():
+    """Watchlist aggregate: active signals, volatility regimes and signal freshness."""
+    aggregator = get_summary_aggregator()
+    aggregator.sync(get_signal_store())
+    return aggregator.snapshot()
@@ -1,30 +1,54 @@
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
 from fastapi.responses import JSONResponse
-from app.services.trainer import train_model, retrain_model
+from app.services.job_queue import enqueue, get_job, list_jobs
 from app.services.predictor import require_token
+from app.services.executors import run_io
+from app.config.serving_config import TRAINING_RETRY_AFTER_S
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def accepted(job: dict, created: bool) -> JSONResponse:
+    """202 for a queued (or already queued) job; every route that queues training answers with it."""
+    return JSONResponse(
+        status_code=202,
+        headers={"Retry-After": str(TRAINING_RETRY_AFTER_S)},
+        content={
+            "job_id": job["id"],
+            "status": job["status"],
+            "deduplicated": not created,
+            "status_url": f"/jobs/{job['id']}",
+        },
+    )
+
+
 @router.post("/train/{ticker}")
-def train(ticker: str, _=Depends(require_token)):
-    """Train a new model with default trial count."""
-    try:
-        train_model(ticker=ticker, n_trials=50)
-        return JSONResponse({"status": f"Model trained for {ticker.upper()}"})
-    except Exception as e:
-        logger.error(f"[!] Train error for {ticker}: {e}")
-        raise HTTPException(status_code=500, detail="Training failed")
+async def train(ticker: str, _=Depends(require_token)):
+    """Queue training with the default trial count."""
+    job, created = await run_io(enqueue, "optimize", ticker, {"n_trials": 50})
+    return accepted(job, created)
 
 
 @router.post("/retrain/{ticker}")
-def retrain(ticker: str, _=Depends(require_token)):
-    """Retrain a model with deeper search."""
-    try:
-        retrain_model(ticker=ticker, n_trials=100)
-        return JSONResponse({"status": f"Model retrained (deep) for {ticker.upper()}"})
-    except Exception as e:
-        logger.error(f"[!] Retrain error for {ticker}: {e}")
-        raise HTTPException(status_code=500, detail="Retraining failed")
+async def retrain(ticker: str, _=Depends(require_token)):
+    """Queue a retrain with deeper search."""
+    job, created = await run_io(enqueue, "optimize", ticker, {"n_trials": 100})
+    return accepted(job, created)
+
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Status, progress and result of a training job."""
+    job = await run_io(get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job '{job_id}'")
+    return job
+
+
+@router.get("/jobs")
+async def jobs(ticker: Optional[str] = None, limit: int = Query(20, ge=1, le=200)):
+    """Most recent training jobs, optionally for one ticker."""
+    return await run_io(list_jobs, ticker, limit)
@@ -0,0 +1,93 @@
+# app/config/serving_config.py
+
+import os
+from dotenv import load_dotenv
+from app.config.feature_config import parse_bool
+
+# Load .env file if present
+load_dotenv()
+
+# Model cache bounds (process-wide, see app/services/model_cache.py)
+MODEL_CACHE_MAX_ENTRIES = int(os.getenv("MODEL_CACHE_MAX_ENTRIES", 64))
+MODEL_CACHE_MAX_BYTES = int(os.getenv("MODEL_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Micro-batching of concurrent scoring requests (see app/services/inference_scheduler.py)
+INFERENCE_BATCHING = parse_bool(os.getenv("INFERENCE_BATCHING"), True)
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", 2.0))
+INFERENCE_BATCH_MAX_SIZE = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", 64))
+
+# End-of-day signal table (see app/services/signal_store.py and app/services/signal_job.py)
+WATCHLIST = [t.strip().upper() for t in os.getenv("WATCHLIST", "AAPL,MSFT,GOOG,TSLA").split(",") if t.strip()]
+SIGNAL_DB_PATH = os.getenv(
+    "SIGNAL_DB_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "signals.db")
+)
+MARKET_TIMEZONE = os.getenv("MARKET_TIMEZONE", "America/New_York")
+MARKET_CLOSE = os.getenv("MARKET_CLOSE", "16:00")
+EOD_GRACE_MINUTES = int(os.getenv("EOD_GRACE_MINUTES", 20))
+
+# Executors for async handlers (see app/services/executors.py)
+IO_THREADS = int(os.getenv("IO_THREADS", 32))
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", os.cpu_count() or 2))
+
+# Batch prediction fan-out (see app/services/batch_executor.py)
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", 8))
+BATCH_ITEM_TIMEOUT_S = float(os.getenv("BATCH_ITEM_TIMEOUT_S", 15))
+BATCH_TOTAL_TIMEOUT_S = float(os.getenv("BATCH_TOTAL_TIMEOUT_S", 30))
+
+# Background training jobs (see app/services/job_queue.py)
+JOBS_DB_PATH = os.getenv(
+    "JOBS_DB_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), "jobs.db")
+)
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", 1))
+TRAINING_RETRY_AFTER_S = int(os.getenv("TRAINING_RETRY_AFTER_S", 60))
+
+# Model artifacts (see app/core/inference/native_artifact.py). Serving prefers the
+# native booster + schema sidecar; the joblib pickle is kept for tooling that
+# wants the sklearn wrapper unless MODEL_SAVE_PICKLE is turned off.
+MODEL_SAVE_NATIVE = parse_bool(os.getenv("MODEL_SAVE_NATIVE"), True)
+MODEL_SAVE_PICKLE = parse_bool(os.getenv("MODEL_SAVE_PICKLE"), True)
+
+# Warm start (see app/services/warmup.py): models loaded and compiled in the
+# background at startup; /ready answers 503 until this finishes.
+PRELOAD_MODELS = parse_bool(os.getenv("PRELOAD_MODELS"), True)
+PRELOAD_TICKERS = [
+    t.strip().upper() for t in os.getenv("PRELOAD_TICKERS", ",".join(WATCHLIST)).split(",") if t.strip()
+]
+
+# Universe scanner (see app/services/scanner.py)
+SCAN_UNIVERSE = [t.strip().upper() for t in os.getenv("SCAN_UNIVERSE", ",".join(WATCHLIST)).split(",") if t.strip()]
+SCAN_HISTORY_START = os.getenv("SCAN_HISTORY_START", "2020-01-01")
+SCAN_DOWNLOAD_CHUNK = int(os.getenv("SCAN_DOWNLOAD_CHUNK", 100))
+SCAN_THREADS = int(os.getenv("SCAN_THREADS", 16))
+SCAN_LATENCY_TARGET_MS = float(os.getenv("SCAN_LATENCY_TARGET_MS", 5000))
+
+# Per-prediction explanations (see app/services/explainer_service.py)
+EXPLAIN_TOP_K = int(os.getenv("EXPLAIN_TOP_K", 5))
+EXPLAIN_CACHE_SIZE = int(os.getenv("EXPLAIN_CACHE_SIZE", 4096))
+
+# Admission control for expensive routes (see app/services/admission.py). Each
+# cost class runs at most CONCURRENCY requests, lets QUEUE more wait up to
+# WAIT_S seconds, and rejects the rest at once with 429 (queue full) or 503
+# (waited too long), both with Retry-After. Cheap routes are never limited.
+ADMISSION_ENABLED = parse_bool(os.getenv("ADMISSION_ENABLED"), True)
+ADMISSION_CLASSES = {
+    name: {
+        "concurrency": int(os.getenv(f"ADMISSION_{name.upper()}_CONCURRENCY", concurrency)),
+        "queue": int(os.getenv(f"ADMISSION_{name.upper()}_QUEUE", queue)),
+        "wait_s": float(os.getenv(f"ADMISSION_{name.upper()}_WAIT_S", wait_s)),
+    }
+    for name, concurrency, queue, wait_s in (
+        ("heavy", 1, 2, 10.0),      # /compare: downloads full history, builds features and scores every bar per ticker
+        ("batch", 2, 4, 5.0),       # /predict/batch, /scan: fan out over many tickers
+        ("training", 4, 16, 2.0),   # /train, /retrain: enqueue only, but bursts hit the job DB
+    )
+}
+
+# Production server (see gunicorn.conf.py). Models are preloaded in the master
+# and shared copy-on-write by the forked workers; the master watches the model
+# directory and gracefully reloads workers when artifacts change.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", min(4, os.cpu_count() or 1)))
+WEB_BIND = os.getenv("WEB_BIND", "0.0.0.0:8000")
+WEB_TIMEOUT_S = int(os.getenv("WEB_TIMEOUT_S", 120))
+WEB_GRACEFUL_TIMEOUT_S = int(os.getenv("WEB_GRACEFUL_TIMEOUT_S", 60))
+MODEL_WATCH_INTERVAL_S = float(os.getenv("MODEL_WATCH_INTERVAL_S", 30))
@@ -0,0 +1,27 @@
+import os
+from dotenv import load_dotenv
+
+# Load .env file if present
+load_dotenv()
+
+
+def _cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+CPU_CORES = int(os.getenv("CPU_CORES", _cores()))
+
+# Threads per call for each workload class (see app/core/thread_budget.py).
+# Serving defaults assume many concurrent requests per process (CPU_WORKERS
+# threads, WEB_CONCURRENCY processes), so a single call gets one thread.
+# Training defaults split the cores between the training workers and the
+# trial processes each of them runs (OPTUNA_PARALLEL_TRIALS).
+THREADS_INFERENCE = int(os.getenv("THREADS_INFERENCE", 1))
+THREADS_BATCH = int(os.getenv("THREADS_BATCH", max(1, CPU_CORES // 4)))
+THREADS_TRAINING = int(os.getenv(
+    "THREADS_TRAINING",
+    max(1, CPU_CORES // max(1, int(os.getenv("TRAINING_WORKERS", 1)) * int(os.getenv("OPTUNA_PARALLEL_TRIALS", 1)))),
+))
@@ -1,15 +1,67 @@
 import os
 import time
 from datetime import datetime
-from app.model.train import train_model
+from dotenv import load_dotenv
+from app.config.feature_config import parse_bool
 
-# Basic retraining scheduler (manual or future cron-compatible)
+# Load .env file if present
+load_dotenv()
+
+# Post-training compaction (see app/core/compaction.py)
+COMPACTION_ENABLED = parse_bool(os.getenv("COMPACTION_ENABLED"), True)
+COMPACTION_F1_TOLERANCE = float(os.getenv("COMPACTION_F1_TOLERANCE", 0.005))
+COMPACTION_MIN_TREES = int(os.getenv("COMPACTION_MIN_TREES", 20))
+COMPACTION_DISTILL = parse_bool(os.getenv("COMPACTION_DISTILL"), False)
+COMPACTION_LATENCY_ROUNDS = int(os.getenv("COMPACTION_LATENCY_ROUNDS", 200))
+
+# Shared fitting routine (see app/core/fitting.py): histogram trees and
+# early stopping on the chronological tail of the training rows
+TRAIN_TREE_METHOD = os.getenv("TRAIN_TREE_METHOD", "hist")
+TRAIN_MAX_BIN = int(os.getenv("TRAIN_MAX_BIN", 128))
+EARLY_STOPPING_ROUNDS = int(os.getenv("EARLY_STOPPING_ROUNDS", 30))
+EARLY_STOPPING_FRACTION = float(os.getenv("EARLY_STOPPING_FRACTION", 0.15))
+EARLY_STOPPING_MIN_ROWS = int(os.getenv("EARLY_STOPPING_MIN_ROWS", 20))
+
+# Incremental refresh (see app/services/incremental.py): continue boosting
+# the served model on new bars; retrain fully on schedule or when the F1 on
+# bars it had not seen drops below the last full training's
+INCREMENTAL_ROUNDS = int(os.getenv("INCREMENTAL_ROUNDS", 10))
+INCREMENTAL_LEARNING_RATE = float(os.getenv("INCREMENTAL_LEARNING_RATE", 0.02))
+INCREMENTAL_MIN_ROWS = int(os.getenv("INCREMENTAL_MIN_ROWS", 20))
+INCREMENTAL_MIN_EVAL_ROWS = int(os.getenv("INCREMENTAL_MIN_EVAL_ROWS", 40))
+INCREMENTAL_F1_TOLERANCE = float(os.getenv("INCREMENTAL_F1_TOLERANCE", 0.05))
+INCREMENTAL_MAX_TREES = int(os.getenv("INCREMENTAL_MAX_TREES", 1000))
+FULL_RETRAIN_DAYS = float(os.getenv("FULL_RETRAIN_DAYS", 7))
+# Trials of the Optuna job queued when a tuned model needs a full retrain (as /retrain)
+FULL_RETRAIN_TRIALS = int(os.getenv("FULL_RETRAIN_TRIALS", 100))
+
+# Optuna study storage (see app/core/study_storage.py): "sqlite", "journal"
+# (for workers on several machines sharing OPTUNA_STORAGE_DIR) or an RDB URL
+OPTUNA_STORAGE = os.getenv("OPTUNA_STORAGE", "sqlite")
+OPTUNA_STORAGE_DIR = os.getenv(
+    "OPTUNA_STORAGE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "core", "optuna")
+)
+# Processes running trials of one study on this machine
+OPTUNA_PARALLEL_TRIALS = int(os.getenv("OPTUNA_PARALLEL_TRIALS", 1))
+OPTUNA_HEARTBEAT_S = int(os.getenv("OPTUNA_HEARTBEAT_S", 60))
+# Pruner stopping trials after a poor fold: "hyperband", "sha" (successive halving), "median" or "none"
+OPTUNA_PRUNER = os.getenv("OPTUNA_PRUNER", "hyperband")
+# Grow n_estimators with the fold's training window, so early (pruning) folds are cheap
+OPTUNA_TREE_FIDELITY = parse_bool(os.getenv("OPTUNA_TREE_FIDELITY"), True)
+OPTUNA_CV_SPLITS = int(os.getenv("OPTUNA_CV_SPLITS", 5))
+# Journal storage has no heartbeat: RUNNING trials older than this are re-run on resume
+OPTUNA_STALE_TRIAL_S = float(os.getenv("OPTUNA_STALE_TRIAL_S", 6 * 3600))
+
+# Basic retraining scheduler (manual or future cron-compatible): an
+# incremental refresh per run, full retrains only when refresh_model asks
 
 def auto_retrain(ticker: str, interval_hours: int = 24):
+    from app.services.incremental import refresh_model
+
     while True:
-        print(f"[{datetime.now().isoformat()}] Retraining model for: {ticker}")
+        print(f"[{datetime.now().isoformat()}] Refreshing model for: {ticker}")
         try:
-            train_model(ticker)
+            print(f"[✓] {refresh_model(ticker)}")
         except Exception as e:
             print(f"[!] Error during retrain: {e}")
         print(f"Sleeping for {interval_hours}h...")
@@ -1,4 +1,11 @@
-from app.services.trainer import load_model, train_model, compare_models
-from .features import generate_features 
+from .features import generate_features
 
 __all__ = ["load_model", "train_model", "compare_models", "generate_features"]
+
+
+def __getattr__(name):
+    # Resolved lazily: app.services.trainer itself imports from app.core
+    if name in ("load_model", "train_model", "compare_models"):
+        from app.services import trainer
+        return getattr(trainer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,9 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from app.model import load_model, generate_features
-from app.data import get_stock_data
+from app.services.trainer import load_engine
+from app.services.data_provider import get_stock_data
+from app.core.features import generate_features
 
 
 def calculate_metrics(history: list[float]) -> dict:
@@ -39,26 +40,10 @@ def run_backtest(ticker: str, initial_cash: float = 10_000, verbose: bool = Fals
         df.columns = df.columns.get_level_values(0)
     df.columns.name = None
 
-    X, y = generate_features(df)
-    model = load_model(ticker)
+    X, y = generate_features(df, ticker=ticker)
 
-    booster = model.get_booster()
-    trained_features = booster.feature_names
-
-    rename_map = {}
-    suffix = f" {ticker}"
-    for fname in trained_features:
-        if fname.endswith(suffix):
-            base = fname[:-len(suffix)]
-        else:
-            base = fname.strip()
-        rename_map[base] = fname
-
-    X_aligned = X.rename(columns=rename_map)
-    X_aligned = X_aligned[trained_features]
-
-    preds = model.predict(X_aligned)
-    preds = np.array(preds).reshape(-1)
+    # Columns are aligned by the model's stored feature schema (cached position plan)
+    preds, _ = load_engine(ticker).predict(X)
 
     close_prices = df["Close"]
     cash, position = initial_cash, 0
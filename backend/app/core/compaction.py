@@ -0,0 +1,280 @@
+import re
+import copy
+import json
+import time
+import logging
+
+import numpy as np
+from sklearn.metrics import f1_score, accuracy_score
+
+from app.core.inference.tree_engine import compile_model, TreeEnsembleEngine
+from app.core.thread_budget import threads_for
+from app.config.training_config import (
+    COMPACTION_F1_TOLERANCE, COMPACTION_DISTILL, COMPACTION_LATENCY_ROUNDS, COMPACTION_MIN_TREES
+)
+
+logger = logging.getLogger(__name__)
+
+# Student shapes tried by distillation, smallest first
+_DISTILL_GRID = [(50, 3), (100, 3), (100, 4), (200, 4), (200, 6)]
+
+
+# ───────────────────────────────────────────────────────────────
+# Tree surgery: rebuild a model keeping only selected trees
+# ───────────────────────────────────────────────────────────────
+
+def _keep_xgb_trees(model, keep: list[int]):
+    from xgboost import XGBModel
+
+    booster = model.get_booster() if isinstance(model, XGBModel) else model
+    raw = json.loads(booster.save_raw("json"))
+    gbm = raw["learner"]["gradient_booster"]["model"]
+    if int(gbm["gbtree_model_param"].get("num_parallel_tree", 1)) != 1:
+        raise ValueError("Tree selection requires num_parallel_tree=1")
+
+    gbm["trees"] = [dict(gbm["trees"][t], id=i) for i, t in enumerate(keep)]
+    gbm["tree_info"] = [gbm["tree_info"][t] for t in keep]
+    gbm["iteration_indptr"] = list(range(len(keep) + 1))
+    gbm["gbtree_model_param"]["num_trees"] = str(len(keep))
+    # Tree indices changed, so a stored best_iteration no longer applies
+    raw["learner"]["attributes"].pop("best_iteration", None)
+    raw["learner"]["attributes"].pop("best_score", None)
+    buffer = bytearray(json.dumps(raw).encode())
+
+    if not isinstance(model, XGBModel):
+        import xgboost as xgb
+        return xgb.Booster(model_file=buffer)
+    compact = copy.deepcopy(model)
+    compact.load_model(buffer)
+    compact.set_params(n_estimators=len(keep))
+    return compact
+
+
+def _keep_lgb_trees(model, keep: list[int]):
+    import lightgbm as lgb
+
+    booster = model.booster_ if isinstance(model, lgb.LGBMModel) else model
+    text = booster.model_to_string()
+    start, end = text.index("Tree=0\n"), text.index("end of trees")
+    # tree_sizes only speeds up parallel parsing; it is optional and would be stale
+    header = re.sub(r"(?m)^tree_sizes=.*\n", "", text[:start])
+    bodies = re.split(r"(?m)^Tree=\d+\n", text[start:end])[1:]
+    trees = "".join(f"Tree={i}\n{bodies[t]}" for i, t in enumerate(keep))
+    compact_booster = lgb.Booster(model_str=header + trees + text[end:])
+
+    if not isinstance(model, lgb.LGBMModel):
+        return compact_booster
+    compact = copy.deepcopy(model)
+    compact._Booster = compact_booster
+    compact._best_iteration = -1
+    compact._n_estimators = len(keep)
+    return compact
+
+
+def keep_trees(model, keep: list[int]):
+    """Copy of `model` with only the trees at indices `keep` (in order)."""
+    module = type(model).__module__
+    if module.startswith("xgboost"):
+        return _keep_xgb_trees(model, keep)
+    if module.startswith("lightgbm"):
+        return _keep_lgb_trees(model, keep)
+    raise ValueError(f"Cannot select trees of {type(model).__name__}")
+
+
+# ───────────────────────────────────────────────────────────────
+# Measurement
+# ───────────────────────────────────────────────────────────────
+
+def _tree_contributions(engine: TreeEnsembleEngine, X) -> np.ndarray:
+    """(rows, trees) matrix of each tree's leaf value; margins are row sums plus base."""
+    return engine.value[engine._leaves(engine.prepare(X))]
+
+
+def _f1_at(margin: np.ndarray, y, sigmoid_scale: float = 1.0, threshold: float = 0.5) -> float:
+    proba = 1.0 / (1.0 + np.exp(-sigmoid_scale * margin))
+    return f1_score(y, (proba >= threshold).astype(int), zero_division=0)
+
+
+def _native_bytes(model) -> int:
+    module = type(model).__module__
+    if module.startswith("xgboost"):
+        booster = model.get_booster() if hasattr(model, "get_booster") else model
+        return len(booster.save_raw("ubj"))
+    booster = model.booster_ if hasattr(model, "booster_") else model
+    return len(booster.model_to_string().encode())
+
+
+def _stored_trees(model) -> int:
+    module = type(model).__module__
+    if module.startswith("xgboost"):
+        booster = model.get_booster() if hasattr(model, "get_booster") else model
+        return booster.num_boosted_rounds()
+    booster = model.booster_ if hasattr(model, "booster_") else model
+    return booster.num_trees()
+
+
+def _row_latency_us(engine, X, rounds: int = COMPACTION_LATENCY_ROUNDS) -> float:
+    row = engine.prepare(X.iloc[[-1]])
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        engine.predict(row)
+        timings.append(time.perf_counter() - start)
+    return round(float(np.median(timings)) * 1e6, 1)
+
+
+def _describe(stage: str, model, X_val, y_val) -> dict:
+    engine = compile_model(model, strict=True)
+    labels, _ = engine.predict(X_val)
+    return {
+        "stage": stage,
+        "n_trees": engine.n_trees,
+        "stored_trees": _stored_trees(model),
+        "n_nodes": engine.n_nodes,
+        "model_bytes": _native_bytes(model),
+        "row_latency_us": _row_latency_us(engine, X_val),
+        "f1": round(f1_score(y_val, labels, zero_division=0), 4),
+        "accuracy": round(accuracy_score(y_val, labels), 4),
+    }
+
+
+# ───────────────────────────────────────────────────────────────
+# Compaction stages
+# ───────────────────────────────────────────────────────────────
+
+def _select_trees(engine: TreeEnsembleEngine, X_val, y_val, tolerance: float,
+                  min_trees: int = COMPACTION_MIN_TREES) -> list[int]:
+    """
+    Pick the trees to keep, within `tolerance` of the full ensemble's validation F1.
+
+    1. Truncate: the shortest prefix of boosting rounds that stays in tolerance
+       (rounds after that point only fit noise on this validation window).
+    2. Prune: within that prefix, drop trees in order of smallest mean |leaf
+       value| on validation rows for as long as F1 stays in tolerance.
+
+    F1 on a short validation window is noisy, so at least `min_trees` are kept.
+    """
+    contrib = _tree_contributions(engine, X_val)
+    if engine.average_output:
+        return list(range(engine.n_trees))
+    base, scale = engine.base_margin, engine.sigmoid_scale
+    target = _f1_at(contrib.sum(axis=1) + base, y_val, scale) - tolerance
+
+    prefix_margins = np.cumsum(contrib, axis=1) + base
+    n_keep = next(
+        (k for k in range(min(min_trees, engine.n_trees), engine.n_trees + 1) if _f1_at(prefix_margins[:, k - 1], y_val, scale) >= target),
+        engine.n_trees,
+    )
+
+    kept = np.arange(n_keep)
+    margin = prefix_margins[:, n_keep - 1]
+    # LightGBM folds the initial score into the first tree, so it is never pruned
+    protected = 1 if engine.kind == "lgb" else 0
+    order = protected + np.argsort(np.abs(contrib[:, protected:n_keep]).mean(axis=0))
+
+    dropped = 0
+    for tree in order[:max(0, n_keep - min_trees)]:
+        margin_without = margin - contrib[:, tree]
+        if _f1_at(margin_without, y_val, scale) < target:
+            break
+        margin, dropped = margin_without, dropped + 1
+
+    return sorted(set(kept.tolist()) - set(order[:dropped].tolist()))
+
+
+def _distill(teacher, X_train, X_val, y_val, target_f1: float):
+    """
+    Smallest student from _DISTILL_GRID, trained on the teacher's soft labels,
+    whose validation F1 reaches `target_f1`. Returns None if none qualifies.
+    """
+    import xgboost as xgb
+    from xgboost import XGBClassifier
+
+    soft = compile_model(teacher, strict=True).predict(X_train)[1]
+    dtrain = xgb.DMatrix(X_train, label=soft)
+    for n_estimators, max_depth in _DISTILL_GRID:
+        booster = xgb.train(
+            {"objective": "binary:logistic", "max_depth": max_depth, "eta": 0.1, "verbosity": 0,
+             "nthread": threads_for("training")},
+            dtrain, num_boost_round=n_estimators,
+        )
+        student = XGBClassifier(n_estimators=n_estimators, max_depth=max_depth, learning_rate=0.1)
+        student.load_model(bytearray(booster.save_raw("json")))
+        labels, _ = compile_model(student, strict=True).predict(X_val)
+        if f1_score(y_val, labels, zero_division=0) >= target_f1:
+            return student
+    return None
+
+
+def compact_model(model, X_val, y_val, X_train=None, tolerance: float = COMPACTION_F1_TOLERANCE,
+                  distill: bool = COMPACTION_DISTILL):
+    """
+    Shrink a fitted XGBoost/LightGBM classifier while staying within `tolerance`
+    of its validation F1. Stages: early-stopping truncation (library
+    best_iteration), prefix truncation and contribution pruning, and, with
+    `distill=True` and training rows, distillation into a small XGBoost student.
+
+    Returns (model, report). The report lists size, single-row latency and
+    validation F1/accuracy for every stage tried and names the one returned.
+    """
+    stages = [_describe("original", model, X_val, y_val)]
+    target_f1 = stages[0]["f1"] - tolerance
+    best, best_stage = model, "original"
+
+    engine = compile_model(model, strict=True)  # honours best_iteration already
+    keep = _select_trees(engine, X_val, y_val, tolerance)
+    if len(keep) < stages[0]["stored_trees"]:
+        pruned = keep_trees(model, keep)
+        stages.append(_describe("pruned", pruned, X_val, y_val))
+        if stages[-1]["f1"] >= target_f1:
+            best, best_stage = pruned, "pruned"
+
+    if distill and X_train is not None:
+        student = _distill(best, X_train, X_val, y_val, target_f1)
+        if student is not None:
+            stages.append(_describe("distilled", student, X_val, y_val))
+            if stages[-1]["row_latency_us"] < next(s for s in stages if s["stage"] == best_stage)["row_latency_us"]:
+                best, best_stage = student, "distilled"
+
+    chosen = next(s for s in stages if s["stage"] == best_stage)
+    report = {"chosen": best_stage, "tolerance": tolerance, "stages": stages}
+    logger.info(f"✓ Compaction: {stages[0]['n_trees']} → {chosen['n_trees']} trees, "
+                f"{stages[0]['model_bytes']} → {chosen['model_bytes']} bytes, "
+                f"F1 {stages[0]['f1']} → {chosen['f1']} ({best_stage})")
+    return best, report
+
+
+if __name__ == "__main__":
+    import argparse
+    from sklearn.model_selection import train_test_split
+    from app.services.data_provider import get_stock_data
+    from app.core.features import generate_features
+    from app.services.trainer import get_model_path, load_model, save_model
+
+    parser = argparse.ArgumentParser(description="Report (and optionally apply) compaction for saved models.")
+    parser.add_argument("tickers", nargs="+", help="Tickers whose saved model to compact")
+    parser.add_argument("--tolerance", type=float, default=COMPACTION_F1_TOLERANCE, help="Allowed validation F1 drop")
+    parser.add_argument("--distill", action="store_true", help="Also try distilling into a small student")
+    parser.add_argument("--apply", action="store_true", help="Save the compacted model as the serving artifact")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    import joblib
+
+    for ticker in (t.upper() for t in args.tickers):
+        X, y = generate_features(get_stock_data(ticker), ticker=ticker)
+        X_train, X_val, y_train, y_val = train_test_split(X, y, shuffle=False, test_size=0.2)
+        model = joblib.load(get_model_path(ticker))  # sklearn wrapper, needed for tree surgery
+        # The saved model may have been fitted on any of the training rows, so only the
+        # held-out split gives out-of-sample F1 here
+        compact, report = compact_model(model, X_val, y_val, X_train=X_train,
+                                        tolerance=args.tolerance, distill=args.distill)
+        print(f"\n{ticker} (chosen: {report['chosen']}, F1 on the held-out last {len(X_val)} bars)")
+        print(f"{'stage':<10} {'trees':>6} {'nodes':>7} {'bytes':>9} {'row µs':>8} {'F1':>7} {'acc':>7}")
+        for st in report["stages"]:
+            print(f"{st['stage']:<10} {st['n_trees']:>6} {st['n_nodes']:>7} {st['model_bytes']:>9} "
+                  f"{st['row_latency_us']:>8} {st['f1']:>7} {st['accuracy']:>7}")
+        if args.apply and report["chosen"] != "original":
+            # Keep the served decision threshold; save_model would otherwise reset it to 0.5
+            threshold = float(getattr(load_model(ticker), "threshold", 0.5))
+            print(f"[✓] Serving model updated at {save_model(compact, ticker, threshold=threshold)}")
@@ -2,14 +2,20 @@ from sklearn.ensemble import StackingClassifier, RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from xgboost import XGBClassifier
 import lightgbm as lgb
+from app.core.thread_budget import model_params
+from app.core.fitting import tree_params
 
 def train_stacked_model(X_train, y_train):
     base_learners = [
-        ("xgb", XGBClassifier(use_label_encoder=False, eval_metric="logloss")),
-        ("rf", RandomForestClassifier()),
-        ("lgb", lgb.LGBMClassifier())
+        ("xgb", XGBClassifier(use_label_encoder=False, eval_metric="logloss", **tree_params("xgb"),
+                              **model_params("training"))),
+        ("rf", RandomForestClassifier(**model_params("training"))),
+        ("lgb", lgb.LGBMClassifier(**tree_params("lgb"), **model_params("training")))
     ]
+    # StackingClassifier clones and cross-fits the base learners itself, so
+    # they get histogram settings but no early-stopping set
     final_model = LogisticRegression()
-    model = StackingClassifier(estimators=base_learners, final_estimator=final_model)
+    # Base learners already use the training budget; fitting them in parallel as well would oversubscribe
+    model = StackingClassifier(estimators=base_learners, final_estimator=final_model, n_jobs=1)
     model.fit(X_train, y_train)
     return model
@@ -1,16 +1,15 @@
 import os
 import json
 import logging
-import joblib
-import mlflow
-import matplotlib.pyplot as plt
-import seaborn as sns
+import numpy as np
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     classification_report, confusion_matrix
 )
 
-mlflow.set_tracking_uri("http://localhost:5000")
+# mlflow, matplotlib and seaborn are imported on first use so that importing
+# this module (e.g. via the trainer) does not pull them into the API process
+MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000")
 
 # Setup logger
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
@@ -81,6 +80,11 @@ def evaluate_model(
     logger.info(f"✓ Classification report saved ➞ {json_path}")
 
     # ─── Save confusion matrix image ──────────────────────────────────────────
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     cm = confusion_matrix(y_test, y_pred)
     plt.figure(figsize=(6, 4))
     sns.heatmap(cm, annot=True, fmt="d", cmap="Blues",
@@ -97,6 +101,9 @@ def evaluate_model(
     # ─── MLflow Logging ───────────────────────────────────────────────────────
     if log_to_mlflow:
         try:
+            import mlflow
+            mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+
             if override_run or mlflow.active_run() is None:
                 mlflow.start_run()
 
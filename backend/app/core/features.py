@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 import logging
+from numpy.lib.stride_tricks import sliding_window_view
 from pandas.api.types import is_datetime64_any_dtype as is_datetime
 from app.services.sentiment_service import get_news_sentiment_series, get_social_sentiment_series
 from app.config.feature_config import FEATURE_FLAGS, RSI_WINDOW, MFI_WINDOW
@@ -160,3 +161,173 @@ def generate_features(df, rsi_window=RSI_WINDOW, mfi_window=MFI_WINDOW, ticker="
 
 
 
+
+
+# ───────────────────────────────────────────────────────────────
+# Multi-ticker (panel) features for scanning
+# ───────────────────────────────────────────────────────────────
+
+PANEL_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Rows scanned for each ticker's latest complete feature row
+PANEL_TAIL_ROWS = 64
+
+
+def _rolling(values: np.ndarray, window: int, reduce) -> np.ndarray:
+    """pandas rolling(window) semantics (NaN until full, NaN if any NaN) across all columns at once."""
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = reduce(sliding_window_view(values, window, axis=0), axis=-1)
+    return out
+
+
+def _shift(values: np.ndarray, n: int = 1) -> np.ndarray:
+    out = np.full(values.shape, np.nan)
+    out[n:] = values[:-n]
+    return out
+
+
+def _panel_rsi(close: np.ndarray, window: int) -> np.ndarray:
+    delta = close - _shift(close)
+    avg_gain = _rolling(np.clip(delta, 0, None), window, np.mean)
+    avg_loss = _rolling(-np.clip(delta, None, 0), window, np.mean)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def generate_panel_features(bars: dict, rsi_window=RSI_WINDOW, mfi_window=MFI_WINDOW, sentiment=None,
+                            tail: int = PANEL_TAIL_ROWS):
+    """
+    Latest feature row for many tickers in one vectorized pass.
+
+    `bars` maps each OHLCV field to a wide (date × ticker) frame. Indicators
+    that depend on the whole history (EMAs, MACD, OBV) run on the full frames;
+    windowed ones run as NumPy sliding windows over every ticker at once, on
+    only the rows needed to fill the last `tail` dates. For each ticker the row
+    is taken at its last date (within `tail`) where every feature is defined,
+    which is the row generate_features would return last; tickers with no
+    complete row in that span are omitted. Rows are aligned on the union
+    calendar, so a ticker missing a day inside a window gets no complete row
+    until that window has passed.
+
+    `sentiment(ticker, date, calendar) -> (social, news)` (e.g. latest_sentiment)
+    supplies the sentiment columns for the selected row only; they default to 0.0.
+
+    Returns a (ticker × feature) frame with a `date` column, using the
+    unsuffixed names ('Open', 'RETURN', ...) that FeatureSchema resolves
+    against each model's inputs.
+    """
+    close_df = bars["Close"]
+    tickers = np.asarray(close_df.columns)
+    # Longest lookback of any windowed feature (ATR14 feeding a 50-day median)
+    lookback = max(rsi_window + 2, mfi_window + 1, 20, 14 + 50) + 1
+    rows = slice(max(0, len(close_df) - tail - lookback), None)
+
+    o, h, l, c, v = (bars[f].to_numpy(dtype=np.float64)[rows] for f in PANEL_FIELDS)
+    feats = {"Open": o, "High": h, "Low": l, "Close": c, "Volume": v}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        feats["RETURN"] = c / _shift(c) - 1
+
+    if FEATURE_FLAGS["rsi"]:
+        feats["RSI"] = _panel_rsi(c, rsi_window)
+
+    if FEATURE_FLAGS["rsi_momentum"]:
+        rsi = feats["RSI"] if FEATURE_FLAGS["rsi"] else _panel_rsi(c, rsi_window)
+        feats["RSI_MOMENTUM"] = rsi - _shift(rsi)
+
+    if FEATURE_FLAGS["macd"]:
+        feats["MACD"] = compute_smoothed_macd({"Close": close_df}).to_numpy()[rows]
+
+    if FEATURE_FLAGS["sma_20"]:
+        feats["SMA_20"] = _rolling(c, 20, np.mean)
+
+    if FEATURE_FLAGS["ema_10"]:
+        feats["EMA_10"] = close_df.ewm(span=10).mean().to_numpy()[rows]
+
+    if FEATURE_FLAGS["ema_50"]:
+        feats["EMA_50"] = close_df.ewm(span=50).mean().to_numpy()[rows]
+
+    if FEATURE_FLAGS["atr"]:
+        prev_close = _shift(c)
+        # fmax skips NaN like the per-ticker max(axis=1) does on the first row
+        tr = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+        feats["ATR14"] = _rolling(tr, 14, np.mean)
+
+    if FEATURE_FLAGS["bollinger_bands"]:
+        mid = _rolling(c, 20, np.mean)
+        std = _rolling(c, 20, lambda w, axis: np.std(w, axis=axis, ddof=1))
+        feats["BB_MID"] = mid
+        feats["BB_UPPER"] = mid + 2 * std
+        feats["BB_LOWER"] = mid - 2 * std
+
+    if FEATURE_FLAGS["vol_regime"]:
+        atr = feats["ATR14"]
+        with np.errstate(invalid="ignore"):
+            regime = (atr > _rolling(atr, 50, np.median)).astype(np.float64)
+        feats["VOL_REGIME"] = np.where(np.isnan(c), np.nan, regime)
+
+    if FEATURE_FLAGS["obv"]:
+        close_full = close_df.to_numpy(dtype=np.float64)
+        direction = np.sign(np.nan_to_num(close_full - _shift(close_full), nan=0.0))
+        obv = pd.DataFrame(direction * bars["Volume"].to_numpy(dtype=np.float64)).cumsum().to_numpy()
+        feats["OBV"] = obv[rows]
+
+    if FEATURE_FLAGS["mfi"]:
+        tp = (h + l + c) / 3
+        mf = tp * v
+        tp_prev = _shift(tp)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pos_mf = np.where(tp > tp_prev, mf, 0.0)
+            neg_mf = np.where(tp < tp_prev, mf, 0.0)
+            mf_ratio = _rolling(pos_mf, mfi_window, np.sum) / _rolling(neg_mf, mfi_window, np.sum)
+            feats["MFI"] = 100 - 100 / (1 + mf_ratio)
+
+    names = list(feats)
+    stacked = np.stack([feats[n][-tail:] for n in names], axis=2)  # date × ticker × feature
+    stacked[~np.isfinite(stacked)] = np.nan
+
+    # Last date per ticker where every feature is defined (generate_features' dropna)
+    valid = ~np.isnan(stacked).any(axis=2)
+    has_row = valid.any(axis=0)
+    last = valid.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+
+    dates = close_df.index[-tail:]
+    out = pd.DataFrame(stacked[last[has_row], np.flatnonzero(has_row), :],
+                       index=pd.Index(tickers[has_row], name="ticker"), columns=names)
+    out.insert(0, "date", dates[last[has_row]])
+
+    if FEATURE_FLAGS["social_sentiment"] or FEATURE_FLAGS["news_sentiment"]:
+        calendar = pd.to_datetime(close_df.index.date)
+        values = [sentiment(t, d, calendar) if sentiment else (0.0, 0.0) for t, d in zip(out.index, out["date"])]
+        if FEATURE_FLAGS["social_sentiment"]:
+            out["SOCIAL_SENTIMENT"] = [v[0] for v in values]
+        if FEATURE_FLAGS["news_sentiment"]:
+            out["NEWS_SENTIMENT"] = [v[1] for v in values]
+
+    return out
+
+
+def latest_sentiment(ticker: str, date, calendar=None) -> tuple:
+    """
+    (social, news) sentiment as generate_features would see it on `date`: the
+    most recent value on or before that day, counting only days in `calendar`
+    (the bar dates) as generate_features' reindex does; 0.0 when there is none.
+    """
+    day = pd.Timestamp(date).normalize()
+    values = []
+    for flag, fetch in (("social_sentiment", get_social_sentiment_series),
+                        ("news_sentiment", get_news_sentiment_series)):
+        value = 0.0
+        if FEATURE_FLAGS[flag]:
+            try:
+                series = fetch(ticker, days=7)
+                series = series[series.index <= day].dropna()
+                if calendar is not None:
+                    series = series[series.index.isin(calendar)]
+                if not series.empty:
+                    value = float(series.iloc[-1])
+            except Exception as e:
+                logger.warning(f"[!] {flag} failed for {ticker}: {e}")
+        values.append(value)
+    return tuple(values)
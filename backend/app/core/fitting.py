@@ -0,0 +1,213 @@
+import copy
+import inspect
+import logging
+
+import numpy as np
+
+from app.core.compaction import keep_trees
+from app.config.training_config import (
+    TRAIN_TREE_METHOD, TRAIN_MAX_BIN, EARLY_STOPPING_ROUNDS, EARLY_STOPPING_FRACTION, EARLY_STOPPING_MIN_ROWS
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _kind(model) -> str:
+    module = type(model).__module__
+    if module.startswith("xgboost"):
+        return "xgb"
+    if module.startswith("lightgbm"):
+        return "lgb"
+    raise ValueError(f"Cannot fit {type(model).__name__} with early stopping")
+
+
+def tree_params(kind: str) -> dict:
+    """Histogram tree building settings for XGBoost ('xgb') or LightGBM ('lgb', always histogram based)."""
+    if kind == "xgb":
+        return {"tree_method": TRAIN_TREE_METHOD, "max_bin": TRAIN_MAX_BIN}
+    return {"max_bin": TRAIN_MAX_BIN}
+
+
+def holdout_tail(X, y, fraction: float = EARLY_STOPPING_FRACTION, min_rows: int = EARLY_STOPPING_MIN_ROWS):
+    """
+    Split the last `fraction` of rows off as an early-stopping set
+    (chronological, so it never precedes the rows it validates).
+    Returns (X_fit, y_fit, eval_set), with eval_set None if it would have
+    fewer than `min_rows` rows.
+    """
+    n_eval = int(len(X) * fraction)
+    if n_eval < min_rows:
+        return X, y, None
+    take = (lambda a, s: a.iloc[s]) if hasattr(X, "iloc") else (lambda a, s: a[s])
+    head, tail = slice(None, -n_eval), slice(-n_eval, None)
+    return take(X, head), take(y, head), (take(X, tail), take(y, tail))
+
+
+def trim_to_best(model):
+    """
+    Drop the trees grown after the best iteration and store it on the model,
+    so the saved artifact only holds the trees that are used.
+    """
+    if _kind(model) == "xgb":
+        booster = model.get_booster()
+        best = booster.attr("best_iteration")
+        if best is None or int(best) + 1 >= booster.num_boosted_rounds():
+            return model
+        best, score = int(best), booster.attr("best_score")
+        trimmed = keep_trees(model, list(range(best + 1)))
+        trimmed.get_booster().set_attr(best_iteration=str(best), best_score=score)
+        return trimmed
+
+    best = model.best_iteration_
+    if not best or best >= model.booster_.num_trees():
+        return model
+    trimmed = keep_trees(model, list(range(best)))
+    trimmed._best_iteration = trimmed._Booster.best_iteration = best
+    return trimmed
+
+
+def fit_model(model, X, y, eval_set=None, early_stopping_rounds: int = EARLY_STOPPING_ROUNDS):
+    """
+    Fit an XGBoost/LightGBM classifier the way every training path should:
+    histogram tree building with TRAIN_MAX_BIN bins and, when there is an
+    early-stopping set, boosting stops once its logloss has not improved for
+    `early_stopping_rounds` rounds and the model is trimmed to its best
+    iteration.
+
+    `eval_set` is an (X, y) pair; without one, the chronological tail of the
+    training rows is held out (see holdout_tail). Returns the fitted model,
+    which may be a trimmed copy of `model`.
+    """
+    kind = _kind(model)
+    model.set_params(**tree_params(kind))
+    if eval_set is None and early_stopping_rounds:
+        X, y, eval_set = holdout_tail(X, y)
+    if eval_set is None or not early_stopping_rounds:
+        if kind == "xgb":
+            model.set_params(early_stopping_rounds=None)
+        model.fit(X, y)
+        return model
+
+    if kind == "xgb":
+        model.set_params(early_stopping_rounds=early_stopping_rounds)
+        model.fit(X, y, eval_set=[eval_set], verbose=False)
+    else:
+        import lightgbm as lgb
+        # LightGBM 4.6+ takes eval_X/eval_y and deprecates eval_set
+        if "eval_X" in inspect.signature(model.fit).parameters:
+            eval_kwargs = {"eval_X": (eval_set[0],), "eval_y": (eval_set[1],)}
+        else:
+            eval_kwargs = {"eval_set": [eval_set]}
+        model.fit(X, y, callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)], **eval_kwargs)
+    return trim_to_best(model)
+
+
+def continue_boosting(model, X, y, rounds: int, learning_rate: float):
+    """
+    Copy of a fitted XGBoost/LightGBM classifier with `rounds` more boosting
+    rounds fitted on (X, y) only, starting from its existing trees
+    (xgb_model= / init_model=). `model` itself is left untouched.
+    """
+    kind = _kind(model)
+    update = copy.deepcopy(model)
+    update.set_params(n_estimators=rounds, learning_rate=learning_rate, **tree_params(kind))
+    if kind == "xgb":
+        booster = model.get_booster().copy()
+        # A stored best_iteration would make predict() ignore the new trees
+        booster.set_attr(best_iteration=None, best_score=None)
+        update.set_params(early_stopping_rounds=None)
+        update.fit(X, y, xgb_model=booster, verbose=False)
+    else:
+        # LightGBM adds no trees when a leaf cannot hold min_child_samples of the few new rows
+        update.set_params(min_child_samples=min(update.get_params()["min_child_samples"], max(1, len(X) // 4)))
+        update.fit(X, y, init_model=model.booster_)
+    return update
+
+
+def boosted_rounds(model) -> int:
+    """Boosting rounds stored in a fitted model (after any trimming)."""
+    if _kind(model) == "xgb":
+        return int(model.get_booster().num_boosted_rounds())
+    return int(model.booster_.num_trees())
+
+
+# ───────────────────────────────────────────────────────────────
+# Native training on prebuilt quantized data (Optuna trials)
+# ───────────────────────────────────────────────────────────────
+
+def balanced_weights(y) -> np.ndarray:
+    """Per-row weights equal to sklearn's class_weight='balanced'."""
+    y = np.asarray(y)
+    classes, counts = np.unique(y, return_counts=True)
+    per_class = len(y) / (len(classes) * counts)
+    return per_class[np.searchsorted(classes, y)]
+
+
+def xgb_matrices(X, y, nthread: int = None):
+    """
+    QuantileDMatrix for the fit rows and one for the early-stopping tail
+    (sharing the fit rows' bin edges), built once and reusable by any number
+    of xgb.train calls with the same max_bin.
+    """
+    import xgboost as xgb
+
+    X_fit, y_fit, eval_set = holdout_tail(X, y)
+    dtrain = xgb.QuantileDMatrix(X_fit, y_fit, max_bin=TRAIN_MAX_BIN, nthread=nthread or -1)
+    des = None
+    if eval_set:
+        des = xgb.QuantileDMatrix(eval_set[0], eval_set[1], ref=dtrain, max_bin=TRAIN_MAX_BIN, nthread=nthread or -1)
+    return dtrain, des
+
+
+def lgb_datasets(X, y, balanced: bool = True):
+    """
+    Constructed (binned) lgb.Datasets for the fit rows and the early-stopping
+    tail. Raw data is kept so the Datasets can be reused by later lgb.train
+    calls.
+    """
+    import lightgbm as lgb
+
+    X_fit, y_fit, eval_set = holdout_tail(X, y)
+    params = {"max_bin": TRAIN_MAX_BIN, "verbosity": -1}
+    train = lgb.Dataset(X_fit, y_fit, weight=balanced_weights(y_fit) if balanced else None,
+                        params=params, free_raw_data=False).construct()
+    es = None
+    if eval_set:
+        es = lgb.Dataset(eval_set[0], eval_set[1], reference=train, params=params, free_raw_data=False).construct()
+    return train, es
+
+
+def boost_xgb(params: dict, matrices, num_rounds: int, early_stopping_rounds: int = EARLY_STOPPING_ROUNDS):
+    """xgb.train on prebuilt matrices; the booster is sliced to its best iteration."""
+    import xgboost as xgb
+
+    dtrain, des = matrices
+    params = {"objective": "binary:logistic", "eval_metric": "logloss", "verbosity": 0,
+              **tree_params("xgb"), **params}
+    if des is None or not early_stopping_rounds:
+        return xgb.train(params, dtrain, num_boost_round=num_rounds)
+    booster = xgb.train(params, dtrain, num_boost_round=num_rounds, evals=[(des, "es")],
+                        early_stopping_rounds=early_stopping_rounds, verbose_eval=False)
+    return booster[:booster.best_iteration + 1]
+
+
+def boost_lgb(params: dict, datasets, num_rounds: int, early_stopping_rounds: int = EARLY_STOPPING_ROUNDS):
+    """lgb.train on prebuilt Datasets; predict() then uses the best iteration."""
+    import lightgbm as lgb
+
+    train, es = datasets
+    params = {"objective": "binary", "verbosity": -1, **tree_params("lgb"), **params}
+    if es is None or not early_stopping_rounds:
+        return lgb.train(params, train, num_boost_round=num_rounds)
+    return lgb.train(params, train, num_boost_round=num_rounds, valid_sets=[es],
+                     callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)])
+
+
+def native_importances(booster, n_features: int) -> np.ndarray:
+    """The sklearn wrappers' feature_importances_ for a native booster (XGBoost: normalized gain; LightGBM: splits)."""
+    if type(booster).__module__.startswith("lightgbm"):
+        return booster.feature_importance("split", iteration=booster.best_iteration or None).astype(np.float64)
+    scores = booster.get_score(importance_type="gain")
+    gains = np.array([scores.get(f"f{i}", 0.0) for i in range(n_features)], dtype=np.float64)
+    total = gains.sum()
+    return gains / total if total else gains
@@ -0,0 +1,131 @@
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Column layouts seen per schema; generate_features produces one or two in practice
+_MAX_PLANS = 16
+
+
+class FeatureSchemaError(ValueError):
+    """Raised when an input frame cannot be aligned with the model's feature schema."""
+
+    def __init__(self, message: str, missing=None, ambiguous=None):
+        super().__init__(message)
+        self.missing = list(missing or [])
+        self.ambiguous = list(ambiguous or [])
+
+
+def canonical_name(name: str, ticker: str = None) -> str:
+    """
+    Name with whitespace and the per-ticker suffix removed.
+
+    Older artifacts were trained on 'Open AAPL' / 'RETURN ', current features
+    come out as 'Open_AAPL' / 'RETURN'; both canonicalise to 'Open' / 'RETURN'.
+    """
+    name = str(name).strip()
+    if ticker:
+        name = re.sub(rf"[ _]{re.escape(ticker.upper())}$", "", name)
+    return name
+
+
+class FeatureSchema:
+    """
+    Ordered model inputs plus cached column-position plans.
+
+    `plan(columns)` resolves every model input to an integer position in a
+    frame with that column layout, by exact name first and canonical name
+    second. Plans are cached per layout, so aligning a frame is a tuple lookup
+    and one fancy-index instead of a rename and a by-name reindex per call.
+    Missing or ambiguous inputs raise FeatureSchemaError immediately.
+    """
+
+    def __init__(self, inputs, ticker: str = None):
+        self.inputs = [str(f) for f in inputs]
+        self.ticker = ticker.upper() if ticker else None
+        self._plans: dict[tuple, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.inputs)
+
+    @classmethod
+    def from_model(cls, model, ticker: str = None) -> "FeatureSchema":
+        """Schema of a fitted sklearn wrapper, booster, NativeModel or engine."""
+        for attr in ("feature_names", "feature_names_in_"):
+            names = getattr(model, attr, None)
+            if names is not None and not callable(names):
+                return cls(list(names), ticker)
+        if hasattr(model, "get_booster"):
+            return cls(model.get_booster().feature_names, ticker)
+        if hasattr(model, "booster_"):
+            return cls(model.booster_.feature_name(), ticker)
+        raise FeatureSchemaError(f"{type(model).__name__} does not expose feature names")
+
+    def to_dict(self) -> dict:
+        return {"inputs": self.inputs, "ticker": self.ticker}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FeatureSchema":
+        return cls(data["inputs"], data.get("ticker"))
+
+    def _resolve(self, columns: tuple) -> np.ndarray:
+        exact = {c: i for i, c in enumerate(columns)}
+        canonical = {}
+        for i, c in enumerate(columns):
+            canonical.setdefault(canonical_name(c, self.ticker), []).append(i)
+
+        positions, missing, ambiguous = [], [], []
+        for name in self.inputs:
+            if name in exact:
+                positions.append(exact[name])
+                continue
+            hits = canonical.get(canonical_name(name, self.ticker), [])
+            if len(hits) == 1:
+                positions.append(hits[0])
+            elif hits:
+                ambiguous.append(name)
+            else:
+                missing.append(name)
+
+        if missing or ambiguous:
+            detail = []
+            if missing:
+                detail.append(f"missing {missing}")
+            if ambiguous:
+                detail.append(f"ambiguous {ambiguous}")
+            raise FeatureSchemaError(
+                f"Input does not match the model's feature schema: {'; '.join(detail)}",
+                missing=missing, ambiguous=ambiguous,
+            )
+        return np.asarray(positions, dtype=np.intp)
+
+    def plan(self, columns) -> np.ndarray:
+        """Integer positions of the model inputs within `columns` (cached per layout)."""
+        key = tuple(columns)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._resolve(key)
+            with self._lock:
+                if len(self._plans) >= _MAX_PLANS:
+                    self._plans.clear()
+                self._plans[key] = plan
+        return plan
+
+    def select(self, X) -> np.ndarray:
+        """Model-ordered input matrix from a DataFrame (arrays are checked for width only)."""
+        if isinstance(X, pd.DataFrame):
+            return X.to_numpy()[:, self.plan(X.columns)]
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != len(self.inputs):
+            raise FeatureSchemaError(f"Expected {len(self.inputs)} features, got {X.shape[1]}")
+        return X
+
+    def frame(self, X) -> pd.DataFrame:
+        """Aligned DataFrame carrying the model's own column names (for library predict)."""
+        if isinstance(X, pd.DataFrame):
+            return pd.DataFrame(self.select(X), index=X.index, columns=self.inputs)
+        return pd.DataFrame(self.select(X), columns=self.inputs)
@@ -0,0 +1,209 @@
+import os
+import json
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.core.inference.tree_engine import UnsupportedModelError
+from app.core.inference.feature_schema import FeatureSchema
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Model file suffix per library; the schema sidecar is always "<base>.schema.json"
+_SUFFIX = {"xgb": ".ubj", "lgb": ".lgb.txt"}
+
+
+class ArtifactError(ValueError):
+    """Raised when a native artifact is missing pieces or does not match its sidecar."""
+
+
+def schema_path(base_path: str) -> str:
+    return f"{base_path}.schema.json"
+
+
+def _atomic_write(path: str, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _booster_of(model):
+    """Return (kind, booster, best_iteration) for an sklearn wrapper or raw booster."""
+    module = type(model).__module__
+    if module.startswith("xgboost"):
+        import xgboost as xgb
+        booster = model.get_booster() if isinstance(model, xgb.XGBModel) else model
+        best = booster.attr("best_iteration")
+        return "xgb", booster, int(best) if best is not None else None
+
+    if module.startswith("lightgbm"):
+        import lightgbm as lgb
+        if isinstance(model, lgb.LGBMModel):
+            best, booster = getattr(model, "best_iteration_", None), model.booster_
+        else:
+            best, booster = model.best_iteration, model
+        return "lgb", booster, best if best and best > 0 else None
+
+    raise UnsupportedModelError(f"No native format for model of type {type(model).__name__}")
+
+
+def save_native(model, base_path: str, threshold: float = 0.5, metadata: dict = None,
+                feature_schema: FeatureSchema = None) -> str:
+    """
+    Write `model` as a native booster file plus a JSON schema sidecar.
+
+    XGBoost models are stored as UBJSON (<base>.ubj), LightGBM as its text model
+    (<base>.lgb.txt). The sidecar holds the feature schema (pass `feature_schema`
+    to record the ticker used to resolve suffixed column names), decision
+    threshold and best iteration, and is written last, so it doubles as the commit marker:
+    readers only ever see a sidecar whose model file is already in place.
+    Returns the sidecar path.
+    """
+    kind, booster, best_iteration = _booster_of(model)
+    model_path = base_path + _SUFFIX[kind]
+
+    if kind == "xgb":
+        feature_names = booster.feature_names
+        raw = booster.save_raw("ubj")
+
+        def write_raw(p):
+            with open(p, "wb") as f:
+                f.write(raw)
+
+        _atomic_write(model_path, write_raw)
+    else:
+        feature_names = booster.feature_name()
+        # Truncate at the best iteration so the file holds only the trees that are served
+        _atomic_write(model_path, lambda p: booster.save_model(p, num_iteration=best_iteration))
+        best_iteration = None
+
+    feature_schema = feature_schema or FeatureSchema(feature_names or [])
+    schema = {
+        "format_version": FORMAT_VERSION,
+        "kind": kind,
+        "model_file": os.path.basename(model_path),
+        "model_bytes": os.path.getsize(model_path),
+        "feature_names": list(feature_names) if feature_names else None,
+        "feature_schema": feature_schema.to_dict(),
+        "threshold": float(threshold),
+        "best_iteration": best_iteration,
+        "created_at": datetime.utcnow().isoformat(),
+        **(metadata or {}),
+    }
+    sidecar = schema_path(base_path)
+
+    def write_schema(p):
+        with open(p, "w") as f:
+            json.dump(schema, f, indent=2)
+
+    _atomic_write(sidecar, write_schema)
+    return sidecar
+
+
+class NativeModel:
+    """
+    Booster loaded from a native artifact, with the sidecar's schema and threshold.
+
+    Exposes the subset of the sklearn wrapper interface the app uses
+    (predict, predict_proba, feature_names_in_, get_booster for XGBoost), so it
+    can stand in for an unpickled classifier.
+    """
+
+    def __init__(self, kind: str, booster, schema: dict):
+        self.kind = kind
+        self.booster = booster
+        self.schema = schema
+        self.feature_names = schema.get("feature_names")
+        self.threshold = float(schema.get("threshold", 0.5))
+        self.best_iteration = schema.get("best_iteration")
+        if schema.get("feature_schema"):
+            self.feature_schema = FeatureSchema.from_dict(schema["feature_schema"])
+        else:
+            self.feature_schema = FeatureSchema(self.feature_names) if self.feature_names else None
+
+    @property
+    def feature_names_in_(self):
+        return np.asarray(self.feature_names, dtype=object) if self.feature_names else None
+
+    def get_booster(self):
+        if self.kind != "xgb":
+            raise AttributeError("get_booster is only available for XGBoost models")
+        return self.booster
+
+    def _frame(self, X):
+        if isinstance(X, pd.DataFrame) and self.feature_schema is not None:
+            return self.feature_schema.frame(X)
+        return X
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = self._frame(X)
+        if self.kind == "xgb":
+            import xgboost as xgb
+            iteration_range = (0, self.best_iteration + 1) if self.best_iteration is not None else (0, 0)
+            proba = self.booster.predict(xgb.DMatrix(X), iteration_range=iteration_range)
+        else:
+            proba = self.booster.predict(X)
+        proba = np.asarray(proba, dtype=np.float64)
+        return np.column_stack([1.0 - proba, proba])
+
+    def predict(self, X) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] >= self.threshold).astype(int)
+
+
+def load_native(path: str) -> NativeModel:
+    """
+    Load a native artifact from its base path or sidecar path.
+
+    Only the booster file and JSON are read; nothing is unpickled, so a
+    tampered artifact can at worst fail to parse, not execute code.
+    """
+    sidecar = path if path.endswith(".schema.json") else schema_path(path)
+    with open(sidecar) as f:
+        schema = json.load(f)
+
+    if schema.get("format_version") != FORMAT_VERSION:
+        raise ArtifactError(f"Unsupported artifact format_version {schema.get('format_version')} in {sidecar}")
+
+    kind = schema["kind"]
+    model_path = os.path.join(os.path.dirname(sidecar), schema["model_file"])
+    if os.path.getsize(model_path) != schema["model_bytes"]:
+        raise ArtifactError(f"{model_path} does not match its schema sidecar (replaced mid-write?)")
+
+    if kind == "xgb":
+        import xgboost as xgb
+        booster = xgb.Booster(model_file=model_path)
+    elif kind == "lgb":
+        import lightgbm as lgb
+        booster = lgb.Booster(model_file=model_path)
+    else:
+        raise ArtifactError(f"Unknown model kind '{kind}' in {sidecar}")
+
+    return NativeModel(kind, booster, schema)
+
+
+def convert_pickle(pkl_path: str, threshold: float = 0.5) -> str:
+    """Write the native artifact next to an existing joblib pickle (same base name)."""
+    import joblib
+
+    model = joblib.load(pkl_path)
+    return save_native(model, os.path.splitext(pkl_path)[0], threshold=threshold)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert joblib model pickles to native artifacts.")
+    parser.add_argument("paths", nargs="+", help="Paths to *.pkl model files")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Decision threshold to record (default: 0.5)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    for pkl_path in args.paths:
+        try:
+            logger.info(f"✓ {pkl_path} -> {convert_pickle(pkl_path, args.threshold)}")
+        except Exception as e:
+            logger.error(f"[!] Could not convert {pkl_path}: {e}")
@@ -0,0 +1,372 @@
+import json
+import logging
+import numpy as np
+import pandas as pd
+
+from app.core.inference.feature_schema import FeatureSchema
+from app.core.thread_budget import threads_for, set_model_threads
+
+logger = logging.getLogger(__name__)
+
+# Per-node missing-value handling, mirroring the two libraries' split semantics
+MISSING_NAN = 0    # NaN follows default_left (XGBoost, LightGBM missing_type=NaN)
+MISSING_ZERO = 1   # NaN is treated as 0 and 0 follows default_left (LightGBM missing_type=Zero)
+MISSING_NONE = 2   # NaN is treated as 0 and compared normally (LightGBM missing_type=None)
+
+_LGB_MISSING = {"NaN": MISSING_NAN, "Zero": MISSING_ZERO, "None": MISSING_NONE}
+_LGB_ZERO_THRESHOLD = 1e-35
+
+
+class UnsupportedModelError(ValueError):
+    """Raised when a model cannot be flattened into a TreeEnsembleEngine."""
+
+
+class TreeEnsembleEngine:
+    """
+    Binary tree ensemble flattened into contiguous NumPy node arrays.
+
+    All trees share one set of node arrays; leaves point to themselves, so a
+    fixed number of vectorized steps (the deepest tree's depth) walks every
+    (row, tree) pair to its leaf at once. One call returns both the class and
+    the positive-class probability, matching the library's sklearn wrapper.
+    """
+
+    def __init__(self, kind, feature_names, roots, feature, threshold, left, right,
+                 default_left, missing, value, depth, base_margin, sigmoid_scale=1.0,
+                 strict_less=True, average_output=False, n_features=None, decision_threshold=0.5):
+        self.kind = kind
+        self.feature_names = list(feature_names) if feature_names else None
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.missing = np.ascontiguousarray(missing, dtype=np.int8)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.depth = int(depth)
+        self.base_margin = float(base_margin)
+        self.sigmoid_scale = float(sigmoid_scale)
+        self.strict_less = strict_less
+        self.average_output = average_output
+        self.n_features = n_features or (len(self.feature_names) if self.feature_names else None)
+        self.decision_threshold = float(decision_threshold)
+        # Column-position plans for DataFrame inputs; load_engine swaps in the ticker-aware schema
+        self.feature_schema = FeatureSchema(self.feature_names) if self.feature_names else None
+        # XGBoost compares in float32, LightGBM in float64
+        self.input_dtype = np.float32 if kind == "xgb" else np.float64
+        self._zero_missing = bool((self.missing == MISSING_ZERO).any())
+        # Source booster for native feature contributions; set by compile_model
+        self.booster = None
+        self.num_iteration = None
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.roots, self.feature, self.threshold, self.left,
+                                      self.right, self.default_left, self.missing, self.value))
+
+    # ─── Input ────────────────────────────────────────────────────────────────
+    def prepare(self, X) -> np.ndarray:
+        """Align and convert input rows to the matrix the traversal consumes."""
+        if isinstance(X, pd.DataFrame):
+            X = self.feature_schema.select(X) if self.feature_schema is not None else X.to_numpy()
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        # Round to the library's comparison precision, then compare in float64
+        return X.astype(self.input_dtype, copy=False).astype(np.float64, copy=False)
+
+    # ─── Scoring ──────────────────────────────────────────────────────────────
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        n = X.shape[0]
+        rows = np.arange(n)[:, None]
+        node = np.broadcast_to(self.roots, (n, self.n_trees)).copy()
+
+        if not self._zero_missing and not np.isnan(X).any():
+            # Fast path: no value can hit a missing branch, so only the comparison matters
+            for _ in range(self.depth):
+                x = X[rows, self.feature[node]]
+                thr = self.threshold[node]
+                go_left = (x < thr) if self.strict_less else (x <= thr)
+                node = np.where(go_left, self.left[node], self.right[node])
+            return node
+
+        for _ in range(self.depth):
+            x = X[rows, self.feature[node]]
+            mtype = self.missing[node]
+            nan = np.isnan(x)
+            x = np.where(nan & (mtype != MISSING_NAN), 0.0, x)
+            is_missing = np.where(
+                mtype == MISSING_NAN, nan,
+                (mtype == MISSING_ZERO) & (np.abs(x) <= _LGB_ZERO_THRESHOLD),
+            )
+            thr = self.threshold[node]
+            go_left = (x < thr) if self.strict_less else (x <= thr)
+            go_left = np.where(is_missing, self.default_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return node
+
+    def predict_margin(self, X) -> np.ndarray:
+        X = self.prepare(X)
+        raw = self.value[self._leaves(X)].sum(axis=1)
+        if self.average_output:
+            raw /= self.n_trees
+        return raw + self.base_margin
+
+    def predict(self, X):
+        """Return (labels, positive-class probabilities) in a single traversal."""
+        margin = self.predict_margin(X)
+        proba = 1.0 / (1.0 + np.exp(-self.sigmoid_scale * margin))
+        labels = (proba >= self.decision_threshold).astype(int)
+        return labels, proba
+
+    def predict_proba(self, X) -> np.ndarray:
+        _, proba = self.predict(X)
+        return np.column_stack([1.0 - proba, proba])
+
+    # ─── Contributions ────────────────────────────────────────────────────────
+    def predict_contributions(self, X) -> np.ndarray:
+        """
+        Per-feature contributions to the margin from the booster's own TreeSHAP
+        (XGBoost pred_contribs / LightGBM pred_contrib). Shape (rows, features + 1),
+        columns in model input order with the bias last; each row sums to the margin.
+        """
+        if self.booster is None:
+            raise UnsupportedModelError("Engine was compiled without its source booster")
+        X = self.prepare(X)
+        threads = threads_for("batch" if len(X) > 1 else "inference")
+        if self.kind == "xgb":
+            import xgboost as xgb
+            # The booster's own nthread is fixed at compile time; it is shared by request threads
+            dmatrix = xgb.DMatrix(X, feature_names=self.booster.feature_names, nthread=threads)
+            iteration_range = (0, self.num_iteration) if self.num_iteration else (0, 0)
+            return self.booster.predict(dmatrix, pred_contribs=True, iteration_range=iteration_range)
+        return self.booster.predict(X, pred_contrib=True, num_iteration=self.num_iteration, num_threads=threads)
+
+    def explain(self, X):
+        """
+        Return (labels, positive-class probabilities, contributions) from one
+        contribution pass; the margin is the row sum of the contributions.
+        """
+        contributions = self.predict_contributions(X)
+        margin = contributions.sum(axis=1)
+        proba = 1.0 / (1.0 + np.exp(-self.sigmoid_scale * margin))
+        labels = (proba >= self.decision_threshold).astype(int)
+        return labels, proba, contributions
+
+
+class LibraryEngine:
+    """Fallback adapter exposing the engine interface over the model's own predict_proba."""
+
+    kind = "library"
+
+    def __init__(self, model):
+        self.model = set_model_threads(model, "inference")
+        self.feature_names = getattr(model, "feature_names_in_", None)
+        self.decision_threshold = float(getattr(model, "threshold", 0.5))
+        self.feature_schema = FeatureSchema(list(self.feature_names)) if self.feature_names is not None else None
+        self.booster = None
+
+    def prepare(self, X):
+        if self.feature_schema is not None:
+            return self.feature_schema.frame(X)
+        return pd.DataFrame(np.atleast_2d(np.asarray(X)), columns=self.feature_names)
+
+    def predict(self, X):
+        proba = self.model.predict_proba(X)[:, 1]
+        return (proba >= self.decision_threshold).astype(int), proba
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.model.predict_proba(X)
+
+
+# ───────────────────────────────────────────────────────────────
+# Compilation
+# ───────────────────────────────────────────────────────────────
+
+def _tree_depth(left, right, root) -> int:
+    depth, frontier = 0, [root]
+    while True:
+        frontier = [c for n in frontier for c in (left[n], right[n]) if c != n]
+        if not frontier:
+            return depth
+        depth += 1
+
+
+def _compile_xgb(booster) -> TreeEnsembleEngine:
+    model = json.loads(booster.save_raw("json"))
+    learner = model["learner"]
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise UnsupportedModelError(f"Unsupported XGBoost objective '{objective}'")
+
+    gbm = learner["gradient_booster"]
+    if gbm.get("name") != "gbtree":
+        raise UnsupportedModelError(f"Unsupported XGBoost booster '{gbm.get('name')}'")
+    trees = gbm["model"]["trees"]
+
+    # Honor early stopping the same way the sklearn wrapper does
+    best_iteration = booster.attr("best_iteration")
+    if best_iteration is not None:
+        indptr = gbm["model"].get("iteration_indptr")
+        if indptr:
+            trees = trees[:indptr[int(best_iteration) + 1]]
+        else:
+            per_iter = int(gbm["model"]["gbtree_model_param"].get("num_parallel_tree", 1))
+            trees = trees[:(int(best_iteration) + 1) * per_iter]
+
+    base_score = float(str(learner["learner_model_param"]["base_score"]).strip("[]"))
+    base_margin = float(np.log(base_score / (1.0 - base_score)))
+
+    arrays = {k: [] for k in ("feature", "threshold", "left", "right", "default_left", "value")}
+    roots, depth, offset = [], 0, 0
+    for tree in trees:
+        if any(tree.get("split_type", [])):
+            raise UnsupportedModelError("Categorical splits are not supported")
+        n = len(tree["left_children"])
+        left = np.asarray(tree["left_children"], dtype=np.int64)
+        right = np.asarray(tree["right_children"], dtype=np.int64)
+        is_leaf = left == -1
+        local = np.arange(n)
+        left = np.where(is_leaf, local, left)
+        right = np.where(is_leaf, local, right)
+        cond = np.asarray(tree["split_conditions"], dtype=np.float32).astype(np.float64)
+
+        arrays["feature"].append(np.where(is_leaf, 0, tree["split_indices"]))
+        arrays["threshold"].append(np.where(is_leaf, 0.0, cond))
+        arrays["left"].append(left + offset)
+        arrays["right"].append(right + offset)
+        arrays["default_left"].append(np.asarray(tree["default_left"], dtype=bool))
+        arrays["value"].append(np.where(is_leaf, cond, 0.0))
+        roots.append(offset)
+        depth = max(depth, _tree_depth(left, right, 0))
+        offset += n
+
+    n_nodes = offset
+    return TreeEnsembleEngine(
+        kind="xgb",
+        feature_names=booster.feature_names,
+        roots=roots,
+        missing=np.full(n_nodes, MISSING_NAN),
+        depth=depth,
+        base_margin=base_margin,
+        strict_less=True,
+        n_features=int(learner["learner_model_param"]["num_feature"]),
+        **{k: np.concatenate(v) if v else np.empty(0) for k, v in arrays.items()},
+    )
+
+
+def _compile_lgb(booster, num_iteration=None) -> TreeEnsembleEngine:
+    model = booster.dump_model(num_iteration=num_iteration)
+    objective = str(model.get("objective", ""))
+    if not objective.startswith("binary") or model.get("num_class", 1) != 1:
+        raise UnsupportedModelError(f"Unsupported LightGBM objective '{objective}'")
+
+    sigmoid_scale = 1.0
+    for token in objective.split():
+        if token.startswith("sigmoid:"):
+            sigmoid_scale = float(token.split(":", 1)[1])
+
+    feature, threshold, left, right, default_left, missing, value = [], [], [], [], [], [], []
+    roots, depth = [], 0
+
+    def add(node, level):
+        nonlocal depth
+        idx = len(feature)
+        feature.append(0); threshold.append(0.0); left.append(idx); right.append(idx)
+        default_left.append(False); missing.append(MISSING_NAN); value.append(0.0)
+        if "split_index" not in node:
+            value[idx] = node["leaf_value"]
+            depth = max(depth, level)
+            return idx
+        if node.get("decision_type", "<=") != "<=":
+            raise UnsupportedModelError("Categorical splits are not supported")
+        feature[idx] = node["split_feature"]
+        threshold[idx] = node["threshold"]
+        default_left[idx] = bool(node["default_left"])
+        missing[idx] = _LGB_MISSING[node.get("missing_type", "None")]
+        left[idx] = add(node["left_child"], level + 1)
+        right[idx] = add(node["right_child"], level + 1)
+        return idx
+
+    for info in model["tree_info"]:
+        roots.append(add(info["tree_structure"], 0))
+
+    return TreeEnsembleEngine(
+        kind="lgb",
+        feature_names=model.get("feature_names"),
+        roots=roots,
+        feature=feature,
+        threshold=threshold,
+        left=left,
+        right=right,
+        default_left=default_left,
+        missing=missing,
+        value=value,
+        depth=depth,
+        base_margin=0.0,
+        sigmoid_scale=sigmoid_scale,
+        strict_less=False,
+        average_output=bool(model.get("average_output", False)),
+        n_features=model.get("max_feature_idx", -1) + 1,
+    )
+
+
+def _compile(model):
+    if hasattr(model, "schema") and hasattr(model, "booster"):
+        # NativeModel: compile the loaded booster and carry over the artifact's threshold and schema
+        engine = _compile(model.booster)
+        engine.decision_threshold = model.threshold
+        engine.feature_schema = model.feature_schema
+        return engine
+
+    module = type(model).__module__
+    if module.startswith("xgboost"):
+        import xgboost as xgb
+        booster = model.get_booster() if isinstance(model, xgb.XGBModel) else model
+        engine = _compile_xgb(booster)
+        best_iteration = booster.attr("best_iteration")
+        # Engine-owned copy, configured once: set_param on a booster other threads predict with is not safe
+        engine.booster = booster.copy()
+        engine.booster.set_param({"nthread": threads_for("batch")})
+        engine.num_iteration = int(best_iteration) + 1 if best_iteration is not None else None
+        return engine
+
+    if module.startswith("lightgbm"):
+        import lightgbm as lgb
+        if isinstance(model, lgb.LGBMModel):
+            best = getattr(model, "best_iteration_", None)
+            booster = model.booster_
+        else:
+            best, booster = model.best_iteration, model
+        engine = _compile_lgb(booster, num_iteration=best if best and best > 0 else None)
+        engine.booster = booster
+        engine.num_iteration = best if best and best > 0 else None
+        return engine
+
+    raise UnsupportedModelError(f"Cannot compile model of type {type(model).__name__}")
+
+
+def compile_model(model, strict: bool = False):
+    """
+    Flatten a trained XGBoost/LightGBM binary classifier into a TreeEnsembleEngine.
+
+    Accepts the sklearn wrappers, raw boosters or a NativeModel. With strict=False, models the
+    engine cannot represent are wrapped in a LibraryEngine instead of raising.
+    """
+    try:
+        return _compile(model)
+    except UnsupportedModelError as e:
+        if strict:
+            raise
+        logger.warning(f"[!] No fast engine for {type(model).__name__} ({e}), using library predict")
+        return LibraryEngine(model)
@@ -1,9 +1,13 @@
 import optuna
 import joblib
 import os
+import sys
+import time
+import logging
+import subprocess
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import TimeSeriesSplit, train_test_split
+from sklearn.model_selection import train_test_split
 from sklearn.metrics import (
     accuracy_score, f1_score, precision_score, recall_score,
     classification_report, precision_recall_curve
@@ -13,12 +17,23 @@ from lightgbm import LGBMClassifier
 from datetime import datetime
 import mlflow
 import mlflow.sklearn
-import shap
-import matplotlib.pyplot as plt
 
-from app.services.data_provider import get_stock_data
-from app.core.features import generate_features
 from app.core.evaluate import evaluate_model
+from app.services.trainer import save_model, write_metadata
+from app.services.incremental import full_training_state
+from app.core.compaction import compact_model
+from app.core.inference.tree_engine import compile_model
+from app.core.thread_budget import model_params
+from app.core.study_dataset import StudyDataset
+from app.core.fitting import (
+    fit_model, holdout_tail, boosted_rounds, xgb_matrices, lgb_datasets, boost_xgb, boost_lgb, native_importances
+)
+from app.core.study_storage import open_study, ticker_study_name, finished_trials, FINISHED_STATES, PUBLISHED_ATTR
+from app.config.training_config import (
+    COMPACTION_ENABLED, OPTUNA_PARALLEL_TRIALS, OPTUNA_CV_SPLITS, OPTUNA_TREE_FIDELITY
+)
+
+logger = logging.getLogger(__name__)
 
 # === Directories ===
 BASE_DIR = os.path.dirname(__file__)
@@ -37,100 +52,245 @@ def tune_threshold(y_true, probs):
     return thresholds[best_idx], f1s[best_idx]
 
 # === Optuna Objective Function ===
-def objective(trial, ticker="AAPL"):
-    df = get_stock_data(ticker)
-    X, y = generate_features(df, ticker=ticker)
-    if len(X) < 50:
-        raise ValueError("Insufficient data")
-
-    tscv = TimeSeriesSplit(n_splits=5)
-    scores = []
-
-    for train_idx, val_idx in tscv.split(X):
-        X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
-        y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
-
-        model_type = trial.suggest_categorical("model", ["xgb", "lgb"])
-
-        if model_type == "xgb":
-            scale_pos_weight = (len(y_train) - sum(y_train)) / sum(y_train)
-            model = XGBClassifier(
-                n_estimators=trial.suggest_int("n_estimators", 100, 600),
-                max_depth=trial.suggest_int("max_depth", 3, 12),
-                learning_rate=trial.suggest_float("learning_rate", 0.01, 0.3),
-                subsample=trial.suggest_float("subsample", 0.5, 1.0),
-                colsample_bytree=trial.suggest_float("colsample_bytree", 0.5, 1.0),
-                eval_metric="logloss",
-                use_label_encoder=False,
-                scale_pos_weight=scale_pos_weight,
-                verbosity=0
-            )
-        else:
-            model = LGBMClassifier(
-                n_estimators=trial.suggest_int("n_estimators", 100, 600),
-                max_depth=trial.suggest_int("max_depth", 3, 12),
-                learning_rate=trial.suggest_float("learning_rate", 0.01, 0.3),
-                subsample=trial.suggest_float("subsample", 0.5, 1.0),
-                colsample_bytree=trial.suggest_float("colsample_bytree", 0.5, 1.0),
-                min_gain_to_split=0.001,
-                class_weight='balanced',
-                verbosity=-1
-            )
+def fold_trees(n_estimators: int, fold, last_fold, min_trees: int = 20) -> int:
+    """Trees for `fold`: n_estimators scaled by its training window relative to the last fold's."""
+    if not OPTUNA_TREE_FIDELITY:
+        return n_estimators
+    return max(min(min_trees, n_estimators), round(n_estimators * len(fold.y_train) / len(last_fold.y_train)))
 
-        model.fit(X_train, y_train)
 
-        importances = model.feature_importances_
-        importance_df = pd.DataFrame({"Feature": X_train.columns, "Importance": importances})
-        low_importance = importance_df[importance_df["Importance"] < 1.0]["Feature"].tolist()
+def _native_params(model_type: str, params: dict, fold) -> dict:
+    """Trial params for xgb.train / lgb.train, equivalent to the sklearn wrappers used for the final fit."""
+    threads = model_params("training")["n_jobs"]
+    common = {"max_depth": params["max_depth"], "learning_rate": params["learning_rate"]}
+    if model_type == "xgb":
+        return {**common, "subsample": params["subsample"], "colsample_bytree": params["colsample_bytree"],
+                "scale_pos_weight": fold.scale_pos_weight, "nthread": threads}
+    # LGBMClassifier defaults subsample_freq to 0, so its subsample has no effect; keep that
+    return {**common, "bagging_fraction": params["subsample"], "bagging_freq": 0,
+            "feature_fraction": params["colsample_bytree"], "min_gain_to_split": 0.001, "num_threads": threads}
 
-        if 0 < len(low_importance) < len(X_train.columns):
-            X_train = X_train.drop(columns=low_importance)
-            X_val = X_val.drop(columns=low_importance)
-            model.fit(X_train, y_train)
 
-        probs = model.predict_proba(X_val)[:, 1]
+def _build(model_type: str, X, y):
+    if model_type == "xgb":
+        return xgb_matrices(X, y, nthread=model_params("training")["n_jobs"])
+    return lgb_datasets(X, y)
+
+
+def _boost(model_type: str, params: dict, data, num_rounds: int):
+    return (boost_xgb if model_type == "xgb" else boost_lgb)(params, data, num_rounds)
+
+
+def _predict(booster, X) -> np.ndarray:
+    if type(booster).__module__.startswith("xgboost"):
+        return booster.inplace_predict(X)
+    return booster.predict(X)
+
+
+def objective(trial, ticker="AAPL", dataset: StudyDataset = None):
+    """
+    Mean validation F1 over the TimeSeriesSplit folds.
+
+    Folds run from the smallest training window to the largest, so they are
+    increasing fidelities: the running mean is reported after each one and
+    the study's pruner stops trials that trail at the same fold. With
+    OPTUNA_TREE_FIDELITY, n_estimators also grows with the training window.
+
+    Trials train with xgb.train / lgb.train on each fold's quantized matrices
+    (QuantileDMatrix / binned lgb.Dataset), built by the first trial that
+    needs them and reused by every later one. Time spent building data and
+    boosting is recorded per trial (construct_ms / boost_ms user attrs).
+    """
+    # Data and folds are prepared once per study; building them here is only a fallback
+    dataset = dataset or StudyDataset.load(ticker, n_splits=OPTUNA_CV_SPLITS)
+    model_type = trial.suggest_categorical("model", ["xgb", "lgb"])
+    params = {
+        "n_estimators": trial.suggest_int("n_estimators", 100, 600),
+        "max_depth": trial.suggest_int("max_depth", 3, 12),
+        "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.3),
+        "subsample": trial.suggest_float("subsample", 0.5, 1.0),
+        "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
+    }
+    scores = []
+    construct_s = boost_s = 0.0
+
+    for step, fold in enumerate(dataset.folds):
+        X_train, X_val = fold.X_train, fold.X_val
+        y_train, y_val = fold.y_train, fold.y_val
+        num_rounds = fold_trees(params["n_estimators"], fold, dataset.folds[-1])
+        native = _native_params(model_type, params, fold)
+
+        start = time.perf_counter()
+        data = fold.cached(model_type, lambda: _build(model_type, X_train, y_train))
+        construct_s += time.perf_counter() - start
+        start = time.perf_counter()
+        booster = _boost(model_type, native, data, num_rounds)
+        boost_s += time.perf_counter() - start
+
+        # Refit without low-importance features (column mask instead of DataFrame drops);
+        # the masked matrices depend on the trial, so they are built fresh
+        keep = native_importances(booster, X_train.shape[1]) >= 1.0
+        if 0 < (~keep).sum() < len(keep):
+            X_train, X_val = X_train[:, keep], X_val[:, keep]
+            start = time.perf_counter()
+            data = _build(model_type, X_train, y_train)
+            construct_s += time.perf_counter() - start
+            start = time.perf_counter()
+            booster = _boost(model_type, native, data, num_rounds)
+            boost_s += time.perf_counter() - start
+
+        probs = _predict(booster, X_val)
         threshold, f1 = tune_threshold(y_val, probs)
         scores.append(f1)
 
+        trial.set_user_attr("construct_ms", round(construct_s * 1000, 1))
+        trial.set_user_attr("boost_ms", round(boost_s * 1000, 1))
+        trial.report(float(np.mean(scores)), step)
+        if trial.should_prune():
+            raise optuna.TrialPruned(f"pruned after fold {step + 1}/{len(dataset.folds)}")
+
     return np.mean(scores)
 
+
+def training_time(study) -> dict:
+    """Data construction vs boosting time summed over the study's trials."""
+    trials = [t for t in study.get_trials(deepcopy=False) if "boost_ms" in t.user_attrs]
+    return {
+        "trials": len(trials),
+        "construct_ms": round(sum(t.user_attrs["construct_ms"] for t in trials), 1),
+        "boost_ms": round(sum(t.user_attrs["boost_ms"] for t in trials), 1),
+    }
+
+# === Study Execution ===
+def optimize_study(study, dataset: StudyDataset, n_trials: int, callbacks=None, timeout_s: float = None) -> int:
+    """
+    Run trials in this process until the study (across all its workers) has
+    `n_trials` finished trials (trials already running in other workers when
+    the count is reached still finish, so a parallel study can end slightly
+    over). Returns the number of trials still missing when this process
+    started, 0 if the study was already complete. With `timeout_s`, no new
+    trial starts after that many seconds.
+    """
+    remaining = n_trials - finished_trials(study)
+    if remaining > 0:
+        stop = optuna.study.MaxTrialsCallback(n_trials, states=FINISHED_STATES)
+        study.optimize(lambda trial: objective(trial, dataset.ticker, dataset), n_trials=remaining,
+                       timeout=timeout_s, callbacks=[stop, *(callbacks or [])])
+    return max(0, remaining)
+
+
+def spawn_trial_workers(ticker: str, study_name: str, n_trials: int, n_workers: int,
+                        timeout_s: float = None) -> list:
+    """
+    Start `n_workers` extra trial processes on this machine. They are plain
+    subprocesses running this module's --worker CLI (the same command that
+    joins a study from another machine), so they can be started from the
+    daemonic training workers.
+    """
+    backend_dir = os.path.dirname(os.path.dirname(BASE_DIR))
+    cmd = [sys.executable, "-m", "app.core.optimizer", ticker,
+           "--study-name", study_name, "--n-trials", str(n_trials), "--worker"]
+    if timeout_s:
+        cmd += ["--timeout", str(timeout_s)]
+    return [subprocess.Popen(cmd, cwd=backend_dir) for _ in range(n_workers)]
+
+
+def run_trials(study, dataset: StudyDataset, n_trials: int, callbacks=None,
+               n_workers: int = OPTUNA_PARALLEL_TRIALS, timeout_s: float = None) -> None:
+    remaining = n_trials - finished_trials(study)
+    if remaining <= 0:
+        print(f"[✓] Study {study.study_name} already has {n_trials} finished trials")
+        return
+    if remaining < n_trials:
+        print(f"[✓] Resuming study {study.study_name}: {remaining}/{n_trials} trials left")
+
+    workers = spawn_trial_workers(dataset.ticker, study.study_name, n_trials, min(n_workers, remaining) - 1,
+                                  timeout_s)
+    try:
+        optimize_study(study, dataset, n_trials, callbacks, timeout_s)
+    except BaseException:
+        for proc in workers:
+            proc.terminate()
+        raise
+    finally:
+        for proc in workers:
+            if proc.wait() != 0:
+                logger.warning(f"[!] Trial worker {proc.pid} exited with code {proc.returncode}")
+
+
 # === Run Optimization ===
-def run_optimization(ticker="AAPL", n_trials=50):
-    study = optuna.create_study(direction="maximize")
-    study.optimize(lambda trial: objective(trial, ticker), n_trials=n_trials)
+def run_optimization(ticker="AAPL", n_trials=50, callbacks=None, study_name=None,
+                     n_workers=OPTUNA_PARALLEL_TRIALS, timeout_s=None):
+    """
+    Tune, fit and publish a model for `ticker`.
+
+    Trials are stored in the persistent study `study_name` (see
+    app/core/study_storage.py). By default that is the ticker's latest study
+    unless it already published a model, so running again after a crash or
+    restart resumes the interrupted study and only runs the missing trials. `n_workers`
+    processes on this machine run trials in parallel; more can join from
+    other machines with the --worker CLI.
+
+    Trials are pruned after a poor fold (OPTUNA_PRUNER), so pruned trials
+    count towards `n_trials` at a fraction of the cost. `timeout_s` bounds
+    the search by wall-clock time instead.
+    """
+    now = datetime.now().strftime("%Y%m%d_%H%M%S")
+    dataset = StudyDataset.load(ticker, n_splits=OPTUNA_CV_SPLITS)
+    study = open_study(study_name or ticker_study_name(ticker))
+    run_trials(study, dataset, n_trials, callbacks, n_workers, timeout_s)
+    pruned = sum(t.state == optuna.trial.TrialState.PRUNED for t in study.trials)
+    print(f"[✓] {finished_trials(study)} trials finished, {pruned} pruned")
+    timing = training_time(study)
+    print(f"[✓] Trial time: {timing['construct_ms']:.0f}ms building data, {timing['boost_ms']:.0f}ms boosting "
+          f"over {timing['trials']} trials")
 
     print(f"\n Best trial for {ticker}:")
     print(study.best_trial)
 
-    # === Final Training ===
-    df = get_stock_data(ticker)
-    X, y = generate_features(df, ticker=ticker)
-    X_train, X_val, y_train, y_val = train_test_split(X, y, shuffle=False, test_size=0.2)
+    # === Final Training (same dataset as the trials) ===
+    # X_val is only reported on. Compaction and the decision threshold are chosen on
+    # a selection slice (the tail of the training rows), so validation scores stay out-of-sample
+    X_train, X_val, y_train, y_val = train_test_split(dataset.frame, dataset.labels, shuffle=False, test_size=0.2)
+    X_fit, y_fit, (X_select, y_select) = holdout_tail(X_train, y_train, min_rows=1)
 
     best_params = study.best_trial.params
     model_type = best_params.pop("model")
 
     if model_type == "xgb":
-        scale_pos_weight = (len(y_train) - sum(y_train)) / sum(y_train)
-        model = XGBClassifier(**best_params, eval_metric="logloss", use_label_encoder=False, scale_pos_weight=scale_pos_weight)
+        scale_pos_weight = (len(y_fit) - sum(y_fit)) / sum(y_fit)
+        model = XGBClassifier(**best_params, eval_metric="logloss", use_label_encoder=False, scale_pos_weight=scale_pos_weight,
+                              **model_params("training"))
     else:
-        model = LGBMClassifier(**best_params, min_gain_to_split=0.001, class_weight='balanced')
+        model = LGBMClassifier(**best_params, min_gain_to_split=0.001, class_weight='balanced',
+                               **model_params("training"))
+
+    model = fit_model(model, X_fit, y_fit)
+    print(f"[✓] Final model: {boosted_rounds(model)}/{best_params['n_estimators']} rounds after early stopping")
 
-    model.fit(X_train, y_train)
-    evaluate_model(model, X_val, y_val, ticker)
+    # === Compaction: drop trees that do not move selection-slice F1 ===
+    compaction = None
+    if COMPACTION_ENABLED:
+        try:
+            model, compaction = compact_model(model, X_select, y_select, X_train=X_fit)
+        except Exception as e:
+            print(f"[!] Compaction failed, keeping full model: {e}")
 
-    # === SHAP Analysis ===
+    val_metrics = evaluate_model(model, X_val, y_val, ticker)
+
+    # === SHAP Analysis (booster-native TreeSHAP, same values the API serves) ===
     shap_path = None
     try:
-        explainer = shap.Explainer(model, X_train)
-        shap_values = explainer(X_val)
-
-        fig = plt.figure()
-        shap.plots.beeswarm(shap_values, show=False)
-        shap_path = os.path.join(SHAP_DIR, f"{ticker}_shap_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-        plt.savefig(shap_path, bbox_inches='tight')
-        plt.close(fig)
-        print(f"[✓] SHAP summary plot saved to {shap_path}")
+        contributions = compile_model(model, strict=True).predict_contributions(X_val)
+        mean_abs = np.abs(contributions[:, :-1]).mean(axis=0)
+        summary = pd.DataFrame({
+            "feature": X_val.columns,
+            "mean_abs_contribution": mean_abs,
+            "mean_contribution": contributions[:, :-1].mean(axis=0),
+        }).sort_values("mean_abs_contribution", ascending=False)
+        shap_path = os.path.join(SHAP_DIR, f"{ticker}_shap_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        summary.to_csv(shap_path, index=False)
+        print(f"[✓] SHAP summary saved to {shap_path}")
     except Exception as e:
         print(f"[!] SHAP generation failed: {e}")
 
@@ -140,18 +300,34 @@ def run_optimization(ticker="AAPL", n_trials=50):
         "y_pred": model.predict(X_val),
         "proba": model.predict_proba(X_val)[:, 1]
     })
-    now = datetime.now().strftime("%Y%m%d_%H%M%S")
     preds_path = os.path.join(MODEL_DIR, f"{ticker}_preds_{now}.csv")
     preds_df.to_csv(preds_path, index=False)
 
-    # === Save Model & Study ===
+    # === Save Model & Trials (the study itself lives in the study storage) ===
     model_path = os.path.join(MODEL_DIR, f"{ticker}_{model_type}_optuna_{now}.pkl")
-    study_path = os.path.join(OPTUNA_DIR, f"{ticker}_study_{now}.pkl")
+    study_path = os.path.join(OPTUNA_DIR, f"{study.study_name}_trials.csv")
     joblib.dump(model, model_path)
-    joblib.dump(study, study_path)
+    study.trials_dataframe().to_csv(study_path, index=False)
 
     print(f"[✓] Model saved to {model_path}")
-    print(f"[✓] Study saved to {study_path}")
+
+    # Publish as the serving artifact with the F1-tuned decision threshold;
+    # running API processes pick it up on their next request
+    threshold, _ = tune_threshold(y_select, model.predict_proba(X_select)[:, 1])
+    serving_path = save_model(model, ticker, threshold=float(threshold))
+    write_metadata({
+        "ticker": ticker,
+        "source": "optuna",
+        "study_name": study.study_name,
+        "model_type": model_type,
+        "n_trees": boosted_rounds(model),
+        "metrics": val_metrics,
+        **full_training_state(dataset.frame, val_metrics["f1_score"]),
+    }, ticker)
+    # The next run for this ticker starts a new study instead of resuming this one
+    study.set_user_attr(PUBLISHED_ATTR, True)
+    print(f"[✓] Serving model updated at {serving_path}")
+    print(f"[✓] Trials saved to {study_path}")
 
     # === Evaluation Diagnostics ===
     print("\n Diagnostic Evaluation:")
@@ -172,8 +348,11 @@ def run_optimization(ticker="AAPL", n_trials=50):
 
         with mlflow.start_run():
             mlflow.set_tag("ticker", ticker)
+            mlflow.set_tag("study_name", study.study_name)
             mlflow.log_params(study.best_trial.params)
             mlflow.log_metric("f1_score", study.best_value)
+            if compaction:
+                mlflow.log_dict(compaction, "compaction.json")
             mlflow.sklearn.log_model(
                 model,
                 "model",
@@ -190,10 +369,43 @@ def run_optimization(ticker="AAPL", n_trials=50):
     except Exception as e:
         print(f"[WARNING] MLflow logging failed: {e}")
 
+    return {
+        "model_type": model_type,
+        "model_path": model_path,
+        "serving_path": serving_path,
+        "threshold": float(threshold),
+        "compaction": compaction,
+        "best_value": float(study.best_value),
+        "best_params": study.best_trial.params,
+    }
+
 
 
 if __name__ == "__main__":
-    run_optimization(ticker="AAPL", n_trials=50)
+    import argparse
+    from app.core.thread_budget import configure_process
+
+    parser = argparse.ArgumentParser(description="Tune a model, or join a running study as a trial worker.")
+    parser.add_argument("ticker", nargs="?", default="AAPL")
+    parser.add_argument("--n-trials", type=int, default=50, help="Finished trials the study should reach")
+    parser.add_argument("--study-name", help="Persistent study to create or resume (default: the ticker's unpublished study, else a new one)")
+    parser.add_argument("--workers", type=int, default=OPTUNA_PARALLEL_TRIALS, help="Trial processes on this machine")
+    parser.add_argument("--timeout", type=float, help="Stop starting new trials after this many seconds")
+    parser.add_argument("--worker", action="store_true", help="Only run trials of --study-name, then exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    configure_process("training")
+    ticker = args.ticker.upper()
+    if args.worker:
+        if not args.study_name:
+            parser.error("--worker requires --study-name")
+        dataset = StudyDataset.load(ticker, n_splits=OPTUNA_CV_SPLITS)
+        ran = optimize_study(open_study(args.study_name), dataset, args.n_trials, timeout_s=args.timeout)
+        print(f"[✓] Worker {os.getpid()} done ({ran} trials were left when it joined)")
+    else:
+        run_optimization(ticker=ticker, n_trials=args.n_trials, study_name=args.study_name, n_workers=args.workers,
+                         timeout_s=args.timeout)
 
 
 
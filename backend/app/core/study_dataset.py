@@ -0,0 +1,75 @@
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import TimeSeriesSplit
+
+from app.services.data_provider import get_stock_data
+from app.core.features import generate_features
+
+logger = logging.getLogger(__name__)
+
+
+class Fold:
+    """One TimeSeriesSplit fold: index arrays plus zero-copy views of the study arrays."""
+
+    __slots__ = ("train_idx", "val_idx", "X_train", "y_train", "X_val", "y_val", "scale_pos_weight", "_cache")
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, train_idx: np.ndarray, val_idx: np.ndarray):
+        self.train_idx = train_idx
+        self.val_idx = val_idx
+        # TimeSeriesSplit folds are contiguous ranges, so slices are views, not copies
+        self.X_train, self.y_train = X[train_idx[0]:train_idx[-1] + 1], y[train_idx[0]:train_idx[-1] + 1]
+        self.X_val, self.y_val = X[val_idx[0]:val_idx[-1] + 1], y[val_idx[0]:val_idx[-1] + 1]
+        positives = int(self.y_train.sum())
+        self.scale_pos_weight = (len(self.y_train) - positives) / positives if positives else 1.0
+        self._cache = {}
+
+    def cached(self, key: str, build):
+        """
+        Per-fold structure built once by `build()` and reused by every later
+        trial in this process (e.g. quantized training matrices).
+        """
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+
+class StudyDataset:
+    """
+    Everything an Optuna study's trials share, prepared once per study.
+
+    Holds the feature matrix and labels as contiguous arrays, the column
+    names, and the TimeSeriesSplit folds (index arrays plus views), so a trial
+    only fits models: no download, no feature generation, no DataFrame
+    slicing per fold.
+    """
+
+    def __init__(self, X: pd.DataFrame, y, n_splits: int = 5, ticker: str = None):
+        self.ticker = ticker
+        self.frame = X
+        self.labels = pd.Series(np.asarray(y), index=X.index, name=getattr(y, "name", None))
+        self.columns = list(X.columns)
+        self.X = np.ascontiguousarray(X.to_numpy(dtype=np.float64))
+        self.y = np.ascontiguousarray(np.asarray(y, dtype=np.int64))
+        self.folds = [
+            Fold(self.X, self.y, train_idx, val_idx)
+            for train_idx, val_idx in TimeSeriesSplit(n_splits=n_splits).split(self.X)
+        ]
+
+    @classmethod
+    def load(cls, ticker: str, n_splits: int = 5, min_rows: int = 50) -> "StudyDataset":
+        """Download bars and build features for `ticker` once."""
+        start = time.perf_counter()
+        X, y = generate_features(get_stock_data(ticker), ticker=ticker)
+        if len(X) < min_rows:
+            raise ValueError("Insufficient data")
+        dataset = cls(X, y, n_splits=n_splits, ticker=ticker)
+        logger.info(f"✓ Study dataset for {ticker}: {dataset.X.shape[0]} rows × {dataset.X.shape[1]} features, "
+                    f"{len(dataset.folds)} folds in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return dataset
+
+    @property
+    def nbytes(self) -> int:
+        return self.X.nbytes + self.y.nbytes
@@ -0,0 +1,122 @@
+import os
+import time
+import logging
+from datetime import datetime
+
+import optuna
+from optuna.storages import RDBStorage, JournalStorage, RetryHeartbeatStaleTrialCallback
+from optuna.storages.journal import JournalFileBackend, JournalFileOpenLock
+from optuna.trial import TrialState
+
+from app.config.training_config import (
+    OPTUNA_STORAGE, OPTUNA_STORAGE_DIR, OPTUNA_HEARTBEAT_S, OPTUNA_STALE_TRIAL_S, OPTUNA_PRUNER, OPTUNA_CV_SPLITS
+)
+
+logger = logging.getLogger(__name__)
+
+# Trials that count towards a study's n_trials; failed ones are retried
+FINISHED_STATES = (TrialState.COMPLETE, TrialState.PRUNED)
+# Study user attribute set once the study's model has been published
+PUBLISHED_ATTR = "published"
+
+
+# ───────────────────────────────────────────────────────────────
+# Storage
+# ───────────────────────────────────────────────────────────────
+
+def get_storage(kind: str = OPTUNA_STORAGE, storage_dir: str = OPTUNA_STORAGE_DIR):
+    """
+    Persistent Optuna storage shared by every process running a study.
+
+    - "sqlite": one SQLite file in `storage_dir`. Workers send heartbeats, so
+      trials of a crashed worker are failed and re-enqueued on the next run.
+    - "journal": an append-only log file guarded by an open()-based lock,
+      which also works on NFS; use it when workers on several machines share
+      `storage_dir`.
+    - anything else is taken as an RDB URL (e.g. postgresql://...).
+    """
+    if kind == "journal":
+        os.makedirs(storage_dir, exist_ok=True)
+        path = os.path.join(storage_dir, "studies.log")
+        return JournalStorage(JournalFileBackend(path, lock_obj=JournalFileOpenLock(path)))
+
+    if kind == "sqlite":
+        os.makedirs(storage_dir, exist_ok=True)
+        url = f"sqlite:///{os.path.join(storage_dir, 'studies.db')}"
+        engine_kwargs = {"connect_args": {"timeout": 60}}
+    else:
+        url, engine_kwargs = kind, None
+    return RDBStorage(
+        url,
+        engine_kwargs=engine_kwargs,
+        heartbeat_interval=OPTUNA_HEARTBEAT_S,
+        grace_period=OPTUNA_HEARTBEAT_S * 4,
+        heartbeat_stale_trial_callback=RetryHeartbeatStaleTrialCallback(max_retry=2),
+    )
+
+
+def make_pruner(kind: str = OPTUNA_PRUNER, n_steps: int = OPTUNA_CV_SPLITS) -> optuna.pruners.BasePruner:
+    """
+    Pruner for objectives reporting once per CV fold (steps 0..n_steps-1).
+
+    Pruners are not kept in the study storage, so every process running
+    trials of a study builds its own from the same settings.
+    """
+    if kind == "hyperband":
+        return optuna.pruners.HyperbandPruner(min_resource=1, max_resource=n_steps, reduction_factor=3)
+    if kind == "sha":
+        return optuna.pruners.SuccessiveHalvingPruner(min_resource=1, reduction_factor=3)
+    if kind == "median":
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=0)
+    if kind == "none":
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"Unknown pruner '{kind}'")
+
+
+def ticker_study_name(ticker: str, storage=None, now: datetime = None) -> str:
+    """
+    Study the next optimization of `ticker` should run in: its latest study
+    if that never published a model (the run was interrupted, whichever job
+    or process started it), otherwise a new one.
+    """
+    storage = storage if storage is not None else get_storage()
+    prefix = f"{ticker.upper()}_optuna_"
+    studies = [s for s in optuna.get_all_study_summaries(storage, include_best_trial=False)
+               if s.study_name.startswith(prefix)]
+    if studies:
+        latest = max(studies, key=lambda s: s.study_name)
+        if not latest.user_attrs.get(PUBLISHED_ATTR):
+            return latest.study_name
+    return prefix + (now or datetime.now()).strftime("%Y%m%d_%H%M%S")
+
+
+def open_study(study_name: str, storage=None, pruner=None) -> optuna.Study:
+    """Create the study, or load it if an earlier (interrupted) run created it."""
+    storage = storage if storage is not None else get_storage()
+    study = optuna.create_study(study_name=study_name, storage=storage, direction="maximize",
+                                pruner=pruner or make_pruner(), load_if_exists=True)
+    if isinstance(storage, JournalStorage):
+        fail_stale_trials(study, storage)
+    return study
+
+
+def fail_stale_trials(study: optuna.Study, storage, max_age_s: float = OPTUNA_STALE_TRIAL_S,
+                      now: float = None) -> int:
+    """
+    Journal storage has no heartbeats: mark RUNNING trials older than
+    `max_age_s` as failed so a resumed study re-runs them. `storage` is the
+    one `study` was opened with.
+    """
+    now, failed = now or time.time(), 0
+    for trial in study.get_trials(deepcopy=False, states=(TrialState.RUNNING,)):
+        if trial.datetime_start and now - trial.datetime_start.timestamp() > max_age_s:
+            storage.set_trial_state_values(trial._trial_id, TrialState.FAIL)
+            study.enqueue_trial(trial.params, skip_if_exists=False)
+            failed += 1
+    if failed:
+        logger.warning(f"[!] Study {study.study_name}: failed {failed} stale trial(s) and re-enqueued their params")
+    return failed
+
+
+def finished_trials(study: optuna.Study) -> int:
+    return len(study.get_trials(deepcopy=False, states=FINISHED_STATES))
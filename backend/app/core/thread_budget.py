@@ -0,0 +1,70 @@
+import os
+import logging
+
+from app.config.thread_config import THREADS_INFERENCE, THREADS_BATCH, THREADS_TRAINING
+
+logger = logging.getLogger(__name__)
+
+BUDGETS = {
+    "inference": THREADS_INFERENCE,   # one row per call, many calls in parallel
+    "batch": THREADS_BATCH,           # one call over many rows (scans, contributions)
+    "training": THREADS_TRAINING,     # fits inside a training worker / Optuna trial
+}
+
+# Read by OpenMP / BLAS runtimes when they initialise; libraries imported later pick these up
+_THREAD_ENV = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+               "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+def threads_for(workload: str) -> int:
+    """Thread count for a workload class: 'inference', 'batch' or 'training'."""
+    try:
+        return BUDGETS[workload]
+    except KeyError:
+        raise ValueError(f"Unknown workload class '{workload}'") from None
+
+
+def model_params(workload: str) -> dict:
+    """Constructor kwargs for XGBoost/LightGBM/sklearn estimators (all accept n_jobs)."""
+    return {"n_jobs": threads_for(workload)}
+
+
+def set_model_threads(model, workload: str):
+    """Apply the budget to an already-built model or booster (e.g. one loaded from disk)."""
+    n = threads_for(workload)
+    booster = model.booster if hasattr(model, "schema") and hasattr(model, "booster") else model
+    module = type(booster).__module__
+    if module.startswith("xgboost"):
+        if hasattr(booster, "get_booster"):
+            booster.set_params(n_jobs=n)
+            booster = booster.get_booster()
+        booster.set_param({"nthread": n})
+    elif module.startswith("lightgbm"):
+        if hasattr(booster, "set_params"):
+            booster.set_params(n_jobs=n)
+        else:
+            booster.reset_parameter({"num_threads": n})
+    elif hasattr(booster, "n_jobs"):
+        booster.set_params(n_jobs=n)
+    return model
+
+
+def configure_process(workload: str) -> int:
+    """
+    Cap OpenMP and BLAS pools for this process at the workload's budget.
+
+    Call once at process start (API worker, training worker). Sets the
+    environment for runtimes not loaded yet and resizes the ones already
+    loaded via threadpoolctl. Per-call counts for XGBoost/LightGBM still
+    come from model_params / set_model_threads.
+    """
+    n = threads_for(workload)
+    for var in _THREAD_ENV:
+        os.environ[var] = str(n)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=n)
+    except ImportError:
+        pass
+    logger.info(f"✓ Thread budget: {workload} process capped at {n} thread(s)")
+    return n
@@ -0,0 +1,182 @@
+import time
+import json
+import asyncio
+import logging
+import threading
+
+from app.config.serving_config import ADMISSION_ENABLED, ADMISSION_CLASSES
+
+logger = logging.getLogger(__name__)
+
+# (method or None for any, path prefix, cost class); first match wins, unmatched routes are not limited
+ROUTE_CLASSES = [
+    ("POST", "/compare", "heavy"),
+    ("POST", "/predict/batch", "batch"),
+    (None, "/scan", "batch"),
+    ("POST", "/train", "training"),
+    ("POST", "/retrain", "training"),
+]
+
+
+class Rejected(Exception):
+    """Raised when a request is shed; carries the HTTP status and Retry-After seconds."""
+
+    def __init__(self, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+class CostClass:
+    """
+    Concurrency limit with a bounded FIFO wait queue for one class of routes.
+
+    A request runs at once while fewer than `concurrency` are in flight, waits
+    while fewer than `queue` are already waiting, and is otherwise rejected
+    immediately with 429. A waiter that is not admitted within `wait_s` is
+    rejected with 503. Retry-After is estimated from the class's recent
+    service time and the work already ahead.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue: int, wait_s: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.wait_s = wait_s
+        self.in_flight = 0
+        self._waiters: list[asyncio.Future] = []
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self.max_waiting = 0
+        self._service_ewma_s = None
+
+    def _retry_after(self, ahead: int) -> int:
+        service = self._service_ewma_s or self.wait_s
+        return max(1, round(service * (ahead + 1) / max(self.concurrency, 1)))
+
+    async def acquire(self):
+        with self._lock:
+            if self.in_flight < self.concurrency and not self._waiters:
+                self.in_flight += 1
+                self.admitted += 1
+                return
+            if len(self._waiters) >= self.queue:
+                self.rejected_full += 1
+                raise Rejected(429, self._retry_after(len(self._waiters) + self.in_flight),
+                               f"Too many '{self.name}' requests queued; retry later")
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self.max_waiting = max(self.max_waiting, len(self._waiters))
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.wait_s)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if waiter.done():
+                    return  # the slot was handed over as the timer fired
+                self._waiters.remove(waiter)
+                self.rejected_timeout += 1
+                retry_after = self._retry_after(len(self._waiters) + self.in_flight)
+            raise Rejected(503, retry_after, f"'{self.name}' capacity busy; retry later")
+        except asyncio.CancelledError:
+            # Client went away while queued: give up the place, or the slot if it was already handed over
+            with self._lock:
+                if waiter.done():
+                    self._release_locked()
+                else:
+                    self._waiters.remove(waiter)
+            raise
+
+    def _release_locked(self):
+        # Caller holds self._lock and runs on the event loop. The slot passes
+        # straight to the oldest waiter, so in_flight does not change.
+        while self._waiters:
+            waiter = self._waiters.pop(0)
+            if not waiter.done():
+                self.admitted += 1
+                waiter.set_result(True)
+                return
+        self.in_flight -= 1
+
+    def release(self, elapsed_s: float):
+        with self._lock:
+            ewma = self._service_ewma_s
+            self._service_ewma_s = elapsed_s if ewma is None else 0.8 * ewma + 0.2 * elapsed_s
+            self._release_locked()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "queue": self.queue,
+                "wait_s": self.wait_s,
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters),
+                "max_waiting": self.max_waiting,
+                "admitted": self.admitted,
+                "rejected_429": self.rejected_full,
+                "rejected_503": self.rejected_timeout,
+                "avg_service_ms": round(self._service_ewma_s * 1000, 1) if self._service_ewma_s else None,
+            }
+
+
+cost_classes = {name: CostClass(name, **limits) for name, limits in ADMISSION_CLASSES.items()}
+
+
+def classify(method: str, path: str):
+    """Cost class for a request, or None for routes that are never limited."""
+    for route_method, prefix, name in ROUTE_CLASSES:
+        if (route_method is None or route_method == method) and (path == prefix or path.startswith(prefix + "/")):
+            return cost_classes.get(name)
+    return None
+
+
+def admission_stats() -> dict:
+    return {"enabled": ADMISSION_ENABLED, "classes": {name: c.stats() for name, c in cost_classes.items()}}
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying the cost classes. The slot is held until the
+    response (including a streamed body) has been fully sent.
+    """
+
+    def __init__(self, app, enabled: bool = ADMISSION_ENABLED):
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        cost_class = classify(scope["method"], scope["path"])
+        if cost_class is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            await cost_class.acquire()
+        except Rejected as e:
+            logger.warning(f"[!] Shed {scope['method']} {scope['path']} ({cost_class.name}): {e.status_code}")
+            return await _reject(send, e)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            cost_class.release(time.perf_counter() - start)
+
+
+async def _reject(send, e: Rejected):
+    body = json.dumps({"detail": e.detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": e.status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(e.retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
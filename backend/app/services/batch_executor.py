@@ -0,0 +1,87 @@
+import time
+import asyncio
+import logging
+
+from app.config.serving_config import BATCH_MAX_CONCURRENCY, BATCH_ITEM_TIMEOUT_S, BATCH_TOTAL_TIMEOUT_S
+
+logger = logging.getLogger(__name__)
+
+
+def _entry(status: str, start: float, result=None, error: str = None) -> dict:
+    entry = {"status": status, "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}
+    if result is not None:
+        entry["result"] = result
+    if error is not None:
+        entry["error"] = error
+    return entry
+
+
+def _unique(tickers: list[str]) -> list[str]:
+    return list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+
+
+async def iter_batch(
+    tickers: list[str],
+    fn,
+    max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    item_timeout: float = BATCH_ITEM_TIMEOUT_S,
+    total_timeout: float = BATCH_TOTAL_TIMEOUT_S,
+):
+    """
+    Run the coroutine function `fn(ticker)` for every ticker with bounded concurrency.
+
+    Yields (ticker, entry) pairs in completion order. Each ticker gets its own
+    deadline of min(item_timeout, time left in the batch budget); tickers still
+    waiting for a slot when the budget runs out are reported as "skipped". Entry
+    status is one of "ok", "error", "timeout" or "skipped", with elapsed_ms.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + total_timeout
+    slots = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(ticker: str):
+        start = time.perf_counter()
+        try:
+            async with slots:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return ticker, _entry("skipped", start, error="Batch time budget exhausted")
+                result = await asyncio.wait_for(fn(ticker), timeout=min(item_timeout, remaining))
+            return ticker, _entry("ok", start, result=result)
+        except asyncio.TimeoutError:
+            return ticker, _entry("timeout", start, error=f"No result within {min(item_timeout, total_timeout)}s")
+        except Exception as e:
+            logger.error(f"[!] Batch item failed for {ticker}: {e}")
+            return ticker, _entry("error", start, error=str(getattr(e, "detail", None) or e))
+
+    tasks = [asyncio.create_task(run_one(t)) for t in _unique(tickers)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Consumer went away (e.g. a streaming client disconnected): stop outstanding work
+        for task in tasks:
+            task.cancel()
+
+
+async def run_batch(tickers: list[str], fn, **limits) -> dict:
+    """Collect iter_batch into a response with per-ticker status/timing and a summary."""
+    start = time.perf_counter()
+    results = {}
+    async for ticker, entry in iter_batch(tickers, fn, **limits):
+        results[ticker] = entry
+
+    # Report in request order, not completion order
+    results = {t: results[t] for t in _unique(tickers)}
+    counts = {}
+    for entry in results.values():
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+
+    return {
+        "results": results,
+        "summary": {
+            "requested": len(results),
+            **{status: counts.get(status, 0) for status in ("ok", "error", "timeout", "skipped")},
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        },
+    }
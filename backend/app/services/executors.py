@@ -0,0 +1,43 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+import anyio.to_thread
+
+from app.config.serving_config import IO_THREADS, CPU_WORKERS
+
+# CPU-bound stages (features, scoring, explanations) run on their own pool so
+# they never queue behind slow network calls, and vice versa. NumPy, pandas and
+# the tree libraries release the GIL for the heavy parts, so threads suffice.
+_cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="cpu")
+_io_limiter = None
+
+
+def _get_io_limiter() -> anyio.CapacityLimiter:
+    # Created lazily: the limiter binds to the running event loop's backend
+    global _io_limiter
+    if _io_limiter is None:
+        _io_limiter = anyio.CapacityLimiter(IO_THREADS)
+    return _io_limiter
+
+
+async def run_io(fn, *args, **kwargs):
+    """Run a blocking I/O call (yfinance, disk) on the dedicated I/O thread budget."""
+    return await anyio.to_thread.run_sync(functools.partial(fn, *args, **kwargs), limiter=_get_io_limiter())
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """Run a CPU-heavy step on the dedicated CPU executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_cpu_executor, functools.partial(fn, *args, **kwargs))
+
+
+def executor_stats() -> dict:
+    limiter = _io_limiter
+    return {
+        "cpu_workers": CPU_WORKERS,
+        "cpu_queued": _cpu_executor._work_queue.qsize(),
+        "io_threads": IO_THREADS,
+        "io_borrowed": limiter.borrowed_tokens if limiter else 0,
+    }
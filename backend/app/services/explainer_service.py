@@ -1,11 +1,132 @@
 import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
 
+from app.config.serving_config import EXPLAIN_TOP_K, EXPLAIN_CACHE_SIZE
+
 logger = logging.getLogger(__name__)
 
+
+# ───────────────────────────────────────────────────────────────
+# Native feature contributions
+# ───────────────────────────────────────────────────────────────
+
+class _ExplanationCache:
+    """Bounded LRU of top-k drivers keyed by (ticker, model version, bar date)."""
+
+    def __init__(self, max_entries: int = EXPLAIN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            drivers = self._entries.get(key)
+            if drivers is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return drivers
+
+    def put(self, key: tuple, drivers: list):
+        with self._lock:
+            self._entries[key] = drivers
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+explanation_cache = _ExplanationCache()
+
+
+def top_drivers(contributions: np.ndarray, values: np.ndarray, names: list[str], k: int = EXPLAIN_TOP_K) -> list[dict]:
+    """
+    The k features with the largest |contribution| for one row.
+
+    `contributions` is the row from engine.predict_contributions (bias last),
+    `values` the model-ordered inputs it was computed from.
+    """
+    per_feature = contributions[:-1]
+    order = np.argsort(-np.abs(per_feature), kind="stable")[:k]
+    return [
+        {
+            "feature": names[i],
+            "value": None if np.isnan(values[i]) else round(float(values[i]), 6),
+            "contribution": round(float(per_feature[i]), 6),
+        }
+        for i in order
+    ]
+
+
+def driver_rows(engine, X, k: int = EXPLAIN_TOP_K):
+    """
+    Score rows and explain them in one contribution pass.
+
+    Returns (labels, probabilities, drivers per row).
+    """
+    values = engine.prepare(X)
+    labels, proba, contributions = engine.explain(values)
+    names = engine.feature_schema.inputs if engine.feature_schema is not None else engine.feature_names
+    drivers = [top_drivers(contributions[i], values[i], names, k) for i in range(len(values))]
+    return labels, proba, drivers
+
+
+def explain_prediction(ticker: str, engine, X: pd.DataFrame, version: str = None, k: int = EXPLAIN_TOP_K):
+    """
+    Top-k drivers of the latest row of `X`, cached per (ticker, model version, bar).
+
+    Returns (drivers, scored). On a cache miss the row is scored and explained
+    in one contribution pass and `scored` is its (label, probability), so the
+    caller does not score it again; on a hit `scored` is None. `drivers` is
+    None when the engine has no native contribution output (library fallback
+    models), so callers can fall back to explain_signal.
+    """
+    if getattr(engine, "booster", None) is None:
+        return None, None
+    key = (ticker.upper(), version, X.index[-1], k)
+    drivers = explanation_cache.get(key)
+    if drivers is not None:
+        return drivers, None
+    labels, proba, rows = driver_rows(engine, X.iloc[[-1]], k)
+    explanation_cache.put(key, rows[0])
+    return rows[0], (int(labels[0]), float(proba[0]))
+
+
+def describe_drivers(drivers: list[dict], signal: int) -> str:
+    """Sentence form of the drivers, for clients that show `explanation` as text."""
+    def fmt(d):
+        value = "n/a" if d["value"] is None else f"{d['value']:.4g}"
+        return f"{d['feature']}={value} ({d['contribution']:+.3f})"
+
+    toward = [fmt(d) for d in drivers if d["contribution"] > 0]
+    against = [fmt(d) for d in drivers if d["contribution"] <= 0]
+    header = "Model outlook: BUY." if signal else "Model outlook: HOLD."
+    parts = [header]
+    if toward:
+        parts.append("Pushing toward BUY: " + ", ".join(toward) + ".")
+    if against:
+        parts.append("Pushing toward HOLD: " + ", ".join(against) + ".")
+    return " ".join(parts)
+
+
+# ───────────────────────────────────────────────────────────────
+# Rule-based fallback
+# ───────────────────────────────────────────────────────────────
+
 def explain_signal(df: pd.DataFrame) -> str:
     """
     Constructs a structured explanation from the latest technical indicators.
+    Used when the model has no native contribution output.
 
     Required indicators: RSI, SMA_20, MACD, Close.
     """
@@ -0,0 +1,179 @@
+import time
+import logging
+from datetime import datetime
+
+import joblib
+import pandas as pd
+from sklearn.metrics import confusion_matrix
+
+from app.services.data_provider import get_stock_data
+from app.core.features import generate_features
+from app.core.fitting import continue_boosting, boosted_rounds
+from app.services.trainer import (
+    get_model_path, load_model, save_model, read_metadata, write_metadata, ModelNotFoundError
+)
+from app.config.training_config import (
+    INCREMENTAL_ROUNDS, INCREMENTAL_LEARNING_RATE, INCREMENTAL_MIN_ROWS, INCREMENTAL_MIN_EVAL_ROWS,
+    INCREMENTAL_F1_TOLERANCE, INCREMENTAL_MAX_TREES, FULL_RETRAIN_DAYS, FULL_RETRAIN_TRIALS
+)
+
+logger = logging.getLogger(__name__)
+
+# TARGET compares the close 3 bars ahead; the last bars' labels are not known yet
+LABEL_HORIZON = 3
+
+
+# ───────────────────────────────────────────────────────────────
+# Refresh state (kept in the model's .meta.json)
+# ───────────────────────────────────────────────────────────────
+
+def labelled_through(X: pd.DataFrame):
+    """Last bar whose label is final."""
+    return X.index[max(0, len(X) - 1 - LABEL_HORIZON)]
+
+
+def full_training_state(X: pd.DataFrame, baseline_f1: float) -> dict:
+    """Metadata fields that start a new incremental cycle after a full training."""
+    now = datetime.utcnow().isoformat()
+    return {
+        "trained_through": str(labelled_through(X)),
+        "full_trained_at": now,
+        "baseline_f1": float(baseline_f1),
+        "incremental_updates": 0,
+        # Predictions on bars the model had not seen yet, accumulated until the next full training
+        "unseen": {"tn": 0, "fp": 0, "fn": 0, "tp": 0},
+        "updated_at": now,
+    }
+
+
+def _unseen_f1(counts: dict):
+    if sum(counts.values()) < INCREMENTAL_MIN_EVAL_ROWS:
+        return None
+    tp, fp, fn = counts["tp"], counts["fp"], counts["fn"]
+    return 2 * tp / (2 * tp + fp + fn) if tp else 0.0
+
+
+def _schedule_reason(meta: dict, now: datetime):
+    if "trained_through" not in meta:
+        return "no incremental state"
+    age_days = (now - datetime.fromisoformat(meta["full_trained_at"])).total_seconds() / 86400
+    if age_days >= FULL_RETRAIN_DAYS:
+        return f"last full training {age_days:.1f} days ago"
+    if meta.get("n_trees", 0) >= INCREMENTAL_MAX_TREES:
+        return f"{meta['n_trees']} trees after incremental updates"
+    return None
+
+
+def _train_full(ticker: str, artifact_name: str, source: str = None) -> dict:
+    """
+    Retrain the way the served model was produced. Only models written by
+    train_model are retrained with it; tuned (or unknown) models get the
+    same deeper Optuna search /retrain queues, so a tuned model type and its
+    threshold are never replaced by train_model's defaults.
+    """
+    if source == "train_model":
+        from app.services.trainer import train_model
+        train_model(ticker, artifact_name=artifact_name)
+        return {"retrained_with": "train_model"}
+
+    from app.services.job_queue import enqueue
+    job, created = enqueue("optimize", ticker, {"n_trials": FULL_RETRAIN_TRIALS})
+    return {"retrained_with": "optimize", "job_id": job["id"], "queued": created}
+
+
+# ───────────────────────────────────────────────────────────────
+# Refresh
+# ───────────────────────────────────────────────────────────────
+
+def refresh_model(ticker: str, artifact_name: str = "model", full_retrain=None, now: datetime = None) -> dict:
+    """
+    Bring the served model up to date with the bars since it was last trained.
+
+    Normally this continues boosting the existing model with
+    INCREMENTAL_ROUNDS rounds fitted on only the new labelled bars, which takes
+    seconds. `full_retrain(ticker, artifact_name)` runs instead (default:
+    train_model for models it produced, otherwise a queued Optuna job) when:
+    - the last full training is FULL_RETRAIN_DAYS old;
+    - the model has grown to INCREMENTAL_MAX_TREES trees;
+    - there is no refresh state or sklearn artifact to continue from;
+    - the feature set changed;
+    - validation degraded: F1 on bars scored before the model saw them
+      (accumulated since the last full training) is more than
+      INCREMENTAL_F1_TOLERANCE below that training's F1.
+
+    Returns what was done: {"mode": "incremental" | "full" | "skipped", ...}.
+    """
+    start = time.perf_counter()
+    ticker = ticker.upper()
+    meta = read_metadata(ticker, artifact_name)
+    full_retrain = full_retrain or (lambda t, a: _train_full(t, a, meta.get("source")))
+
+    def full(reason: str) -> dict:
+        logger.info(f"▶ Full retrain for {ticker}: {reason}")
+        outcome = full_retrain(ticker, artifact_name)
+        return {"mode": "full", "reason": reason, **(outcome if isinstance(outcome, dict) else {}),
+                "seconds": round(time.perf_counter() - start, 2)}
+
+    reason = _schedule_reason(meta, now or datetime.utcnow())
+    if reason:
+        return full(reason)
+    try:
+        model = joblib.load(get_model_path(ticker, artifact_name))  # sklearn wrapper, needed to continue fitting
+    except FileNotFoundError:
+        return full("no sklearn artifact to continue from")
+
+    X, y = generate_features(get_stock_data(ticker), ticker=ticker)
+    if list(X.columns) != list(getattr(model, "feature_names_in_", X.columns)):
+        return full("feature set changed")
+
+    through = labelled_through(X)
+    new = (X.index > pd.Timestamp(meta["trained_through"])) & (X.index <= through)
+    X_new, y_new = X[new], y[new]
+    if len(X_new) < INCREMENTAL_MIN_ROWS or y_new.nunique() < 2:
+        detail = "" if y_new.nunique() > 1 else ", one class only"
+        return {"mode": "skipped", "reason": f"{len(X_new)} new labelled bars{detail}", "rows": int(len(X_new))}
+
+    # Score the new bars before training on them: an out-of-sample validation of the served model
+    tn, fp, fn, tp = confusion_matrix(y_new, model.predict(X_new), labels=[0, 1]).ravel()
+    unseen = {k: meta["unseen"][k] + int(v) for k, v in zip(("tn", "fp", "fn", "tp"), (tn, fp, fn, tp))}
+    f1 = _unseen_f1(unseen)
+    if f1 is not None and f1 < meta["baseline_f1"] - INCREMENTAL_F1_TOLERANCE:
+        return full(f"F1 on unseen bars {f1:.3f} below baseline {meta['baseline_f1']:.3f}")
+
+    updated = continue_boosting(model, X_new, y_new, INCREMENTAL_ROUNDS, INCREMENTAL_LEARNING_RATE)
+    threshold = float(getattr(_served(ticker, artifact_name), "threshold", 0.5))
+    save_model(updated, ticker, artifact_name, threshold=threshold)
+
+    meta.update({
+        "trained_through": str(through),
+        "incremental_updates": meta.get("incremental_updates", 0) + 1,
+        "unseen": unseen,
+        "unseen_f1": f1,
+        "n_trees": boosted_rounds(updated),
+        "updated_at": datetime.utcnow().isoformat(),
+    })
+    write_metadata(meta, ticker, artifact_name)
+    seconds = round(time.perf_counter() - start, 2)
+    logger.info(f"✓ Incremental update for {ticker}: {len(X_new)} new bars, +{INCREMENTAL_ROUNDS} rounds "
+                f"({meta['n_trees']} trees) in {seconds}s")
+    return {"mode": "incremental", "rows": int(len(X_new)), "n_trees": meta["n_trees"],
+            "unseen_f1": f1, "seconds": seconds}
+
+
+def _served(ticker: str, artifact_name: str):
+    try:
+        return load_model(ticker, artifact_name)
+    except ModelNotFoundError:
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Refresh saved models with the bars since their last training.")
+    parser.add_argument("tickers", nargs="+")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    for symbol in args.tickers:
+        print(f"{symbol.upper()}: {refresh_model(symbol)}")
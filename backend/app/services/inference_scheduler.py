@@ -0,0 +1,142 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from app.config.serving_config import (
+    INFERENCE_BATCHING, INFERENCE_BATCH_WINDOW_MS, INFERENCE_BATCH_MAX_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _Work:
+    __slots__ = ("engine", "rows", "future")
+
+    def __init__(self, engine, rows, future):
+        self.engine = engine
+        self.rows = rows
+        self.future = future
+
+
+def _stack(parts):
+    if isinstance(parts[0], pd.DataFrame):
+        return pd.concat(parts, ignore_index=True)
+    return np.vstack(parts)
+
+
+class InferenceScheduler:
+    """
+    Micro-batching front end for engine.predict.
+
+    Callers submit rows for a given engine and get a Future. A single worker
+    thread drains the queue, lingering up to `window_ms` (or until `max_batch`
+    items) once the first item arrives, then groups the items by engine, runs
+    one vectorized predict per group and fans the slices back out. With no
+    concurrent traffic the added latency is bounded by the window.
+    """
+
+    def __init__(self, window_ms: float = INFERENCE_BATCH_WINDOW_MS,
+                 max_batch: int = INFERENCE_BATCH_MAX_SIZE, enabled: bool = INFERENCE_BATCHING):
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.enabled = enabled
+        self._queue: "queue.Queue[_Work]" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._groups = 0
+        self._largest_batch = 0
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+                self._thread.start()
+
+    def submit(self, engine, rows) -> Future:
+        """Queue `rows` for scoring against `engine`; resolves to (labels, probabilities)."""
+        future = Future()
+        if not self.enabled:
+            try:
+                future.set_result(engine.predict(engine.prepare(rows)))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        self._ensure_worker()
+        self._queue.put(_Work(engine, engine.prepare(rows), future))
+        return future
+
+    def predict(self, engine, rows, timeout: float = None):
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(engine, rows).result(timeout=timeout)
+
+    # ─── Worker ───────────────────────────────────────────────────────────────
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._flush(batch)
+            except Exception as e:
+                logger.exception(f"[!] Inference batch failed: {e}")
+
+    def _flush(self, batch: list):
+        groups: dict[int, list[_Work]] = {}
+        for work in batch:
+            groups.setdefault(id(work.engine), []).append(work)
+
+        for items in groups.values():
+            engine = items[0].engine
+            try:
+                sizes = [len(w.rows) for w in items]
+                labels, proba = engine.predict(_stack([w.rows for w in items]))
+                offset = 0
+                for work, size in zip(items, sizes):
+                    work.future.set_result((labels[offset:offset + size], proba[offset:offset + size]))
+                    offset += size
+            except Exception as e:
+                for work in items:
+                    if not work.future.done():
+                        work.future.set_exception(e)
+
+        with self._stats_lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._groups += len(groups)
+            self._largest_batch = max(self._largest_batch, len(batch))
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "enabled": self.enabled,
+                "window_ms": self.window * 1000,
+                "max_batch": self.max_batch,
+                "queued": self._queue.qsize(),
+                "batches": self._batches,
+                "items": self._items,
+                "predict_calls": self._groups,
+                "avg_batch_size": round(self._items / self._batches, 2) if self._batches else None,
+                "largest_batch": self._largest_batch,
+            }
+
+
+# Shared instance used by the predict path
+inference_scheduler = InferenceScheduler()
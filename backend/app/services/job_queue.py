@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import uuid
+import signal
+import sqlite3
+import logging
+import multiprocessing
+from contextlib import contextmanager
+
+from app.config.serving_config import JOBS_DB_PATH, TRAINING_WORKERS
+from app.core.thread_budget import configure_process
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           TEXT PRIMARY KEY,
+    kind         TEXT NOT NULL,
+    ticker       TEXT NOT NULL,
+    params       TEXT NOT NULL,
+    dedup_key    TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    progress     REAL NOT NULL DEFAULT 0,
+    message      TEXT,
+    result       TEXT,
+    error        TEXT,
+    worker_pid   INTEGER,
+    created_at   REAL NOT NULL,
+    started_at   REAL,
+    finished_at  REAL
+);
+-- At most one active job per (kind, ticker, params); finished jobs do not block new ones
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_dedup ON jobs(dedup_key) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_ticker_created ON jobs(ticker, created_at);
+"""
+
+_COLUMNS = ("id", "kind", "ticker", "params", "status", "progress", "message", "result",
+            "error", "worker_pid", "created_at", "started_at", "finished_at")
+
+_initialized = set()
+
+
+@contextmanager
+def _connect(path: str = None):
+    # One short-lived connection per operation: safe across threads and worker processes
+    path = path or JOBS_DB_PATH
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        if path not in _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _initialized.add(path)
+        yield conn
+    finally:
+        conn.close()
+
+
+def _row_to_job(row) -> dict:
+    job = dict(zip(_COLUMNS, row))
+    job["params"] = json.loads(job["params"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def _dedup_key(kind: str, ticker: str, params: dict) -> str:
+    return f"{kind}:{ticker}:{json.dumps(params, sort_keys=True)}"
+
+
+# ───────────────────────────────────────────────────────────────
+# Queue API
+# ───────────────────────────────────────────────────────────────
+
+def enqueue(kind: str, ticker: str, params: dict = None, path: str = None):
+    """
+    Queue a job unless an identical one is already queued or running.
+
+    Returns (job, created) where `created` is False for a deduplicated request.
+    """
+    ticker = ticker.upper()
+    params = params or {}
+    key = _dedup_key(kind, ticker, params)
+
+    with _connect(path) as conn:
+        try:
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, kind, ticker, params, dedup_key, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                (job_id, kind, ticker, json.dumps(params), key, time.time()),
+            )
+            created = True
+        except sqlite3.IntegrityError:
+            job_id = conn.execute(
+                "SELECT id FROM jobs WHERE dedup_key = ? AND status IN ('queued', 'running')", (key,)
+            ).fetchone()[0]
+            created = False
+
+    return get_job(job_id, path), created
+
+
+def get_job(job_id: str, path: str = None):
+    with _connect(path) as conn:
+        row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _row_to_job(row) if row else None
+
+
+def list_jobs(ticker: str = None, limit: int = 50, path: str = None) -> list[dict]:
+    query = f"SELECT {', '.join(_COLUMNS)} FROM jobs"
+    args = []
+    if ticker:
+        query += " WHERE ticker = ?"
+        args.append(ticker.upper())
+    query += " ORDER BY created_at DESC LIMIT ?"
+    args.append(limit)
+    with _connect(path) as conn:
+        return [_row_to_job(r) for r in conn.execute(query, args).fetchall()]
+
+
+def claim_next(worker_pid: int, path: str = None):
+    """Atomically move the oldest queued job to running and return it."""
+    with _connect(path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', worker_pid = ?, started_at = ?, message = 'started' "
+            "WHERE id = ?",
+            (worker_pid, time.time(), row[0]),
+        )
+        conn.execute("COMMIT")
+    return get_job(row[0], path)
+
+
+def update_progress(job_id: str, progress: float, message: str = None, path: str = None):
+    with _connect(path) as conn:
+        conn.execute(
+            "UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE id = ?",
+            (round(progress, 4), message, job_id),
+        )
+
+
+def _finish(job_id: str, status: str, result=None, error: str = None, path: str = None):
+    with _connect(path) as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, progress = CASE WHEN ? = 'succeeded' THEN 1 ELSE progress END, "
+            "result = ?, error = ?, finished_at = ?, message = ? WHERE id = ?",
+            (status, status, json.dumps(result) if result is not None else None, error,
+             time.time(), status, job_id),
+        )
+
+
+def requeue_orphans(path: str = None) -> int:
+    """Return jobs left 'running' by a worker process that no longer exists to the queue."""
+    requeued = 0
+    with _connect(path) as conn:
+        for job_id, pid in conn.execute(
+            "SELECT id, worker_pid FROM jobs WHERE status = 'running'"
+        ).fetchall():
+            if pid and _pid_alive(pid):
+                continue
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', worker_pid = NULL, message = 'requeued' WHERE id = ?",
+                (job_id,),
+            )
+            requeued += 1
+    return requeued
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# ───────────────────────────────────────────────────────────────
+# Job execution
+# ───────────────────────────────────────────────────────────────
+
+def _run_job(job: dict, path: str = None):
+    kind, ticker, params = job["kind"], job["ticker"], job["params"]
+
+    if kind == "optimize":
+        from app.core.optimizer import run_optimization
+        from app.core.study_storage import finished_trials
+
+        n_trials = int(params.get("n_trials", 50))
+
+        def report(study, trial):
+            # Counts trials finished by every process working on the study
+            done = finished_trials(study)
+            update_progress(job["id"], min(done / n_trials, 0.99), f"trial {done}/{n_trials}", path)
+
+        # The ticker's unpublished study is resumed, whether this job was requeued or is a new /retrain
+        return run_optimization(ticker=ticker, n_trials=n_trials, callbacks=[report],
+                                timeout_s=params.get("timeout_s"))
+
+    if kind == "train":
+        from app.services.trainer import train_model
+
+        update_progress(job["id"], 0.1, "training baseline model", path)
+        _, metrics = train_model(ticker, return_metrics=True, **params)
+        return {"metrics": metrics}
+
+    raise ValueError(f"Unknown job kind '{kind}'")
+
+
+def worker_loop(poll_interval: float = 1.0, path: str = None):
+    """Claim and run jobs until SIGTERM/SIGINT."""
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    configure_process("training")
+    pid = os.getpid()
+    logger.info(f"✓ Training worker {pid} started")
+
+    while not stopping:
+        job = claim_next(pid, path)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        logger.info(f"▶ Worker {pid} running {job['kind']} job {job['id']} for {job['ticker']}")
+        try:
+            result = _run_job(job, path)
+            _finish(job["id"], "succeeded", result=result, path=path)
+            logger.info(f"✓ Job {job['id']} succeeded")
+        except Exception as e:
+            logger.exception(f"[!] Job {job['id']} failed: {e}")
+            _finish(job["id"], "failed", error=str(e), path=path)
+
+
+_workers: list = []
+
+
+def start_workers(n: int = TRAINING_WORKERS) -> list:
+    """Spawn `n` training worker processes (after requeueing jobs orphaned by a crash)."""
+    requeued = requeue_orphans()
+    if requeued:
+        logger.warning(f"[!] Requeued {requeued} orphaned training job(s)")
+
+    ctx = multiprocessing.get_context("spawn")
+    for i in range(n):
+        proc = ctx.Process(target=worker_loop, name=f"training-worker-{i}", daemon=True)
+        proc.start()
+        _workers.append(proc)
+    return _workers
+
+
+def stop_workers(timeout: float = 10.0):
+    for proc in _workers:
+        if proc.is_alive():
+            proc.terminate()
+    for proc in _workers:
+        proc.join(timeout)
+    _workers.clear()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run training workers against the local job queue.")
+    parser.add_argument("--workers", type=int, default=TRAINING_WORKERS, help="Number of worker processes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    procs = start_workers(args.workers)
+    try:
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        stop_workers()
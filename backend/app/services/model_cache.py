@@ -0,0 +1,154 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+import joblib
+
+from app.config.serving_config import MODEL_CACHE_MAX_ENTRIES, MODEL_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("value", "version", "size", "loaded_at")
+
+    def __init__(self, value, version, size):
+        self.value = value
+        self.version = version
+        self.size = size
+        self.loaded_at = time.time()
+
+
+class ModelCache:
+    """
+    Process-wide LRU cache of deserialized model artifacts.
+
+    Entries are keyed by (namespace, path) and versioned by the file's
+    (mtime_ns, size). A lookup stats the file and reloads it when the version
+    changed, so an artifact replaced on disk (see trainer.save_model, which
+    writes via os.replace) is picked up on the next request without a restart.
+    Readers keep using the previous object until the new one is fully loaded.
+
+    The cache is bounded by entry count and by the summed on-disk size of the
+    artifacts it holds, which is a cheap proxy for their in-memory footprint.
+    """
+
+    def __init__(self, max_entries: int = MODEL_CACHE_MAX_ENTRIES, max_bytes: int = MODEL_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: dict[tuple, threading.Lock] = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._loads = 0
+        self._reloads = 0
+        self._evictions = 0
+        self._load_seconds = 0.0
+        self._last_load_ms = None
+
+    @staticmethod
+    def _version(path: str) -> tuple:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def get(self, path: str, loader=joblib.load, namespace: str = "model"):
+        """Return the cached object for `path`, (re)loading it if stale or missing."""
+        key = (namespace, os.path.abspath(path))
+        version = self._version(path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.value
+            self._misses += 1
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Single-flight: concurrent misses on the same key wait for one load.
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.version == self._version(path):
+                    self._entries.move_to_end(key)
+                    return entry.value
+
+            start = time.perf_counter()
+            value = loader(path)
+            elapsed = time.perf_counter() - start
+            # Re-stat after loading so a write that raced the load is caught next time.
+            version = self._version(path)
+
+            with self._lock:
+                self._loads += 1
+                self._load_seconds += elapsed
+                self._last_load_ms = round(elapsed * 1000, 2)
+                if key in self._entries:
+                    self._reloads += 1
+                self._store(key, _Entry(value, version, version[1]))
+
+        logger.info(f"✓ Loaded {namespace} from {path} in {elapsed * 1000:.1f}ms")
+        return value
+
+    def put(self, path: str, value, namespace: str = "model"):
+        """Swap in an already-built object for `path` (e.g. right after saving it)."""
+        key = (namespace, os.path.abspath(path))
+        version = self._version(path)
+        with self._lock:
+            self._store(key, _Entry(value, version, version[1]))
+
+    def invalidate(self, path: str = None):
+        """Drop every namespace cached for `path`, or the whole cache if no path is given."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            target = os.path.abspath(path)
+            for key in [k for k in self._entries if k[1] == target]:
+                self._bytes -= self._entries.pop(key).size
+
+    def _store(self, key: tuple, entry: _Entry):
+        # Caller holds self._lock.
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self._evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                "loads": self._loads,
+                "reloads": self._reloads,
+                "evictions": self._evictions,
+                "avg_load_ms": round(self._load_seconds / self._loads * 1000, 2) if self._loads else None,
+                "last_load_ms": self._last_load_ms,
+                "cached": [
+                    {"namespace": ns, "path": p, "bytes": e.size, "loaded_at": e.loaded_at}
+                    for (ns, p), e in self._entries.items()
+                ],
+            }
+
+
+# Shared instance used by the serving path
+model_cache = ModelCache()
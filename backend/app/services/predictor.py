@@ -1,11 +1,14 @@
 import os
-import numpy as np
+import asyncio
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.services.data_provider import get_stock_data
-from app.services.trainer import load_model
+from app.services.trainer import load_engine, get_model_version
+from app.services.inference_scheduler import inference_scheduler
+from app.services.executors import run_io, run_cpu
+from app.services.batch_executor import run_batch
 from app.core.features import generate_features
-from app.services.explainer_service import explain_signal  # renamed from app.explain
+from app.services.explainer_service import explain_signal, explain_prediction, describe_drivers
 import logging
 
 bearer = HTTPBearer()
@@ -19,50 +22,91 @@ def require_token(creds: HTTPAuthorizationCredentials = Depends(bearer)):
     return True
 
 
-def generate_prediction(ticker: str) -> dict:
-    df = get_stock_data(ticker)
+def _build_features(df, ticker: str):
     if df is None or df.empty:
         raise ValueError(f"No data for '{ticker.upper()}'")
 
     X, _ = generate_features(df, ticker=ticker)
     if X.empty:
         raise ValueError("Not enough data to compute features")
+    return X
+
+
+def _volatility_regime(X):
+    if "VOL_REGIME" not in X.columns or X["VOL_REGIME"].isna().iloc[-1]:
+        return None
+    return "high" if X["VOL_REGIME"].iloc[-1] else "low"
+
 
-    model = load_model(ticker)
-    row = X.iloc[[-1]].values
+def _explain(ticker: str, engine, X, version: str):
+    """
+    (drivers, scored) of the latest row, see explain_prediction. Drivers not
+    cached yet come from one contribution pass that also scores the row;
+    `scored` is None when the inference scheduler still has to score it
+    (drivers cached, no native contributions, or the pass failed).
+    """
+    try:
+        return explain_prediction(ticker, engine, X, version)
+    except Exception as e:
+        logger.warning(f"[!] Explanation failed: {e}")
+        return None, None
 
-    pred = model.predict(row)[0]
-    proba = model.predict_proba(row)[0][int(pred)]
+
+def _build_payload(ticker: str, X, pred, proba_pos, drivers=None, version: str = None) -> dict:
+    proba = proba_pos if pred else 1.0 - proba_pos
     confidence = round(float(proba) * 100, 2)
     directive = "BUY" if pred else "HOLD"
 
+    # Native contributions of the scored row, rules as fallback
     try:
-        explanation = explain_signal(X)
+        explanation = describe_drivers(drivers, int(pred)) if drivers else explain_signal(X)
     except Exception as e:
         logger.warning(f"[!] Explanation failed: {e}")
         explanation = "No explanation available."
 
     return {
         "ticker": ticker.upper(),
+        "date": str(X.index[-1].date()),
+        "model_version": version,
         "directive": directive,
         "signal": int(pred),
         "confidence_raw": float(proba),
         "trust_index": f"{confidence}%",
         "explanation": explanation,
+        "drivers": drivers or [],
+        "volatility_regime": _volatility_regime(X),
         "message": f"Signal Confidence: {confidence}%. No override."
     }
 
 
-def generate_batch_prediction(tickers: list[str]) -> dict:
-    results = {}
-    for ticker in tickers:
-        try:
-            results[ticker.upper()] = generate_prediction(ticker)
-        except Exception as e:
-            logger.error(f"[!] Batch prediction error for {ticker}: {e}")
-            results[ticker.upper()] = {"error": str(e)}
-    return results
-
-
-
-
+def generate_prediction(ticker: str) -> dict:
+    # Resolve the model first so a missing one fails fast, before any download
+    engine = load_engine(ticker)
+    X = _build_features(get_stock_data(ticker), ticker)
+    version = get_model_version(ticker)
+    drivers, scored = _explain(ticker, engine, X, version)
+    if scored is None:
+        preds, probas = inference_scheduler.predict(engine, X.iloc[[-1]])
+        scored = preds[0], probas[0]
+    return _build_payload(ticker, X, *scored, drivers, version)
+
+
+async def generate_prediction_async(ticker: str) -> dict:
+    """Same pipeline as generate_prediction, awaiting I/O and offloading CPU stages."""
+    engine = await run_cpu(load_engine, ticker)
+    df = await run_io(get_stock_data, ticker)
+    X = await run_cpu(_build_features, df, ticker)
+    version = await run_io(get_model_version, ticker)
+    drivers, scored = await run_cpu(_explain, ticker, engine, X, version)
+    if scored is None:
+        preds, probas = await asyncio.wrap_future(inference_scheduler.submit(engine, X.iloc[[-1]]))
+        scored = preds[0], probas[0]
+    return await run_cpu(_build_payload, ticker, X, *scored, drivers, version)
+
+
+def generate_batch_prediction(tickers: list[str], **limits) -> dict:
+    """Blocking entry point for batch scoring outside the event loop (CLI, jobs)."""
+    async def predict_one(ticker: str):
+        return await run_cpu(generate_prediction, ticker)
+
+    return asyncio.run(run_batch(tickers, predict_one, **limits))
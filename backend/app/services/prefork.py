@@ -0,0 +1,111 @@
+import gc
+import os
+import time
+import signal
+import logging
+import threading
+
+from app.services.warmup import warm_start
+from app.services.trainer import MODEL_DIR
+
+logger = logging.getLogger(__name__)
+
+# Serving artifacts whose replacement should trigger a graceful reload
+_ARTIFACT_SUFFIXES = (".schema.json", ".ubj", ".lgb.txt", "_model.pkl")
+
+
+# ───────────────────────────────────────────────────────────────
+# Master-side preload (gunicorn preload_app)
+# ───────────────────────────────────────────────────────────────
+
+def preload_master(tickers: list[str] = None) -> dict:
+    """
+    Load and compile serving models in the master before workers fork.
+
+    Workers inherit the populated model cache, so its pages are shared
+    copy-on-write instead of each worker parsing its own copy. The heap is
+    then moved to the permanent GC generation (gc.freeze) so collections in
+    the workers do not write to the inherited objects' headers and un-share
+    their pages.
+    """
+    start = time.perf_counter()
+    # On reload, let models replaced since the last preload be collected
+    gc.unfreeze()
+    state = warm_start(tickers)
+    gc.collect()
+    gc.freeze()
+    logger.info(f"✓ Master preload: {len(state['loaded'])} model(s), {gc.get_freeze_count()} objects frozen "
+                f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+    return state
+
+
+def artifact_fingerprint(model_dir: str = MODEL_DIR) -> tuple:
+    """(name, mtime_ns, size) of every serving artifact; changes when a model is saved."""
+    entries = []
+    with os.scandir(model_dir) as it:
+        for entry in it:
+            if entry.name.endswith(_ARTIFACT_SUFFIXES):
+                st = entry.stat()
+                entries.append((entry.name, st.st_mtime_ns, st.st_size))
+    return tuple(sorted(entries))
+
+
+def watch_models(interval_s: float, pid: int = None, model_dir: str = MODEL_DIR) -> threading.Thread:
+    """
+    Poll the model directory and send SIGHUP to `pid` (the gunicorn master)
+    when artifacts change. On HUP the master re-runs the preload and forks
+    fresh workers, while old workers finish their in-flight requests.
+
+    A change is acted on once the directory has been stable for one full
+    interval, so a save that writes several files triggers a single reload.
+    """
+    pid = pid or os.getpid()
+
+    def loop():
+        current = artifact_fingerprint(model_dir)
+        pending = None
+        while True:
+            time.sleep(interval_s)
+            try:
+                seen = artifact_fingerprint(model_dir)
+            except OSError as e:
+                logger.warning(f"[!] Model watch failed: {e}")
+                continue
+            if seen == current:
+                pending = None
+            elif seen != pending:
+                pending = seen
+            else:
+                current, pending = seen, None
+                logger.info("✓ Model artifacts changed, reloading workers")
+                os.kill(pid, signal.SIGHUP)
+
+    thread = threading.Thread(target=loop, name="model-watch", daemon=True)
+    thread.start()
+    return thread
+
+
+# ───────────────────────────────────────────────────────────────
+# Memory accounting
+# ───────────────────────────────────────────────────────────────
+
+def process_memory(pid: int = None) -> dict:
+    """
+    RSS, PSS and shared/private bytes of a process from /proc/<pid>/smaps_rollup (Linux).
+
+    PSS splits each shared page between the processes mapping it, so the sum
+    of PSS over master and workers is the real footprint; a worker's private
+    bytes are its marginal cost.
+    """
+    fields = {}
+    with open(f"/proc/{pid or os.getpid()}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
@@ -0,0 +1,277 @@
+import time
+import logging
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from app.core.features import generate_panel_features, latest_sentiment, PANEL_FIELDS
+from app.services.explainer_service import driver_rows, explanation_cache
+from app.core.thread_budget import configure_process
+from app.services.trainer import load_engine, get_model_version, ModelNotFoundError
+from app.config.serving_config import (
+    SCAN_UNIVERSE, SCAN_HISTORY_START, SCAN_DOWNLOAD_CHUNK, SCAN_THREADS, SCAN_LATENCY_TARGET_MS, EXPLAIN_TOP_K
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _StageTimer:
+    """Accumulates wall time per named stage, in milliseconds."""
+
+    def __init__(self):
+        self.timings = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 1)
+
+
+# ───────────────────────────────────────────────────────────────
+# Stages
+# ───────────────────────────────────────────────────────────────
+
+def load_bars(tickers: list[str], start: str = SCAN_HISTORY_START, chunk: int = SCAN_DOWNLOAD_CHUNK) -> dict:
+    """
+    Bulk-download daily bars and return {field: wide (date × ticker) frame}.
+
+    One yfinance request per `chunk` symbols instead of one per ticker. The
+    history starts where get_stock_data's does, so cumulative indicators (OBV)
+    match the single-ticker path.
+    """
+    frames = []
+    for i in range(0, len(tickers), chunk):
+        batch = tickers[i:i + chunk]
+        df = yf.download(batch, start=start, interval="1d", auto_adjust=True,
+                         group_by="column", threads=True, progress=False)
+        if df is None or df.empty:
+            continue
+        if not isinstance(df.columns, pd.MultiIndex):
+            df.columns = pd.MultiIndex.from_product([df.columns, batch])
+        frames.append(df)
+
+    if not frames:
+        return {f: pd.DataFrame() for f in PANEL_FIELDS}
+    df = pd.concat(frames, axis=1).sort_index()
+    df.index = pd.to_datetime(df.index)
+    df = df[~df.index.duplicated(keep="first")]
+
+    bars = {f: df[f].astype(np.float64) for f in PANEL_FIELDS}
+    # get_stock_data drops a ticker's day if any field is missing; do the same per ticker
+    missing = np.logical_or.reduce([bars[f].isna().to_numpy() for f in PANEL_FIELDS])
+    return {f: frame.mask(missing) for f, frame in bars.items()}
+
+
+def _load_engines(tickers: list[str]) -> tuple[dict, list[str], dict]:
+    engines, missing, failed = {}, [], {}
+
+    def load(ticker):
+        try:
+            return ticker, load_engine(ticker), None
+        except ModelNotFoundError:
+            return ticker, None, "missing"
+        except Exception as e:
+            return ticker, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=SCAN_THREADS) as pool:
+        for ticker, engine, error in pool.map(load, tickers):
+            if engine is not None:
+                engines[ticker] = engine
+            elif error == "missing":
+                missing.append(ticker)
+            else:
+                failed[ticker] = error
+    return engines, missing, failed
+
+
+def _model_rows(values: np.ndarray, columns, engine) -> np.ndarray:
+    if getattr(engine, "feature_schema", None) is not None:
+        return values[:, engine.feature_schema.plan(columns)]
+    return values
+
+
+def _score(features: pd.DataFrame, engines: dict) -> tuple[dict, dict]:
+    """
+    Score each ticker's row against its own model, one predict call per
+    distinct engine (tickers sharing a model are scored together).
+    """
+    groups = {}
+    for pos, ticker in enumerate(features.index):
+        if ticker in engines:
+            groups.setdefault(id(engines[ticker]), []).append((pos, ticker))
+
+    # One float matrix for the whole universe; each model picks its columns by cached plan
+    matrix = features.drop(columns="date")
+    columns, values = matrix.columns, matrix.to_numpy(dtype=np.float64)
+
+    scores, failed = {}, {}
+    for group in groups.values():
+        positions, members = zip(*group)
+        engine = engines[members[0]]
+        try:
+            rows = _model_rows(values[list(positions)], columns, engine)
+            labels, proba = engine.predict(engine.prepare(rows))
+        except Exception as e:
+            failed.update({t: str(e) for t in members})
+            continue
+        for ticker, label, p in zip(members, labels, proba):
+            scores[ticker] = (int(label), float(p))
+    return scores, failed
+
+
+def _explain(features: pd.DataFrame, engines: dict, signals: list[dict]) -> None:
+    """
+    Attach top drivers to the returned signals, from each booster's native
+    contribution output. Shares the (ticker, version, bar) cache with
+    /predict; tickers whose model has no booster get no drivers.
+    """
+    matrix = features.drop(columns="date")
+    for signal in signals:
+        ticker, engine = signal["ticker"], engines[signal["ticker"]]
+        signal["drivers"] = []
+        if getattr(engine, "booster", None) is None:
+            continue
+        key = (ticker, signal["model_version"], features.at[ticker, "date"], EXPLAIN_TOP_K)
+        drivers = explanation_cache.get(key)
+        if drivers is None:
+            try:
+                rows = _model_rows(matrix.loc[[ticker]].to_numpy(dtype=np.float64), matrix.columns, engine)
+                drivers = driver_rows(engine, rows)[2][0]
+            except Exception as e:
+                logger.warning(f"[!] No drivers for {ticker}: {e}")
+                continue
+            explanation_cache.put(key, drivers)
+        signal["drivers"] = drivers
+
+
+# ───────────────────────────────────────────────────────────────
+# Scan
+# ───────────────────────────────────────────────────────────────
+
+def scan(tickers: list[str] = None, top: int = None, buy_only: bool = True,
+         latency_target_ms: float = SCAN_LATENCY_TARGET_MS, bars: dict = None, explain: bool = True) -> dict:
+    """
+    Screen a universe for signals in one bulk pass.
+
+    Stages: bulk bar download, vectorized panel features, sentiment lookups
+    for the scored rows only, model loading (via the shared model cache) and
+    batched scoring. Returns signals ranked by positive-class probability, a
+    per-stage timing breakdown and whether the scan met `latency_target_ms`.
+    Tickers that could not be scored are listed with the reason. With
+    `explain`, each returned signal carries its top feature contributions.
+
+    Models are loaded through the process-wide cache; set
+    MODEL_CACHE_MAX_ENTRIES at or above the universe size so repeated scans
+    do not reload them from disk.
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in (tickers or SCAN_UNIVERSE) if t.strip()))
+    timer = _StageTimer()
+    skipped = {}
+
+    with timer.stage("models_ms"):
+        engines, no_model, failed = _load_engines(tickers)
+    skipped.update({t: "no trained model" for t in no_model})
+    skipped.update(failed)
+    to_score = [t for t in tickers if t in engines]
+
+    with timer.stage("download_ms"):
+        if bars is None:
+            bars = load_bars(to_score) if to_score else {f: pd.DataFrame() for f in PANEL_FIELDS}
+        bars = {f: frame.reindex(columns=[t for t in to_score if t in frame.columns]) for f, frame in bars.items()}
+
+    with timer.stage("features_ms"):
+        features = generate_panel_features(bars) if not bars["Close"].empty else pd.DataFrame()
+    skipped.update({t: "no data" for t in to_score if features.empty or t not in features.index})
+
+    # Sentiment is per-ticker I/O (cached files or APIs); fetch it only for the scored rows
+    with timer.stage("sentiment_ms"):
+        if not features.empty and {"SOCIAL_SENTIMENT", "NEWS_SENTIMENT"} & set(features.columns):
+            calendar = pd.to_datetime(bars["Close"].index.date)
+            with ThreadPoolExecutor(max_workers=SCAN_THREADS) as pool:
+                values = list(pool.map(lambda t: latest_sentiment(t, features.at[t, "date"], calendar),
+                                       features.index))
+            for i, column in enumerate(("SOCIAL_SENTIMENT", "NEWS_SENTIMENT")):
+                if column in features.columns:
+                    features[column] = [v[i] for v in values]
+
+    with timer.stage("scoring_ms"):
+        scores, score_failed = _score(features, engines) if not features.empty else ({}, {})
+    skipped.update(score_failed)
+
+    results = []
+    for ticker, (label, proba) in scores.items():
+        if buy_only and not label:
+            continue
+        confidence = proba if label else 1.0 - proba
+        results.append({
+            "ticker": ticker,
+            "date": str(features.at[ticker, "date"].date()),
+            "directive": "BUY" if label else "HOLD",
+            "signal": label,
+            "proba": round(proba, 6),
+            "confidence": round(confidence * 100, 2),
+            "model_version": get_model_version(ticker),
+        })
+    results.sort(key=lambda r: r["proba"], reverse=True)
+    if top:
+        results = results[:top]
+
+    # Contributions cost more than scoring, so only the signals returned are explained
+    if explain:
+        with timer.stage("explain_ms"):
+            _explain(features, engines, results)
+
+    total_ms = timer.total_ms()
+    return {
+        "signals": results,
+        "summary": {
+            "requested": len(tickers),
+            "scored": len(scores),
+            "returned": len(results),
+            "skipped": len(skipped),
+        },
+        "skipped": skipped,
+        "timings": {**timer.timings, "total_ms": total_ms},
+        "latency_target_ms": latency_target_ms,
+        "within_target": total_ms <= latency_target_ms,
+    }
+
+
+def read_universe(path: str) -> list[str]:
+    """One symbol per line (or comma separated); blank lines and '#' comments ignored."""
+    with open(path) as f:
+        text = "\n".join(line.split("#", 1)[0] for line in f)
+    return [t.strip().upper() for t in text.replace(",", "\n").split() if t.strip()]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scan a universe of tickers for signals.")
+    parser.add_argument("tickers", nargs="*", help="Tickers to scan (default: SCAN_UNIVERSE)")
+    parser.add_argument("--file", help="Read the universe from a file (one symbol per line)")
+    parser.add_argument("--top", type=int, default=20, help="Number of ranked signals to print (default: 20)")
+    parser.add_argument("--all", action="store_true", help="Include HOLD signals in the ranking")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='[%(levelname)s] %(message)s')
+    configure_process("batch")
+    universe = args.tickers + (read_universe(args.file) if args.file else [])
+    result = scan(universe or None, top=args.top, buy_only=not args.all)
+
+    print(f"{'ticker':<8} {'directive':<9} {'proba':>8} {'conf %':>7}  date")
+    for r in result["signals"]:
+        print(f"{r['ticker']:<8} {r['directive']:<9} {r['proba']:>8.4f} {r['confidence']:>7}  {r['date']}")
+    print(f"\n{result['summary']}")
+    print("Timings (ms): " + ", ".join(f"{k[:-3]}={v}" for k, v in result["timings"].items()))
+    print(f"Within {result['latency_target_ms']}ms target: {result['within_target']}")
@@ -0,0 +1,82 @@
+import time
+import logging
+from datetime import datetime
+
+from app.config.serving_config import WATCHLIST
+from app.services.data_provider import get_stock_data
+from app.core.features import generate_features
+from app.services.trainer import load_engine, get_model_version
+from app.services.predictor import generate_prediction
+from app.services.signal_store import get_signal_store, next_session_close
+
+logger = logging.getLogger(__name__)
+
+
+def run_eod_scoring(tickers: list[str] = None) -> dict:
+    """Score every ticker on the watchlist once and write the results to the signal table."""
+    tickers = tickers or WATCHLIST
+    store = get_signal_store()
+    summary = {"scored": [], "failed": {}}
+
+    start = time.perf_counter()
+    for ticker in tickers:
+        try:
+            store.upsert(generate_prediction(ticker))
+            summary["scored"].append(ticker.upper())
+        except Exception as e:
+            logger.error(f"[!] EOD scoring failed for {ticker}: {e}")
+            summary["failed"][ticker.upper()] = str(e)
+
+    summary["elapsed_s"] = round(time.perf_counter() - start, 2)
+    logger.info(f"✓ EOD scoring: {len(summary['scored'])} scored, {len(summary['failed'])} failed "
+                f"in {summary['elapsed_s']}s")
+    return summary
+
+
+def backfill_signal_log(ticker: str) -> int:
+    """
+    Score the full history with the current model and append it to the signal
+    log as source='backfill', so /predict/history has data before any live
+    signal was emitted. Returns the number of rows added.
+    """
+    engine = load_engine(ticker)
+    X, _ = generate_features(get_stock_data(ticker), ticker=ticker)
+    labels, probas = engine.predict(X)
+    version = get_model_version(ticker)
+    rows = [
+        {"ticker": ticker, "date": str(date.date()), "signal": int(label),
+         "confidence_raw": float(p if label else 1.0 - p), "model_version": version}
+        for date, label, p in zip(X.index, labels, probas)
+    ]
+    added = get_signal_store().append_log(rows, source="backfill")
+    logger.info(f"✓ Backfilled {added} signals for {ticker.upper()} ({version})")
+    return added
+
+
+def schedule_eod_scoring(tickers: list[str] = None):
+    """Run the scoring job once now, then after every session close."""
+    while True:
+        print(f"[{datetime.now().isoformat()}] Scoring watchlist: {', '.join(tickers or WATCHLIST)}")
+        run_eod_scoring(tickers)
+        wake_at = next_session_close()
+        print(f"Sleeping until {wake_at.isoformat()}...")
+        time.sleep(max(0.0, wake_at.timestamp() - time.time()))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute end-of-day signals for the watchlist.")
+    parser.add_argument("tickers", nargs="*", help="Tickers to score (default: WATCHLIST)")
+    parser.add_argument("--once", action="store_true", help="Score once and exit instead of scheduling")
+    parser.add_argument("--backfill", action="store_true", help="Log the scored history of each ticker and exit")
+    args = parser.parse_args()
+
+    tickers = [t.upper() for t in args.tickers] or None
+    if args.backfill:
+        for ticker in tickers or WATCHLIST:
+            print(f"{ticker}: {backfill_signal_log(ticker)} rows added")
+    elif args.once:
+        run_eod_scoring(tickers)
+    else:
+        schedule_eod_scoring(tickers)
@@ -0,0 +1,250 @@
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app.config.serving_config import SIGNAL_DB_PATH, MARKET_TIMEZONE, MARKET_CLOSE, EOD_GRACE_MINUTES
+from app.services.summary_aggregator import get_summary_aggregator
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS eod_signals (
+    ticker        TEXT NOT NULL,
+    bar_date      TEXT NOT NULL,
+    signal        INTEGER NOT NULL,
+    confidence    REAL NOT NULL,
+    model_version TEXT,
+    computed_at   REAL NOT NULL,
+    payload       TEXT NOT NULL,
+    seq           INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (ticker, bar_date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS signal_log (
+    id            INTEGER PRIMARY KEY,
+    ticker        TEXT NOT NULL,
+    bar_date      TEXT NOT NULL,
+    signal        INTEGER NOT NULL,
+    confidence    REAL NOT NULL,
+    model_version TEXT NOT NULL DEFAULT '',
+    computed_at   REAL NOT NULL,
+    source        TEXT NOT NULL DEFAULT 'live',
+    UNIQUE (ticker, bar_date, model_version, signal, confidence)
+);
+CREATE INDEX IF NOT EXISTS signal_log_range ON signal_log (ticker, bar_date, id);
+CREATE TRIGGER IF NOT EXISTS signal_log_no_update BEFORE UPDATE ON signal_log
+BEGIN SELECT RAISE(ABORT, 'signal_log is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS signal_log_no_delete BEFORE DELETE ON signal_log
+BEGIN SELECT RAISE(ABORT, 'signal_log is append-only'); END;
+"""
+
+_LOG_INSERT = (
+    "INSERT OR IGNORE INTO signal_log "
+    "(ticker, bar_date, signal, confidence, model_version, computed_at, source) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Commit order of eod_signals writes: assigned under the write lock, so a larger
+# seq was always committed later (computed_at is taken before the lock and is not)
+_NEXT_SEQ = "(SELECT COALESCE(MAX(seq), 0) + 1 FROM eod_signals)"
+
+
+def last_session_close(now: datetime = None) -> datetime:
+    """
+    Most recent weekday close (plus grace period for the bar to settle) at or before `now`.
+
+    Exchange holidays are not modelled: on a holiday the previous close stays
+    current, which only means one extra live computation per ticker.
+    """
+    tz = ZoneInfo(MARKET_TIMEZONE)
+    now = (now or datetime.now(tz)).astimezone(tz)
+    hour, minute = (int(p) for p in MARKET_CLOSE.split(":"))
+
+    close = now.replace(hour=hour, minute=minute, second=0, microsecond=0) + timedelta(minutes=EOD_GRACE_MINUTES)
+    while close > now or close.weekday() >= 5:
+        close -= timedelta(days=1)
+    return close
+
+
+def is_completed_bar(bar_date: str, now: datetime = None) -> bool:
+    """
+    Whether the daily bar dated `bar_date` (YYYY-MM-DD) had closed by the last
+    session close. Scoring during market hours sees a partial bar for today.
+    """
+    return str(bar_date) <= last_session_close(now).date().isoformat()
+
+
+def next_session_close(now: datetime = None) -> datetime:
+    """First weekday close (plus grace) strictly after `now`."""
+    close = last_session_close(now)
+    while True:
+        close += timedelta(days=1)
+        if close.weekday() < 5:
+            return close
+
+
+class SignalStore:
+    """
+    Local SQLite table of the latest end-of-day signal per (ticker, bar).
+
+    Rows hold the full prediction payload, so serving a hit is one primary-key
+    lookup. A row is fresh when it was computed after the last session close
+    with the model version currently on disk.
+
+    Every upsert is also appended to `signal_log`, which keeps each distinct
+    signal emitted per (ticker, bar, model version) and is never rewritten, so
+    history survives retraining. Repeats of an identical signal are not logged.
+    """
+
+    def __init__(self, path: str = SIGNAL_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {c[1] for c in self._conn.execute("PRAGMA table_info(eod_signals)")}
+        if "seq" not in columns:
+            self._conn.execute("ALTER TABLE eod_signals ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("DROP INDEX IF EXISTS eod_signals_computed_at")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS eod_signals_seq ON eod_signals (seq)")
+
+    def upsert(self, payload: dict, computed_at: float = None):
+        computed_at = computed_at or time.time()
+        row = (
+            payload["ticker"],
+            payload["date"],
+            int(payload["signal"]),
+            float(payload["confidence_raw"]),
+            payload.get("model_version"),
+            computed_at,
+            json.dumps(payload),
+        )
+        with self._lock, self._conn:
+            # IMMEDIATE: take the write lock before reading MAX(seq)
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO eod_signals "
+                "(ticker, bar_date, signal, confidence, model_version, computed_at, payload, seq) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, {_NEXT_SEQ})",
+                row,
+            )
+            self._conn.execute(_LOG_INSERT, (*row[:4], row[4] or "", computed_at, "live"))
+        get_summary_aggregator().update(payload, computed_at)
+
+    def append_log(self, rows: list[dict], source: str = "backfill") -> int:
+        """Append signals to the log only (e.g. scored history); returns the number of new rows."""
+        now = time.time()
+        params = [
+            (r["ticker"].upper(), r["date"], int(r["signal"]), float(r["confidence_raw"]),
+             r.get("model_version") or "", r.get("computed_at", now), source)
+            for r in rows
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            before = self._conn.total_changes
+            self._conn.executemany(_LOG_INSERT, params)
+            return self._conn.total_changes - before
+
+    def history(self, ticker: str, start: str = None, end: str = None, limit: int = 10,
+                cursor: str = None, model_version: str = None) -> tuple[list[dict], str]:
+        """
+        Logged signals for `ticker` with start <= bar_date <= end, newest first.
+
+        Keyset-paginated over the (ticker, bar_date, id) index: pass the returned
+        cursor to get the next page; it is None on the last page.
+        """
+        where, params = ["ticker = ?"], [ticker.upper()]
+        if start:
+            where.append("bar_date >= ?"); params.append(start)
+        if end:
+            where.append("bar_date <= ?"); params.append(end)
+        if model_version:
+            where.append("model_version = ?"); params.append(model_version)
+        if cursor:
+            bar_date, _, row_id = cursor.rpartition(":")
+            where.append("(bar_date < ? OR (bar_date = ? AND id < ?))")
+            params += [bar_date, bar_date, int(row_id)]
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, bar_date, signal, confidence, model_version, computed_at, source "
+                f"FROM signal_log WHERE {' AND '.join(where)} "
+                "ORDER BY bar_date DESC, id DESC LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+
+        next_cursor = f"{rows[limit - 1][1]}:{rows[limit - 1][0]}" if len(rows) > limit else None
+        return [
+            {
+                "timestamp": bar_date,
+                "signal": signal,
+                "confidence": round(confidence, 6),
+                "trust_index": f"{round(confidence * 100, 2)}%",
+                "model_version": version or None,
+                "computed_at": computed_at,
+                "source": source,
+            }
+            for _, bar_date, signal, confidence, version, computed_at, source in rows[:limit]
+        ], next_cursor
+
+    def data_version(self) -> int:
+        """SQLite data_version: changes whenever another connection commits to the file."""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def changed_since(self, seq: int) -> list[tuple]:
+        """(payload, computed_at, seq) for rows committed after write `seq`, in commit order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload, computed_at, seq FROM eod_signals WHERE seq > ? ORDER BY seq",
+                (seq,),
+            ).fetchall()
+        return [(json.loads(p), c, n) for p, c, n in rows]
+
+    def latest(self, ticker: str):
+        """Return (payload, computed_at, model_version) for the newest bar of `ticker`, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, computed_at, model_version FROM eod_signals "
+                "WHERE ticker = ? ORDER BY bar_date DESC LIMIT 1",
+                (ticker.upper(),),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def get_fresh(self, ticker: str, model_version: str = None, now: datetime = None):
+        """
+        Latest payload if it scored a completed bar and was computed since the
+        last close (and with `model_version`), else None.
+        """
+        hit = self.latest(ticker)
+        if hit is None:
+            return None
+        payload, computed_at, version = hit
+        close = last_session_close(now)
+        # A row computed after the close can still hold a partial bar scored during the next session
+        if computed_at < close.timestamp() or str(payload["date"]) > close.date().isoformat():
+            return None
+        if model_version is not None and version != model_version:
+            return None
+        return payload
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_signal_store() -> SignalStore:
+    """Shared store, opened on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SignalStore()
+    return _store
@@ -0,0 +1,40 @@
+import json
+
+from fastapi.responses import StreamingResponse
+
+from app.shared.utils import safe_serialize
+from app.services.batch_executor import iter_batch
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _encode(obj: dict, fmt: str, event: str) -> str:
+    data = json.dumps(safe_serialize(obj))
+    if fmt == "sse":
+        return f"event: {event}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def _batch_events(tickers: list[str], fn, fmt: str, **limits):
+    counts = {}
+    async for ticker, entry in iter_batch(tickers, fn, **limits):
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        yield _encode({"ticker": ticker, **entry}, fmt, event="result")
+    yield _encode({"summary": counts}, fmt, event="summary")
+
+
+def stream_batch(tickers: list[str], fn, fmt: str, **limits) -> StreamingResponse:
+    """
+    Stream one record per ticker as soon as it completes, then a summary record.
+
+    `fmt` is "ndjson" (one JSON object per line) or "sse" (server-sent events
+    named "result" and "summary"). Nothing is accumulated server-side.
+    """
+    return StreamingResponse(
+        _batch_events(tickers, fn, fmt, **limits),
+        media_type=STREAM_FORMATS[fmt],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
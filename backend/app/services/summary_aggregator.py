@@ -0,0 +1,124 @@
+import time
+import logging
+import threading
+from collections import Counter
+
+from app.config.serving_config import WATCHLIST
+
+logger = logging.getLogger(__name__)
+
+REGIMES = ("high", "low", "unknown")
+
+
+class _TickerState:
+    __slots__ = ("signal", "regime", "bar_date", "computed_at")
+
+    def __init__(self, signal, regime, bar_date, computed_at):
+        self.signal = signal
+        self.regime = regime
+        self.bar_date = bar_date
+        self.computed_at = computed_at
+
+
+class SummaryAggregator:
+    """
+    Running dashboard aggregate over the watchlist.
+
+    Each signal written for a watchlist ticker replaces that ticker's previous
+    contribution to the counters (active signals, volatility regimes, tickers
+    per bar date), so updates are O(1) and snapshot() never scans tickers.
+    Signals written by other processes (the EOD job) are folded in by sync(),
+    which only reads rows committed after the last one it has seen (by the
+    store's commit sequence), and only when the SQLite file changed.
+    """
+
+    def __init__(self, tickers: list[str] = None):
+        self.tickers = tuple(t.upper() for t in (tickers if tickers is not None else WATCHLIST))
+        self._tracked = set(self.tickers)
+        self._lock = threading.Lock()
+        self._state: dict[str, _TickerState] = {}
+        self._active = 0
+        self._regimes = Counter()
+        self._bars = Counter()
+        self._latest_bar = None
+        self._last_update = None
+        # Commit sequence watermark and SQLite data_version of the last sync
+        self._synced_seq = -1  # rows from before the sequence existed have seq 0
+        self._data_version = None
+
+    # ─── Updates ──────────────────────────────────────────────────────────────
+    def update(self, payload: dict, computed_at: float = None):
+        """Fold one signal payload into the aggregate (ignored for tickers off the watchlist)."""
+        ticker = str(payload.get("ticker", "")).upper()
+        if ticker not in self._tracked:
+            return
+        computed_at = computed_at or time.time()
+        new = _TickerState(int(payload["signal"]), payload.get("volatility_regime") or "unknown",
+                           str(payload["date"]), computed_at)
+
+        with self._lock:
+            old = self._state.get(ticker)
+            # Replays and backfills of older bars must not move a ticker backwards
+            if old is not None and (new.bar_date, new.computed_at) < (old.bar_date, old.computed_at):
+                return
+            if old is not None:
+                self._active -= old.signal
+                self._regimes[old.regime] -= 1
+                self._bars[old.bar_date] -= 1
+                if not self._bars[old.bar_date]:
+                    del self._bars[old.bar_date]
+            self._state[ticker] = new
+            self._active += new.signal
+            self._regimes[new.regime] += 1
+            self._bars[new.bar_date] += 1
+            if self._latest_bar is None or new.bar_date > self._latest_bar:
+                self._latest_bar = new.bar_date
+            if self._last_update is None or computed_at > self._last_update:
+                self._last_update = computed_at
+
+    def sync(self, store):
+        """Apply rows written to `store` by other connections since the last sync."""
+        version = store.data_version()
+        if version == self._data_version:
+            return
+        rows = store.changed_since(self._synced_seq)
+        for payload, computed_at, seq in rows:
+            self.update(payload, computed_at)
+            self._synced_seq = max(self._synced_seq, seq)
+        self._data_version = version
+        if rows:
+            logger.info(f"✓ Summary synced {len(rows)} signal rows")
+
+    # ─── Reads ────────────────────────────────────────────────────────────────
+    def snapshot(self, now: float = None) -> dict:
+        """Current aggregate; cost does not depend on the number of tracked tickers."""
+        now = now or time.time()
+        with self._lock:
+            reported = len(self._state)
+            up_to_date = self._bars.get(self._latest_bar, 0)
+            regimes = {r: self._regimes.get(r, 0) for r in REGIMES}
+            active, latest_bar, last_update = self._active, self._latest_bar, self._last_update
+
+        age = None if last_update is None else round(now - last_update, 1)
+        return {
+            "assets": list(self.tickers),
+            "active_signals": active,
+            "volatility_clusters": regimes["high"] > 0,
+            "volatility_regimes": regimes,
+            "freshness": {
+                "latest_bar": latest_bar,
+                "up_to_date": up_to_date,
+                "behind": reported - up_to_date,
+                "no_signal": len(self.tickers) - reported,
+                "last_update_at": last_update,
+                "age_s": age,
+            },
+            "last_update": "never" if age is None else f"{age}s ago",
+        }
+
+
+_aggregator = SummaryAggregator()
+
+
+def get_summary_aggregator() -> SummaryAggregator:
+    return _aggregator
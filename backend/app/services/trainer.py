@@ -2,14 +2,18 @@ import os
 import json
 import joblib
 import logging
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from xgboost import XGBClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, accuracy_score, precision_score, recall_score, f1_score
 from app.services.data_provider import get_stock_data
 from app.core.features import generate_features
-from app.core.evaluate import evaluate_model
+from app.services.model_cache import model_cache
+from app.core.inference.tree_engine import compile_model, UnsupportedModelError
+from app.core.inference.native_artifact import save_native, load_native, schema_path
+from app.core.inference.feature_schema import FeatureSchema
+from app.core.version import MODEL_VERSION
+from app.core.thread_budget import model_params, set_model_threads
+from app.config.serving_config import MODEL_SAVE_NATIVE, MODEL_SAVE_PICKLE
 
 
 # Setup logger
@@ -24,16 +28,95 @@ os.makedirs(MODEL_DIR, exist_ok=True)
 # Shared Utilities
 # ───────────────────────────────────────────────────────────────
 
+class ModelNotFoundError(FileNotFoundError):
+    """No trained artifact exists for the ticker; training is queued, never run inline."""
+
+    def __init__(self, ticker: str, path: str):
+        super().__init__(f"No trained model for '{ticker.upper()}' at {path}")
+        self.ticker = ticker.upper()
+        self.path = path
+
+
 def get_model_path(ticker: str, artifact_name: str = "model") -> str:
     """Construct standardized path to a saved model file."""
     return os.path.join(MODEL_DIR, f"{ticker}_{artifact_name}.pkl")
 
 
-def save_model(model, ticker: str, artifact_name: str = "model") -> str:
-    """Save the trained model to disk."""
+def get_native_path(ticker: str, artifact_name: str = "model") -> str:
+    """Schema sidecar of the native artifact (booster file sits next to it)."""
+    return schema_path(os.path.join(MODEL_DIR, f"{ticker}_{artifact_name}"))
+
+
+def get_artifact_path(ticker: str, artifact_name: str = "model") -> str:
+    """The artifact serving loads: the native sidecar when present, else the legacy pickle."""
+    native_path = get_native_path(ticker, artifact_name)
+    return native_path if os.path.exists(native_path) else get_model_path(ticker, artifact_name)
+
+
+def get_model_version(ticker: str, artifact_name: str = "model") -> str:
+    """Version tag of the artifact currently on disk, derived from its modification time."""
+    mtime = os.path.getmtime(get_artifact_path(ticker, artifact_name))
+    return f"{MODEL_VERSION}@{datetime.utcfromtimestamp(mtime).strftime('%Y%m%dT%H%M%S')}"
+
+
+def get_meta_path(ticker: str, artifact_name: str = "model") -> str:
+    return get_model_path(ticker, artifact_name).replace(".pkl", ".meta.json")
+
+
+def read_metadata(ticker: str, artifact_name: str = "model") -> dict:
+    """Training metadata written next to the model; empty when there is none."""
+    try:
+        with open(get_meta_path(ticker, artifact_name)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_metadata(meta: dict, ticker: str, artifact_name: str = "model") -> str:
+    meta_path = get_meta_path(ticker, artifact_name)
+    tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+    return meta_path
+
+
+def _load_artifact(path: str):
+    model = load_native(path) if path.endswith(".schema.json") else joblib.load(path)
+    # Pickles carry the n_jobs they were trained with; serving calls get the inference budget
+    return set_model_threads(model, "inference")
+
+
+def save_model(model, ticker: str, artifact_name: str = "model", threshold: float = 0.5) -> str:
+    """
+    Save the trained model to disk.
+
+    Writes the native booster + schema sidecar (fast, pickle-free loading for
+    serving) and, unless disabled, the joblib pickle. Each file is written to a
+    temp file and moved into place with os.replace, so concurrent readers see
+    either the old or the new model, never a partial file. Returns the path
+    serving will load.
+    """
     model_path = get_model_path(ticker, artifact_name)
-    joblib.dump(model, model_path)
-    return model_path
+    native_path = None
+
+    if MODEL_SAVE_NATIVE:
+        try:
+            native_path = save_native(model, os.path.join(MODEL_DIR, f"{ticker}_{artifact_name}"),
+                                      threshold=threshold, metadata={"model_version": MODEL_VERSION},
+                                      feature_schema=FeatureSchema.from_model(model, ticker))
+        except UnsupportedModelError as e:
+            logger.warning(f"[!] No native artifact for {ticker}: {e}")
+
+    if MODEL_SAVE_PICKLE or native_path is None:
+        tmp_path = f"{model_path}.{os.getpid()}.tmp"
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, model_path)
+        if native_path is None:
+            model_cache.put(model_path, model)
+            return model_path
+
+    return native_path
 
 
 # ───────────────────────────────────────────────────────────────
@@ -50,6 +133,12 @@ def train_model(
     save_metadata: bool = True,
     return_metrics: bool = False
 ):
+    # Training-only dependencies stay out of the serving import path
+    from xgboost import XGBClassifier
+    from sklearn.model_selection import train_test_split
+    from app.core.evaluate import evaluate_model
+    from app.core.fitting import fit_model, boosted_rounds
+
     logger.info(f"▶ Starting training for {ticker}")
 
     df = get_stock_data(ticker)
@@ -72,10 +161,11 @@ def train_model(
         max_depth=max_depth,
         learning_rate=learning_rate,
         eval_metric="logloss",
-        use_label_encoder=False
+        use_label_encoder=False,
+        **model_params("training"),
     )
-    model.fit(X_train, y_train)
-    logger.info("✓ Model training complete")
+    model = fit_model(model, X_train, y_train)
+    logger.info(f"✓ Model training complete ({boosted_rounds(model)}/{n_estimators} rounds after early stopping)")
 
     metrics = evaluate_model(model, X_test, y_test, ticker)
 
@@ -85,20 +175,23 @@ def train_model(
 
     # Save metadata
     if save_metadata:
+        from app.services.incremental import full_training_state
         meta = {
             "ticker": ticker,
+            "source": "train_model",
             "timestamp": datetime.utcnow().isoformat(),
             "n_estimators": n_estimators,
+            "best_iteration": boosted_rounds(model) - 1,
+            "n_trees": boosted_rounds(model),
             "max_depth": max_depth,
             "learning_rate": learning_rate,
             "test_size": test_size,
             "train_samples": len(X_train),
             "test_samples": len(X_test),
-            "metrics": metrics
+            "metrics": metrics,
+            **full_training_state(X, metrics["f1_score"]),
         }
-        meta_path = model_path.replace(".pkl", ".meta.json")
-        with open(meta_path, "w") as f:
-            json.dump(meta, f, indent=2)
+        meta_path = write_metadata(meta, ticker, artifact_name)
         logger.info(f"✓ Metadata saved to {meta_path}")
 
     return (model, metrics) if return_metrics else model
@@ -110,26 +203,59 @@ def retrain_model(ticker: str, n_trials: int = 100):
 
 
 def load_model(ticker: str, artifact_name: str = "model"):
-    """Load model from disk or fallback to training."""
-    path = get_model_path(ticker, artifact_name)
-    if not os.path.exists(path):
-        logger.warning(f"No existing model found for {ticker}, training a new one...")
-        return train_model(ticker)
-    logger.info(f"✓ Loaded model from {path}")
-    return joblib.load(path)
+    """
+    Load model through the process-wide cache.
+
+    Returns a NativeModel when a native artifact exists and the unpickled
+    sklearn wrapper for legacy artifacts. Raises ModelNotFoundError when
+    neither exists; callers queue a training job (see app.services.job_queue)
+    instead of training inside the request.
+    """
+    path = get_artifact_path(ticker, artifact_name)
+    try:
+        return model_cache.get(path, loader=_load_artifact)
+    except FileNotFoundError:
+        raise ModelNotFoundError(ticker, path) from None
+
+
+def _compile_artifact(path: str, ticker: str):
+    model = model_cache.get(path, loader=_load_artifact)
+    engine = compile_model(model)
+    # Native artifacts carry their saved schema; legacy pickles get one derived from the model
+    if getattr(model, "feature_schema", None) is None and engine.feature_names is not None:
+        engine.feature_schema = FeatureSchema.from_model(model, ticker)
+    return engine
+
+
+def load_engine(ticker: str, artifact_name: str = "model"):
+    """
+    Load the model compiled into a fast array-based inference engine (cached alongside the model).
+
+    The engine aligns DataFrame inputs through the model's FeatureSchema, so
+    callers pass generate_features output as-is and get a FeatureSchemaError
+    (not a silent misalignment) when the columns drift from what was trained.
+    """
+    path = get_artifact_path(ticker, artifact_name)
+    try:
+        return model_cache.get(path, loader=lambda p: _compile_artifact(p, ticker), namespace="engine")
+    except FileNotFoundError:
+        raise ModelNotFoundError(ticker, path) from None
 
 
 def evaluate_multiple_models(tickers: list[str]):
     """Evaluate multiple pre-trained models for comparison."""
+    from sklearn.model_selection import train_test_split
+    from app.core.evaluate import evaluate_model
+
     results = {}
 
     for ticker in tickers:
-        path = get_model_path(ticker)
-        if not os.path.exists(path):
+        try:
+            model = load_model(ticker)
+        except ModelNotFoundError:
             logger.warning(f"⨯ No model for {ticker}, skipping")
             continue
 
-        model = joblib.load(path)
         df = get_stock_data(ticker)
         if df is None or df.empty:
             logger.warning(f"⨯ No data for {ticker}, skipping")
@@ -141,61 +267,46 @@ def evaluate_multiple_models(tickers: list[str]):
 
     return results
 
-def compare_models(tickers: list) -> dict:
-    results = {}
+def compare_model(ticker: str) -> dict:
+    """Score one ticker's model over its full history; errors are returned, not raised."""
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 
-    for ticker in tickers:
-        try:
-            # Get historical data
-            df = get_stock_data(ticker)
-            if df is None or df.empty:
-                results[ticker] = {"error": "No data found"}
-                continue
-
-            # Generate features
-            X, y = generate_features(df)
-            if X.empty or y.empty:
-                results[ticker] = {"error": "Feature generation failed"}
-                continue
+    try:
+        # Get historical data
+        df = get_stock_data(ticker)
+        if df is None or df.empty:
+            return {"error": "No data found"}
 
-            model = load_model(ticker)
-            booster = model.get_booster()
-            trained_features = booster.feature_names
-
-            # Realign features
-            rename_map = {}
-            suffix = f" {ticker}"
-            for fname in trained_features:
-                if fname.endswith(suffix):
-                    base = fname[:-len(suffix)]
-                else:
-                    base = fname.strip()
-                rename_map[base] = fname
-            X = X.rename(columns=rename_map)[trained_features]
-
-            # Make predictions
-            y_pred = model.predict(X)
-            y_proba = model.predict_proba(X).max(axis=1)
-
-            # Metrics
-            accuracy = accuracy_score(y, y_pred)
-            precision = precision_score(y, y_pred, zero_division=0)
-            recall = recall_score(y, y_pred, zero_division=0)
-            f1 = f1_score(y, y_pred, zero_division=0)
-
-            results[ticker] = {
-                "accuracy": round(accuracy, 4),
-                "precision": round(precision, 4),
-                "recall": round(recall, 4),
-                "f1_score": round(f1, 4),
-                "average_confidence": round(float(y_proba.mean()), 4),
-                "sample_size": len(y)
-            }
-
-        except Exception as e:
-            results[ticker] = {"error": str(e)}
+        # Generate features
+        X, y = generate_features(df)
+        if X.empty or y.empty:
+            return {"error": "Feature generation failed"}
+
+        # The engine's feature schema aligns columns by cached position
+        y_pred, proba = load_engine(ticker).predict(X)
+        y_proba = np.maximum(proba, 1.0 - proba)
+
+        # Metrics
+        accuracy = accuracy_score(y, y_pred)
+        precision = precision_score(y, y_pred, zero_division=0)
+        recall = recall_score(y, y_pred, zero_division=0)
+        f1 = f1_score(y, y_pred, zero_division=0)
+
+        return {
+            "accuracy": round(accuracy, 4),
+            "precision": round(precision, 4),
+            "recall": round(recall, 4),
+            "f1_score": round(f1, 4),
+            "average_confidence": round(float(y_proba.mean()), 4),
+            "sample_size": len(y)
+        }
 
-    return results
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def compare_models(tickers: list) -> dict:
+    return {ticker: compare_model(ticker) for ticker in tickers}
 
 
 # ───────────────────────────────────────────────────────────────
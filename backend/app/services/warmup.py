@@ -0,0 +1,72 @@
+import time
+import logging
+import threading
+
+import numpy as np
+
+from app.config.serving_config import PRELOAD_TICKERS
+from app.services.trainer import load_engine, ModelNotFoundError
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_state = {
+    "ready": False,
+    "started_at": None,
+    "finished_at": None,
+    "elapsed_ms": None,
+    "loaded": [],
+    "missing": [],
+    "failed": {},
+}
+
+
+def _update(**changes):
+    with _lock:
+        _state.update(changes)
+
+
+def readiness() -> dict:
+    """Snapshot of the warm-start state reported by /ready."""
+    with _lock:
+        return {**_state, "loaded": list(_state["loaded"]), "missing": list(_state["missing"]),
+                "failed": dict(_state["failed"])}
+
+
+def mark_ready():
+    """Declare the process ready without preloading (PRELOAD_MODELS off)."""
+    _update(ready=True, finished_at=time.time(), elapsed_ms=0.0)
+
+
+def warm_start(tickers: list[str] = None) -> dict:
+    """
+    Load and compile the serving model for each ticker into the model cache,
+    then score one dummy row so the first real request skips every cold path
+    (library import, artifact parse, engine compile, NumPy dispatch).
+
+    Tickers without a trained model are reported as missing, not failures:
+    the process is still ready and /predict queues their training on demand.
+    """
+    tickers = tickers if tickers is not None else PRELOAD_TICKERS
+    start = time.perf_counter()
+    _update(ready=False, started_at=time.time(), loaded=[], missing=[], failed={})
+
+    loaded, missing, failed = [], [], {}
+    for ticker in tickers:
+        try:
+            engine = load_engine(ticker)
+            n_features = getattr(engine, "n_features", None) or len(engine.feature_names)
+            engine.predict(engine.prepare(np.zeros((1, n_features))))
+            loaded.append(ticker)
+        except ModelNotFoundError:
+            missing.append(ticker)
+        except Exception as e:
+            logger.error(f"[!] Warm start failed for {ticker}: {e}")
+            failed[ticker] = str(e)
+
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+    _update(ready=True, finished_at=time.time(), elapsed_ms=elapsed_ms,
+            loaded=loaded, missing=missing, failed=failed)
+    logger.info(f"✓ Warm start: {len(loaded)} model(s) loaded, {len(missing)} missing, "
+                f"{len(failed)} failed in {elapsed_ms}ms")
+    return readiness()
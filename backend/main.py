@@ -1,3 +1,10 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+# Cap OpenMP/BLAS pools before numpy and the tree libraries initialise them
+from app.core.thread_budget import configure_process
+configure_process("inference")
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -6,14 +13,51 @@ from app.api.routes.train_routes import router as train_router
 from app.api.routes.history_routes import router as history_router
 from app.api.routes.analysis_routes import router as analysis_router
 from app.api.routes.latest_price_routes import router as price_router
-from routes.summary import router as summary_router  # optional placeholder
+from app.api.routes.status_routes import router as status_router
+from app.api.routes.scan_routes import router as scan_router
+from app.api.routes.summary_routes import router as summary_router
+from app.services.job_queue import start_workers, stop_workers
+from app.services.warmup import warm_start, mark_ready
+from app.services.admission import AdmissionMiddleware
+from app.services.executors import run_cpu, run_io
+from app.services.signal_store import get_signal_store
+from app.services.summary_aggregator import get_summary_aggregator
+from app.config.serving_config import TRAINING_WORKERS, PRELOAD_MODELS
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Training runs in worker processes fed by the persisted job queue
+    if TRAINING_WORKERS > 0:
+        start_workers(TRAINING_WORKERS)
+
+    # Preload watchlist models in the background; /ready reports when done
+    warmup = asyncio.create_task(run_cpu(warm_start)) if PRELOAD_MODELS else None
+    if warmup is None:
+        mark_ready()
+    # Seed the dashboard aggregate from the signal table; later updates are incremental
+    seed = asyncio.create_task(run_io(get_summary_aggregator().sync, get_signal_store()))
+
+    yield
+
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    if not seed.done():
+        seed.cancel()
+    stop_workers()
+
 
 app = FastAPI(
     title="LATTICE API",
     description="Lattice AI — predictive analytics for stock signal generation",
     version="0.9.2",
+    lifespan=lifespan,
 )
 
+# Expensive routes run under per-class concurrency limits and shed load with 429/503.
+# Added before CORS so rejections still carry the CORS headers.
+app.add_middleware(AdmissionMiddleware)
+
 # ────────────────────────────────
 # CORS Setup (adjust for prod)
 # ────────────────────────────────
@@ -34,5 +78,7 @@ app.include_router(history_router, tags=["History"])
 app.include_router(analysis_router, tags=["Analysis"])
 app.include_router(summary_router, tags=["Summary"])
 app.include_router(price_router, tags=["Price"])
+app.include_router(status_router, tags=["Status"])
+app.include_router(scan_router, tags=["Scan"])
 
 
@@ -3,8 +3,9 @@
 import numpy as np
 import pandas as pd
 from xgboost import XGBClassifier
-from app.data import get_stock_data
-from app.model import generate_features
+from app.services.data_provider import get_stock_data
+from app.core.features import generate_features
+from app.core.fitting import fit_model
 
 def walk_forward_backtest(
     ticker: str,
@@ -67,8 +68,8 @@ def walk_forward_backtest(
             "eval_metric": "logloss",
             "use_label_encoder": False,
         }
-        model = XGBClassifier(**params)
-        model.fit(X_train.values, y_train.values)
+        # Early stopping holds out the tail of the training window, never the test days
+        model = fit_model(XGBClassifier(**params), X_train.values, y_train.values)
 
         # 5) Predict & simulate
         preds = model.predict(X_test.values).astype(int)
@@ -0,0 +1,112 @@
+# backend/scripts/benchmark_artifacts.py
+"""
+Compare loading a model from its joblib pickle vs. the native artifact
+(booster file + schema sidecar).
+
+Each format is measured in a fresh interpreter so RSS numbers are not
+polluted by the other format. Libraries are imported before the baseline
+RSS is taken, so the delta is the cost of the model itself.
+
+    python -m scripts.benchmark_artifacts AAPL [--repeat 20]
+
+Pickle-only models are converted to the native format first.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rss_bytes() -> int:
+    """Current resident set size (Linux /proc, falling back to peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _child(fmt: str, path: str, repeat: int):
+    import joblib
+    import xgboost  # noqa: F401
+    import lightgbm  # noqa: F401
+    from app.core.inference.native_artifact import load_native
+
+    load = joblib.load if fmt == "pickle" else load_native
+    baseline = _rss_bytes()
+
+    start = time.perf_counter()
+    models = [load(path)]
+    cold_ms = (time.perf_counter() - start) * 1000
+    rss_one = _rss_bytes() - baseline
+
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load(path)
+        warm.append((time.perf_counter() - start) * 1000)
+
+    print(json.dumps({
+        "format": fmt,
+        "path": path,
+        "cold_ms": round(cold_ms, 2),
+        "median_ms": round(statistics.median(warm), 2) if warm else None,
+        "p95_ms": round(sorted(warm)[int(0.95 * (len(warm) - 1))], 2) if warm else None,
+        "rss_delta_mb": round(rss_one / 2**20, 2),
+        "file_bytes": os.path.getsize(path),
+        "loaded": type(models[0]).__name__,
+    }))
+
+
+def run(ticker: str, repeat: int = 20) -> list[dict]:
+    from app.services.trainer import get_model_path, get_native_path
+    from app.core.inference.native_artifact import convert_pickle
+
+    pkl_path = get_model_path(ticker)
+    native_path = get_native_path(ticker)
+    if not os.path.exists(pkl_path):
+        raise SystemExit(f"No pickle for {ticker} at {pkl_path}")
+    if not os.path.exists(native_path):
+        native_path = convert_pickle(pkl_path)
+
+    results = []
+    for fmt, path in (("pickle", pkl_path), ("native", native_path)):
+        out = subprocess.run(
+            [sys.executable, "-m", "scripts.benchmark_artifacts", "--child", fmt, path, "--repeat", str(repeat)],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    # Native file size includes the booster file, not just the sidecar
+    with open(native_path) as f:
+        model_file = os.path.join(os.path.dirname(native_path), json.load(f)["model_file"])
+    results[1]["file_bytes"] += os.path.getsize(model_file)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pickle vs native model artifact loading.")
+    parser.add_argument("ticker", nargs="?", help="Ticker whose saved model to benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="Warm loads per format (default: 20)")
+    parser.add_argument("--child", nargs=2, metavar=("FORMAT", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child[0], args.child[1], args.repeat)
+        sys.exit(0)
+    if not args.ticker:
+        parser.error("ticker is required")
+
+    rows = run(args.ticker.upper(), args.repeat)
+    print(f"{'format':<8} {'cold ms':>9} {'median ms':>10} {'p95 ms':>8} {'RSS MB':>8} {'bytes':>10}")
+    for r in rows:
+        print(f"{r['format']:<8} {r['cold_ms']:>9} {r['median_ms']:>10} {r['p95_ms']:>8} "
+              f"{r['rss_delta_mb']:>8} {r['file_bytes']:>10}")
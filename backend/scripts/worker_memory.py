@@ -0,0 +1,48 @@
+# backend/scripts/worker_memory.py
+"""
+Memory of a gunicorn master and its workers, from /proc smaps_rollup (Linux).
+
+    python -m scripts.worker_memory <master pid>
+
+PSS counts shared pages pro rata, so the PSS total is the real footprint of
+the server; a worker's private bytes are what one more worker would cost.
+"""
+
+import os
+import sys
+
+from app.services.prefork import process_memory
+
+
+def children(pid: int) -> list[int]:
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Field 4 (parent pid) follows the parenthesised command name
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            pids.append(int(entry))
+    return sorted(pids)
+
+
+def report(master: int) -> list[dict]:
+    rows = [{"process": "master", "pid": master, **process_memory(master)}]
+    rows += [{"process": "worker", "pid": pid, **process_memory(pid)} for pid in children(master)]
+    return rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        raise SystemExit(__doc__)
+    rows = report(int(sys.argv[1]))
+    mb = 2 ** 20
+    print(f"{'process':<8} {'pid':>7} {'RSS MB':>8} {'PSS MB':>8} {'shared MB':>10} {'private MB':>11}")
+    for r in rows:
+        print(f"{r['process']:<8} {r['pid']:>7} {r['rss'] / mb:>8.1f} {r['pss'] / mb:>8.1f} "
+              f"{r['shared'] / mb:>10.1f} {r['private'] / mb:>11.1f}")
+    print(f"\nTotal PSS: {sum(r['pss'] for r in rows) / mb:.1f} MB over {len(rows)} processes")
@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+from app.services.admission import CostClass, Rejected, classify
+
+
+def test_routes_map_to_cost_classes():
+    assert classify("POST", "/compare").name == "heavy"
+    assert classify("POST", "/predict/batch").name == "batch"
+    assert classify("POST", "/train/AAPL").name == "training"
+    assert classify("GET", "/predict/AAPL") is None
+    assert classify("POST", "/trainer") is None
+
+
+def test_queue_then_shed():
+    async def scenario():
+        cls = CostClass("test", concurrency=1, queue=1, wait_s=0.2)
+        await cls.acquire()                                # runs
+        queued = asyncio.ensure_future(cls.acquire())      # waits
+        await asyncio.sleep(0)
+
+        with pytest.raises(Rejected) as full:              # queue full: immediate 429
+            await cls.acquire()
+        assert full.value.status_code == 429 and full.value.retry_after >= 1
+
+        cls.release(0.05)                                  # slot handed to the waiter
+        await queued
+        assert cls.stats()["in_flight"] == 1
+
+        with pytest.raises(Rejected) as timeout:           # waits past wait_s: 503
+            await cls.acquire()
+        assert timeout.value.status_code == 503
+
+        cls.release(0.05)
+        stats = cls.stats()
+        assert (stats["in_flight"], stats["waiting"]) == (0, 0)
+        assert (stats["admitted"], stats["rejected_429"], stats["rejected_503"]) == (2, 1, 1)
+
+    asyncio.run(scenario())
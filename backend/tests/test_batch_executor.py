@@ -0,0 +1,48 @@
+import asyncio
+from app.services.batch_executor import run_batch
+
+
+async def fake_predict(ticker: str):
+    if ticker == "SLOW":
+        await asyncio.sleep(5)
+    if ticker == "BAD":
+        raise ValueError("No data for 'BAD'")
+    await asyncio.sleep(0.01)
+    return {"ticker": ticker, "signal": 1}
+
+
+def test_partial_results_with_per_ticker_status():
+    response = asyncio.run(run_batch(
+        ["aapl", "SLOW", "BAD", "msft"], fake_predict,
+        max_concurrency=4, item_timeout=0.2, total_timeout=1.0,
+    ))
+
+    results = response["results"]
+    assert list(results) == ["AAPL", "SLOW", "BAD", "MSFT"]
+    assert results["AAPL"]["status"] == "ok"
+    assert results["AAPL"]["result"]["signal"] == 1
+    assert results["SLOW"]["status"] == "timeout"
+    assert results["BAD"]["status"] == "error"
+    assert "BAD" in results["BAD"]["error"]
+    assert response["summary"]["ok"] == 2
+    assert response["summary"]["elapsed_ms"] < 1000
+
+
+def test_budget_exhaustion_skips_queued_tickers():
+    response = asyncio.run(run_batch(
+        ["SLOW", "AAPL"], fake_predict,
+        max_concurrency=1, item_timeout=10, total_timeout=0.2,
+    ))
+
+    assert response["results"]["SLOW"]["status"] == "timeout"
+    assert response["results"]["AAPL"]["status"] == "skipped"
+
+
+def test_runs_tickers_concurrently():
+    async def sleepy(ticker):
+        await asyncio.sleep(0.1)
+        return ticker
+
+    response = asyncio.run(run_batch([f"T{i}" for i in range(10)], sleepy, max_concurrency=10))
+    assert response["summary"]["ok"] == 10
+    assert response["summary"]["elapsed_ms"] < 500
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from xgboost import XGBClassifier
+from lightgbm import LGBMClassifier
+from sklearn.metrics import f1_score
+from app.core.compaction import compact_model, keep_trees
+from app.core.inference.tree_engine import compile_model
+
+
+def make_dataset(n=800, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 6)), columns=[f"F{i}" for i in range(6)])
+    y = ((X["F0"] + 0.5 * X["F1"] + rng.normal(scale=0.5, size=n)) > 0).astype(int)
+    return X.iloc[:600], X.iloc[600:], y.iloc[:600], y.iloc[600:]
+
+
+@pytest.mark.parametrize("model", [
+    XGBClassifier(n_estimators=150, max_depth=6),
+    LGBMClassifier(n_estimators=150, verbose=-1),
+])
+def test_keep_trees_matches_engine_subset(model):
+    X_train, X_val, y_train, _ = make_dataset()
+    model.fit(X_train, y_train)
+    keep = [0, 3, 7, 20]
+
+    engine = compile_model(model, strict=True)
+    contrib = engine.value[engine._leaves(engine.prepare(X_val))][:, keep]
+    expected = 1.0 / (1.0 + np.exp(-engine.sigmoid_scale * (contrib.sum(axis=1) + engine.base_margin)))
+
+    compact = keep_trees(model, keep)
+
+    np.testing.assert_allclose(compact.predict_proba(X_val)[:, 1], expected, atol=1e-6)
+
+
+@pytest.mark.parametrize("model", [
+    XGBClassifier(n_estimators=150, max_depth=6),
+    LGBMClassifier(n_estimators=150, verbose=-1),
+])
+def test_compaction_stays_within_tolerance(model):
+    X_train, X_val, y_train, y_val = make_dataset()
+    model.fit(X_train, y_train)
+    full_f1 = f1_score(y_val, model.predict(X_val))
+
+    compact, report = compact_model(model, X_val, y_val, tolerance=0.01)
+
+    assert report["stages"][0]["stage"] == "original"
+    assert compile_model(compact, strict=True).n_trees <= 150
+    assert f1_score(y_val, compact.predict(X_val)) >= full_f1 - 0.01 - 1e-9
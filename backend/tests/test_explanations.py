@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from xgboost import XGBClassifier
+from lightgbm import LGBMClassifier
+from app.core.inference.tree_engine import compile_model
+from app.services.explainer_service import explain_prediction, explanation_cache
+
+
+def make_dataset(n=400, n_features=6, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features))
+    X[rng.random(X.shape) < 0.02] = np.nan
+    y = (np.nan_to_num(X[:, 0]) + np.nan_to_num(X[:, 1]) > 0.2).astype(int)
+    index = pd.date_range("2024-01-01", periods=n, freq="D")
+    return pd.DataFrame(X, columns=[f"F{i}" for i in range(n_features)], index=index), y
+
+
+@pytest.mark.parametrize("model", [
+    XGBClassifier(n_estimators=60, max_depth=4, early_stopping_rounds=5),
+    LGBMClassifier(n_estimators=60, verbose=-1),
+])
+def test_contributions_explain_the_engine_score(model):
+    X, y = make_dataset()
+    if isinstance(model, XGBClassifier):
+        model.fit(X[:300], y[:300], eval_set=[(X[300:], y[300:])], verbose=False)
+    else:
+        model.fit(X, y)
+    engine = compile_model(model, strict=True)
+
+    labels, proba, contributions = engine.explain(X)
+    assert contributions.shape == (len(X), X.shape[1] + 1)
+    np.testing.assert_allclose(proba, model.predict_proba(X)[:, 1], atol=1e-5)
+    np.testing.assert_array_equal(labels, engine.predict(X)[0])
+
+
+def test_explain_prediction_is_cached_per_bar():
+    X, y = make_dataset()
+    engine = compile_model(XGBClassifier(n_estimators=20, max_depth=3).fit(X, y), strict=True)
+    explanation_cache.clear()
+
+    drivers, scored = explain_prediction("TEST", engine, X, version="v1", k=3)
+    assert len(drivers) == 3
+    contributions = engine.predict_contributions(X.iloc[[-1]])[0, :-1]
+    assert drivers[0]["feature"] == X.columns[np.argmax(np.abs(contributions))]
+    # The miss scored the row in the same pass
+    labels, proba = engine.predict(X.iloc[[-1]])
+    assert scored[0] == labels[0] and scored[1] == pytest.approx(proba[0], abs=1e-6)
+
+    hits = explanation_cache.hits
+    assert explain_prediction("TEST", engine, X, version="v1", k=3) == (drivers, None)
+    assert explanation_cache.hits == hits + 1
+    # A new bar is a new key
+    explain_prediction("TEST", engine, X.iloc[:-1], version="v1", k=3)
+    assert explanation_cache.hits == hits + 1
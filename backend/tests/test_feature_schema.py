@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+from xgboost import XGBClassifier
+from app.core.inference.feature_schema import FeatureSchema, FeatureSchemaError
+from app.core.inference.tree_engine import compile_model
+
+
+def test_plan_resolves_legacy_names_and_is_cached():
+    schema = FeatureSchema(["Open AAPL", "RETURN ", "RSI"], ticker="AAPL")
+    columns = ["RSI", "Open_AAPL", "Close_AAPL", "RETURN"]
+
+    plan = schema.plan(columns)
+
+    assert plan.tolist() == [1, 3, 0]
+    assert schema.plan(list(columns)) is plan
+
+
+def test_schema_drift_fails_fast():
+    schema = FeatureSchema(["Open_AAPL", "RSI", "MACD"], ticker="AAPL")
+    X = pd.DataFrame(np.zeros((2, 2)), columns=["Open_AAPL", "RSI"])
+
+    with pytest.raises(FeatureSchemaError) as exc:
+        schema.select(X)
+    assert exc.value.missing == ["MACD"]
+
+
+def test_engine_aligns_by_schema():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(300, 3)), columns=["Open AAPL", "RETURN ", "RSI"])
+    model = XGBClassifier(n_estimators=10, max_depth=3).fit(X, (X["RSI"] > 0).astype(int))
+    engine = compile_model(model, strict=True)
+    engine.feature_schema = FeatureSchema.from_model(model, "AAPL")
+
+    current = X.rename(columns={"Open AAPL": "Open_AAPL", "RETURN ": "RETURN"})[["RSI", "RETURN", "Open_AAPL"]]
+    _, proba = engine.predict(current)
+
+    np.testing.assert_allclose(proba, model.predict_proba(X)[:, 1], atol=1e-6)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from xgboost import XGBClassifier
+from lightgbm import LGBMClassifier
+
+from app.core.fitting import fit_model, holdout_tail, boosted_rounds
+
+
+def make_data(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 6)), columns=[f"F{i}" for i in range(6)])
+    y = pd.Series((X["F0"] + rng.normal(scale=1.0, size=n) > 0).astype(int))
+    return X, y
+
+
+def test_holdout_is_the_chronological_tail():
+    X, y = make_data(200)
+    X_fit, y_fit, (X_es, y_es) = holdout_tail(X, y, fraction=0.15, min_rows=10)
+    assert len(X_es) == 30 and X_es.index[0] == X_fit.index[-1] + 1
+    assert holdout_tail(X.to_numpy(), y.to_numpy(), fraction=0.15, min_rows=50)[2] is None
+
+
+@pytest.mark.parametrize("model", [
+    XGBClassifier(n_estimators=500, learning_rate=0.3, max_depth=6, verbosity=0),
+    LGBMClassifier(n_estimators=500, learning_rate=0.3, verbosity=-1),
+])
+def test_early_stopping_trims_to_the_best_iteration(model):
+    X, y = make_data()
+    X_train, y_train, eval_set = X.iloc[:500], y.iloc[:500], (X.iloc[500:], y.iloc[500:])
+
+    fitted = fit_model(model, X_train, y_train, eval_set=eval_set, early_stopping_rounds=10)
+
+    rounds = boosted_rounds(fitted)
+    assert rounds < 500
+    if isinstance(fitted, XGBClassifier):
+        assert fitted.get_params()["tree_method"] == "hist"
+        assert fitted.best_iteration == rounds - 1
+        full = model.predict_proba(eval_set[0], iteration_range=(0, rounds))
+    else:
+        assert fitted.best_iteration_ == rounds
+        full = model.predict_proba(eval_set[0], num_iteration=rounds)
+    # Trimming drops only trees the early-stopped model never used
+    np.testing.assert_allclose(fitted.predict_proba(eval_set[0]), full, rtol=1e-6)
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import joblib
+from xgboost import XGBClassifier
+
+from app.services import incremental, trainer
+from app.core.fitting import fit_model, boosted_rounds
+
+
+def make_frame(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 4)), columns=["A", "B", "C", "D"],
+                     index=pd.date_range("2023-01-02", periods=n, freq="B"))
+    y = pd.Series((X["A"] + rng.normal(scale=0.5, size=n) > 0).astype(int), index=X.index)
+    return X, y
+
+
+def setup_model(tmp_path, monkeypatch, n_new=30, baseline_f1=0.5):
+    """A model trained on all but the last `n_new` labelled bars, with its refresh state."""
+    monkeypatch.setattr(trainer, "MODEL_DIR", str(tmp_path))
+    X, y = make_frame()
+    monkeypatch.setattr(incremental, "get_stock_data", lambda ticker: None)
+    monkeypatch.setattr(incremental, "generate_features", lambda df, ticker=None: (X, y))
+
+    seen = X.iloc[:len(X) - incremental.LABEL_HORIZON - n_new]
+    model = fit_model(XGBClassifier(n_estimators=50, max_depth=3, verbosity=0), seen, y.loc[seen.index])
+    trainer.save_model(model, "AAA")
+    trainer.write_metadata({"n_trees": boosted_rounds(model),
+                            **incremental.full_training_state(seen, baseline_f1)}, "AAA")
+    return X, model
+
+
+def test_new_bars_continue_boosting_the_existing_model(tmp_path, monkeypatch):
+    X, model = setup_model(tmp_path, monkeypatch)
+    full = []
+
+    result = incremental.refresh_model("AAA", full_retrain=lambda *a: full.append(a))
+
+    # The last LABEL_HORIZON bars of the training frame count as unlabelled, so they are revisited
+    new_rows = 30 + incremental.LABEL_HORIZON
+    assert result["mode"] == "incremental" and result["rows"] == new_rows and not full
+    updated = joblib.load(trainer.get_model_path("AAA"))
+    assert boosted_rounds(updated) == boosted_rounds(model) + incremental.INCREMENTAL_ROUNDS
+    meta = trainer.read_metadata("AAA")
+    assert meta["trained_through"] == str(incremental.labelled_through(X))
+    assert meta["incremental_updates"] == 1 and sum(meta["unseen"].values()) == new_rows
+
+    # Nothing new since the update
+    assert incremental.refresh_model("AAA", full_retrain=lambda *a: full.append(a))["mode"] == "skipped"
+
+
+def test_degraded_validation_or_schedule_triggers_a_full_retrain(tmp_path, monkeypatch):
+    setup_model(tmp_path, monkeypatch, n_new=60, baseline_f1=1.0)
+    full = []
+
+    result = incremental.refresh_model("AAA", full_retrain=lambda *a: full.append(a))
+    assert result["mode"] == "full" and "unseen bars" in result["reason"]
+    assert full == [("AAA", "model")]
+
+    setup_model(tmp_path, monkeypatch)
+    later = datetime.utcnow() + timedelta(days=incremental.FULL_RETRAIN_DAYS)
+    result = incremental.refresh_model("AAA", full_retrain=lambda *a: full.append(a), now=later)
+    assert result["mode"] == "full" and "days ago" in result["reason"]
+
+
+def test_full_retrain_keeps_the_way_the_model_was_trained(tmp_path, monkeypatch):
+    from app.services import job_queue
+    setup_model(tmp_path, monkeypatch)
+    later = datetime.utcnow() + timedelta(days=incremental.FULL_RETRAIN_DAYS)
+    queued, trained = [], []
+    monkeypatch.setattr(job_queue, "enqueue", lambda kind, ticker, params: (queued.append((kind, ticker, params))
+                                                                            or ({"id": "job1"}, True)))
+    monkeypatch.setattr(trainer, "train_model", lambda ticker, artifact_name="model": trained.append(ticker))
+
+    # Tuned model: queue the same Optuna search as /retrain, never the untuned train_model
+    trainer.write_metadata({**trainer.read_metadata("AAA"), "source": "optuna"}, "AAA")
+    result = incremental.refresh_model("AAA", now=later)
+    assert result["retrained_with"] == "optimize" and result["job_id"] == "job1"
+    assert queued == [("optimize", "AAA", {"n_trials": incremental.FULL_RETRAIN_TRIALS})] and not trained
+
+    trainer.write_metadata({**trainer.read_metadata("AAA"), "source": "train_model"}, "AAA")
+    assert incremental.refresh_model("AAA", now=later)["retrained_with"] == "train_model"
+    assert trained == ["AAA"]
@@ -0,0 +1,59 @@
+import threading
+import numpy as np
+from app.services.inference_scheduler import InferenceScheduler
+
+
+class SumEngine:
+    """Stand-in engine: label is 1 when the row sum is positive."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def prepare(self, X):
+        return np.atleast_2d(np.asarray(X, dtype=float))
+
+    def predict(self, X):
+        self.calls += 1
+        total = X.sum(axis=1)
+        return (total > 0).astype(int), total
+
+
+def test_concurrent_requests_share_one_predict_call():
+    engine = SumEngine()
+    scheduler = InferenceScheduler(window_ms=200, max_batch=8)
+    rows = [np.array([[i - 3.0, 1.0]]) for i in range(8)]
+    results = [None] * len(rows)
+    start = threading.Barrier(len(rows))
+
+    def worker(i):
+        start.wait()
+        results[i] = scheduler.predict(engine, rows[i], timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(rows))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for row, (labels, total) in zip(rows, results):
+        assert total[0] == row.sum()
+        assert labels[0] == int(row.sum() > 0)
+    assert engine.calls < len(rows)
+
+
+def test_groups_by_engine():
+    a, b = SumEngine(), SumEngine()
+    scheduler = InferenceScheduler(window_ms=50, max_batch=4)
+    fa = scheduler.submit(a, [[1.0, 1.0]])
+    fb = scheduler.submit(b, [[-1.0, -1.0]])
+
+    assert fa.result(timeout=5)[1][0] == 2.0
+    assert fb.result(timeout=5)[1][0] == -2.0
+    assert a.calls == 1 and b.calls == 1
+
+
+def test_disabled_scheduler_predicts_inline():
+    engine = SumEngine()
+    scheduler = InferenceScheduler(enabled=False)
+    labels, _ = scheduler.predict(engine, [[2.0, -1.0]])
+    assert labels[0] == 1
@@ -0,0 +1,38 @@
+from app.services import job_queue
+
+
+def test_identical_active_jobs_are_deduplicated(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    first, created = job_queue.enqueue("optimize", "aapl", {"n_trials": 50}, path=db)
+    again, created_again = job_queue.enqueue("optimize", "AAPL", {"n_trials": 50}, path=db)
+    other, created_other = job_queue.enqueue("optimize", "AAPL", {"n_trials": 100}, path=db)
+
+    assert created and not created_again and created_other
+    assert again["id"] == first["id"]
+    assert other["id"] != first["id"]
+
+
+def test_finished_job_does_not_block_new_one(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    job, _ = job_queue.enqueue("train", "MSFT", path=db)
+    claimed = job_queue.claim_next(worker_pid=1234, path=db)
+    assert claimed["id"] == job["id"] and claimed["status"] == "running"
+
+    job_queue._finish(job["id"], "succeeded", result={"ok": True}, path=db)
+    done = job_queue.get_job(job["id"], path=db)
+    assert done["status"] == "succeeded" and done["progress"] == 1 and done["result"] == {"ok": True}
+
+    _, created = job_queue.enqueue("train", "MSFT", path=db)
+    assert created
+
+
+def test_claim_is_fifo_and_orphans_are_requeued(tmp_path):
+    db = str(tmp_path / "jobs.db")
+    a, _ = job_queue.enqueue("train", "AAPL", path=db)
+    b, _ = job_queue.enqueue("train", "TSLA", path=db)
+
+    assert job_queue.claim_next(worker_pid=2**22 + 7, path=db)["id"] == a["id"]
+    assert job_queue.requeue_orphans(path=db) == 1
+    assert job_queue.claim_next(worker_pid=1, path=db)["id"] == a["id"]
+    assert job_queue.claim_next(worker_pid=1, path=db)["id"] == b["id"]
+    assert job_queue.claim_next(worker_pid=1, path=db) is None
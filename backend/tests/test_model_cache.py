@@ -0,0 +1,51 @@
+import os
+import joblib
+from app.services.model_cache import ModelCache
+
+
+def _write(path, value, mtime=None):
+    joblib.dump(value, path)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def test_cache_hits_after_first_load(tmp_path):
+    path = tmp_path / "AAPL_model.pkl"
+    _write(path, {"v": 1})
+    cache = ModelCache(max_entries=4, max_bytes=10**9)
+
+    assert cache.get(str(path)) == {"v": 1}
+    assert cache.get(str(path)) == {"v": 1}
+
+    stats = cache.stats()
+    assert stats["loads"] == 1
+    assert stats["hits"] == 1
+
+
+def test_cache_reloads_when_artifact_changes(tmp_path):
+    path = tmp_path / "AAPL_model.pkl"
+    _write(path, {"v": 1}, mtime=1_000_000_000)
+    cache = ModelCache(max_entries=4, max_bytes=10**9)
+    cache.get(str(path))
+
+    _write(path, {"v": 2}, mtime=2_000_000_000)
+    assert cache.get(str(path)) == {"v": 2}
+    assert cache.stats()["reloads"] == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ModelCache(max_entries=2, max_bytes=10**9)
+    paths = []
+    for name in ("A", "B", "C"):
+        path = tmp_path / f"{name}_model.pkl"
+        _write(path, name)
+        paths.append(str(path))
+
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+
+    cached = {os.path.basename(c["path"]) for c in cache.stats()["cached"]}
+    assert cached == {"A_model.pkl", "C_model.pkl"}
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,48 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from xgboost import XGBClassifier
+from lightgbm import LGBMClassifier
+from app.core.inference.native_artifact import save_native, load_native, ArtifactError
+from app.core.inference.tree_engine import compile_model
+
+
+def make_dataset(n=400, n_features=6, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0.2).astype(int)
+    return pd.DataFrame(X, columns=[f"F{i}" for i in range(n_features)]), y
+
+
+@pytest.mark.parametrize("model", [
+    XGBClassifier(n_estimators=40, max_depth=4),
+    LGBMClassifier(n_estimators=40, verbose=-1),
+])
+def test_native_roundtrip_matches_model(tmp_path, model):
+    X, y = make_dataset()
+    model.fit(X, y)
+
+    sidecar = save_native(model, str(tmp_path / "T_model"), threshold=0.4)
+    native = load_native(sidecar)
+
+    assert native.feature_names == list(X.columns)
+    np.testing.assert_allclose(native.predict_proba(X), model.predict_proba(X), atol=1e-6)
+    np.testing.assert_array_equal(native.predict(X), (model.predict_proba(X)[:, 1] > 0.4).astype(int))
+
+    # The compiled engine carries the stored threshold
+    labels, proba = compile_model(native, strict=True).predict(X[X.columns[::-1]])
+    np.testing.assert_allclose(proba, model.predict_proba(X)[:, 1], atol=1e-6)
+    np.testing.assert_array_equal(labels, native.predict(X))
+
+
+def test_native_rejects_mismatched_model_file(tmp_path):
+    X, y = make_dataset()
+    sidecar = save_native(XGBClassifier(n_estimators=5).fit(X, y), str(tmp_path / "T_model"))
+
+    schema = json.loads(open(sidecar).read())
+    with open(tmp_path / schema["model_file"], "ab") as f:
+        f.write(b"\0")
+
+    with pytest.raises(ArtifactError):
+        load_native(sidecar)
@@ -0,0 +1,24 @@
+import gc
+from app.services.prefork import artifact_fingerprint, preload_master
+
+
+def test_fingerprint_tracks_serving_artifacts_only(tmp_path):
+    (tmp_path / "AAA_model.schema.json").write_text("{}")
+    (tmp_path / "AAA_preds.csv").write_text("x")
+    before = artifact_fingerprint(str(tmp_path))
+    assert [name for name, *_ in before] == ["AAA_model.schema.json"]
+
+    (tmp_path / "AAA_preds.csv").write_text("changed")
+    assert artifact_fingerprint(str(tmp_path)) == before
+
+    (tmp_path / "AAA_model.ubj").write_bytes(b"\0")
+    assert artifact_fingerprint(str(tmp_path)) != before
+
+
+def test_preload_freezes_heap():
+    try:
+        state = preload_master([])
+        assert state["ready"]
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
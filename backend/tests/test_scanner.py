@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from xgboost import XGBClassifier
+import app.core.features as features
+import app.services.scanner as scanner
+from app.core.features import generate_features, generate_panel_features, PANEL_FIELDS
+from app.core.inference.tree_engine import compile_model
+from app.core.inference.feature_schema import FeatureSchema
+
+
+def make_bars(tickers, n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2024-01-01", periods=n)
+    close = pd.DataFrame(100 + rng.normal(0, 1, (n, len(tickers))).cumsum(axis=0), index=idx, columns=tickers)
+    volume = pd.DataFrame(rng.integers(1e5, 1e6, (n, len(tickers))).astype(float), index=idx, columns=tickers)
+    return {"Open": close + 0.5, "High": close + 1, "Low": close - 1, "Close": close, "Volume": volume}
+
+
+def single_frame(bars, ticker):
+    cols = pd.MultiIndex.from_product([PANEL_FIELDS, [ticker]])
+    return pd.DataFrame(np.column_stack([bars[f][ticker] for f in PANEL_FIELDS]), index=bars["Close"].index,
+                        columns=cols).dropna()
+
+
+def patch_sentiment(monkeypatch, days):
+    monkeypatch.setattr(features, "get_social_sentiment_series",
+                        lambda *a, **k: pd.Series(np.linspace(-1, 1, len(days)), index=days))
+    monkeypatch.setattr(features, "get_news_sentiment_series",
+                        lambda *a, **k: pd.Series(0.3, index=days[::5]))
+
+
+def test_panel_features_match_single_ticker(monkeypatch):
+    bars = make_bars(["AAA", "BBB"])
+    patch_sentiment(monkeypatch, bars["Close"].index)
+    for f in PANEL_FIELDS:
+        bars[f].iloc[:120, 1] = np.nan  # BBB listed later
+
+    panel = generate_panel_features(bars, sentiment=features.latest_sentiment)
+
+    for ticker in ("AAA", "BBB"):
+        X, _ = generate_features(single_frame(bars, ticker), ticker=ticker)
+        assert panel.at[ticker, "date"] == X.index[-1]
+        schema = FeatureSchema(list(X.columns), ticker)
+        row = schema.select(panel.loc[[ticker]].drop(columns="date"))[0]
+        np.testing.assert_allclose(row, X.iloc[-1].to_numpy(), rtol=1e-9)
+
+
+def test_scan_ranks_buy_signals(monkeypatch):
+    bars = make_bars(["AAA", "BBB", "CCC"])
+    patch_sentiment(monkeypatch, bars["Close"].index)
+    X, y = generate_features(single_frame(bars, "AAA"), ticker="AAA")
+    engine = compile_model(XGBClassifier(n_estimators=10).fit(X, y))
+    engine.feature_schema = FeatureSchema(list(X.columns), "AAA")
+
+    def fake_load_engine(ticker):
+        if ticker == "CCC":
+            raise scanner.ModelNotFoundError(ticker, "/nowhere")
+        return engine
+
+    monkeypatch.setattr(scanner, "load_engine", fake_load_engine)
+    monkeypatch.setattr(scanner, "get_model_version", lambda t: "test")
+
+    result = scanner.scan(["AAA", "BBB", "CCC"], buy_only=False, bars=bars)
+
+    assert result["summary"]["scored"] == 2
+    assert result["skipped"] == {"CCC": "no trained model"}
+    probas = [s["proba"] for s in result["signals"]]
+    assert probas == sorted(probas, reverse=True)
+    assert set(result["timings"]) >= {"models_ms", "download_ms", "features_ms", "scoring_ms", "total_ms"}
+    assert all(len(s["drivers"]) > 0 for s in result["signals"])
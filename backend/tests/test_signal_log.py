@@ -0,0 +1,37 @@
+import sqlite3
+import pytest
+from app.services.signal_store import SignalStore
+
+
+def payload(date, signal=1, confidence=0.7, version="v1"):
+    return {"ticker": "AAA", "date": date, "signal": signal, "confidence_raw": confidence, "model_version": version}
+
+
+def test_log_keeps_every_version_and_ignores_repeats(tmp_path):
+    store = SignalStore(str(tmp_path / "signals.db"))
+    store.upsert(payload("2024-01-02"))
+    store.upsert(payload("2024-01-02"))               # identical repeat
+    store.upsert(payload("2024-01-02", 0, 0.55, "v2"))  # retrained model
+
+    history, cursor = store.history("aaa")
+    assert cursor is None
+    assert [(h["signal"], h["model_version"]) for h in history] == [(0, "v2"), (1, "v1")]
+    assert store.latest("AAA")[0]["model_version"] == "v2"
+
+    with pytest.raises(sqlite3.DatabaseError):
+        store._conn.execute("UPDATE signal_log SET signal = 1")
+
+
+def test_history_range_and_pagination(tmp_path):
+    store = SignalStore(str(tmp_path / "signals.db"))
+    dates = [f"2024-01-{d:02d}" for d in range(1, 11)]
+    assert store.append_log([payload(d) for d in dates]) == 10
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = store.history("AAA", start="2024-01-03", end="2024-01-09", limit=3, cursor=cursor)
+        pages.append([h["timestamp"] for h in page])
+        if cursor is None:
+            break
+    assert pages == [dates[8:5:-1], dates[5:2:-1], [dates[2]]]
+    assert all(h["source"] == "backfill" for h in store.history("AAA", limit=20)[0])
@@ -0,0 +1,65 @@
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from app.services.signal_store import SignalStore, last_session_close, is_completed_bar
+
+ET = ZoneInfo("America/New_York")
+
+
+def make_payload(ticker="AAPL", date="2025-04-17", signal=1):
+    return {
+        "ticker": ticker,
+        "date": date,
+        "model_version": "optuna_v1@20250421T000000",
+        "directive": "BUY" if signal else "HOLD",
+        "signal": signal,
+        "confidence_raw": 0.71,
+        "trust_index": "71.0%",
+        "explanation": "Technical outlook: Bullish bias.",
+    }
+
+
+def test_last_session_close_skips_weekend():
+    saturday = datetime(2025, 4, 19, 12, 0, tzinfo=ET)
+    close = last_session_close(saturday)
+    assert close.weekday() == 4
+    assert close.date().isoformat() == "2025-04-18"
+
+
+def test_last_session_close_before_todays_close():
+    tuesday_morning = datetime(2025, 4, 22, 10, 0, tzinfo=ET)
+    assert last_session_close(tuesday_morning).date().isoformat() == "2025-04-21"
+
+
+def test_fresh_lookup_serves_latest_bar(tmp_path):
+    store = SignalStore(str(tmp_path / "signals.db"))
+    store.upsert(make_payload(date="2025-04-16", signal=0))
+    store.upsert(make_payload(date="2025-04-17", signal=1))
+
+    payload = store.get_fresh("aapl", model_version="optuna_v1@20250421T000000")
+    assert payload["date"] == "2025-04-17"
+    assert payload["signal"] == 1
+
+
+def test_stale_or_retrained_rows_miss(tmp_path):
+    store = SignalStore(str(tmp_path / "signals.db"))
+    store.upsert(make_payload(), computed_at=time.time() - 10 * 86400)
+    assert store.get_fresh("AAPL") is None
+
+    store.upsert(make_payload())
+    assert store.get_fresh("AAPL", model_version="optuna_v1@20250501T000000") is None
+
+
+def test_partial_intraday_bar_is_never_fresh(tmp_path):
+    tuesday_noon = datetime(2025, 4, 22, 12, 0, tzinfo=ET)
+    assert is_completed_bar("2025-04-21", tuesday_noon)
+    assert not is_completed_bar("2025-04-22", tuesday_noon)
+
+    store = SignalStore(str(tmp_path / "signals.db"))
+    # Scored at noon on Tuesday's partial bar, i.e. after Monday's close
+    store.upsert(make_payload(date="2025-04-22"), computed_at=tuesday_noon.timestamp())
+    assert store.get_fresh("AAPL", now=tuesday_noon) is None
+
+    store.upsert(make_payload(date="2025-04-21"), computed_at=tuesday_noon.timestamp())
+    store._conn.execute("DELETE FROM eod_signals WHERE bar_date = '2025-04-22'")
+    assert store.get_fresh("AAPL", now=tuesday_noon)["date"] == "2025-04-21"
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import optuna
+from sklearn.model_selection import TimeSeriesSplit
+from app.core import study_dataset, optimizer
+from app.core.study_dataset import StudyDataset
+
+
+def make_frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 5)), columns=[f"F{i}" for i in range(5)],
+                     index=pd.date_range("2022-01-01", periods=n, freq="D"))
+    y = pd.Series((X["F0"] + rng.normal(scale=0.5, size=n) > 0).astype(int), index=X.index)
+    return X, y
+
+
+def test_folds_are_views_matching_timeseries_split():
+    X, y = make_frame()
+    dataset = StudyDataset(X, y, n_splits=4)
+
+    assert dataset.X.flags["C_CONTIGUOUS"]
+    for fold, (train_idx, val_idx) in zip(dataset.folds, TimeSeriesSplit(n_splits=4).split(X)):
+        np.testing.assert_array_equal(fold.train_idx, train_idx)
+        np.testing.assert_array_equal(fold.X_val, X.to_numpy()[val_idx])
+        assert np.shares_memory(fold.X_train, dataset.X)
+
+
+def test_trials_reuse_the_study_dataset(monkeypatch):
+    X, y = make_frame()
+    calls = []
+
+    def fake_data(ticker):
+        calls.append(ticker)
+        return "bars"
+
+    monkeypatch.setattr(study_dataset, "get_stock_data", fake_data)
+    monkeypatch.setattr(study_dataset, "generate_features", lambda df, ticker=None: (X, y))
+
+    dataset = StudyDataset.load("AAA")
+    study = optuna.create_study(direction="maximize")
+    study.optimize(lambda t: optimizer.objective(t, "AAA", dataset), n_trials=3)
+
+    assert calls == ["AAA"]
+    assert 0.0 <= study.best_value <= 1.0
+
+
+def test_trials_report_each_fold_and_stop_when_pruned():
+    X, y = make_frame()
+    dataset = StudyDataset(X, y, n_splits=4)
+
+    study = optuna.create_study(direction="maximize")
+    study.optimize(lambda t: optimizer.objective(t, "AAA", dataset), n_trials=1)
+    assert sorted(study.trials[0].intermediate_values) == [0, 1, 2, 3]
+
+    # F1 can never reach 1.1, so every trial is pruned after its first fold
+    study = optuna.create_study(direction="maximize", pruner=optuna.pruners.ThresholdPruner(lower=1.1))
+    study.optimize(lambda t: optimizer.objective(t, "AAA", dataset), n_trials=2)
+    assert all(t.state == optuna.trial.TrialState.PRUNED for t in study.trials)
+    assert all(list(t.intermediate_values) == [0] for t in study.trials)
+
+
+def test_trees_grow_with_the_training_window():
+    X, y = make_frame()
+    folds = StudyDataset(X, y, n_splits=4).folds
+
+    trees = [optimizer.fold_trees(400, fold, folds[-1]) for fold in folds]
+    assert trees == sorted(trees) and trees[-1] == 400
+    assert trees[0] == round(400 * len(folds[0].y_train) / len(folds[-1].y_train))
+
+
+def test_quantized_fold_data_is_built_once_and_reused():
+    X, y = make_frame()
+    dataset = StudyDataset(X, y, n_splits=4)
+    study = optuna.create_study(direction="maximize")
+    for _ in range(2):
+        study.enqueue_trial({"model": "xgb"})
+    study.optimize(lambda t: optimizer.objective(t, "AAA", dataset), n_trials=2)
+
+    matrices = [fold.cached("xgb", lambda: None) for fold in dataset.folds]
+    assert all(type(m[0]).__name__ == "QuantileDMatrix" for m in matrices)
+    study.optimize(lambda t: optimizer.objective(t, "AAA", dataset), n_trials=1)
+    assert [fold.cached("xgb", lambda: None) for fold in dataset.folds] == matrices
+    assert {"construct_ms", "boost_ms"} <= set(study.trials[0].user_attrs)
+    assert optimizer.training_time(study)["trials"] == 3
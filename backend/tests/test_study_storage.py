@@ -0,0 +1,58 @@
+import time
+from datetime import datetime
+
+import optuna
+from optuna.trial import TrialState
+
+from app.core import optimizer
+from app.core.study_storage import (
+    get_storage, open_study, finished_trials, fail_stale_trials, ticker_study_name, PUBLISHED_ATTR
+)
+
+
+class _Dataset:
+    ticker = "AAA"
+
+
+def _fake_objective(trial, ticker=None, dataset=None):
+    return trial.suggest_float("x", 0.0, 1.0)
+
+
+def test_rerun_with_same_name_resumes_the_study(tmp_path, monkeypatch):
+    monkeypatch.setattr(optimizer, "objective", _fake_objective)
+    storage = get_storage("sqlite", str(tmp_path))
+
+    study = open_study("AAA-job1", storage)
+    study.optimize(lambda t: _fake_objective(t), n_trials=2)  # interrupted after 2 of 5
+
+    resumed = open_study("AAA-job1", get_storage("sqlite", str(tmp_path)))
+    assert optimizer.optimize_study(resumed, _Dataset(), n_trials=5) == 3
+    assert finished_trials(resumed) == 5
+    assert optimizer.optimize_study(resumed, _Dataset(), n_trials=5) == 0
+    assert len(resumed.trials) == 5
+
+
+def test_journal_storage_reruns_stale_trials(tmp_path):
+    storage = get_storage("journal", str(tmp_path))
+    study = open_study("AAA-job2", storage)
+    trial = study.ask({"x": optuna.distributions.FloatDistribution(0.0, 1.0)})
+    # The worker running it died; a day later the study is resumed
+    assert fail_stale_trials(study, storage, max_age_s=3600) == 0
+    assert fail_stale_trials(study, storage, max_age_s=3600, now=time.time() + 86400) == 1
+    states = [t.state for t in study.get_trials()]
+    assert states == [TrialState.FAIL, TrialState.WAITING]
+    assert study.get_trials()[1].system_attrs["fixed_params"] == {"x": trial.params["x"]}
+
+
+def test_ticker_study_is_resumed_until_it_publishes(tmp_path):
+    storage = get_storage("sqlite", str(tmp_path))
+    name = ticker_study_name("aaa", storage, now=datetime(2024, 1, 2, 9, 30))
+    assert name == "AAA_optuna_20240102_093000"
+
+    study = open_study(name, storage)
+    # A crash before publishing: a later run (any job) resumes the same study
+    assert ticker_study_name("AAA", storage, now=datetime(2024, 1, 3)) == name
+
+    study.set_user_attr(PUBLISHED_ATTR, True)
+    assert ticker_study_name("AAA", storage, now=datetime(2024, 1, 3)) == "AAA_optuna_20240103_000000"
+    assert ticker_study_name("BBB", storage, now=datetime(2024, 1, 3)) == "BBB_optuna_20240103_000000"
@@ -0,0 +1,52 @@
+from app.services.signal_store import SignalStore
+from app.services.summary_aggregator import SummaryAggregator
+
+
+def payload(ticker, date, signal, regime="low"):
+    return {"ticker": ticker, "date": date, "signal": signal, "confidence_raw": 0.6,
+            "model_version": "v", "volatility_regime": regime}
+
+
+def test_updates_replace_each_tickers_contribution():
+    agg = SummaryAggregator(["AAA", "BBB", "CCC"])
+    agg.update(payload("AAA", "2024-01-02", 1, "high"), computed_at=10.0)
+    agg.update(payload("BBB", "2024-01-02", 1), computed_at=11.0)
+    agg.update(payload("ZZZ", "2024-01-02", 1), computed_at=12.0)  # not on the watchlist
+    agg.update(payload("AAA", "2024-01-03", 0), computed_at=13.0)
+    agg.update(payload("BBB", "2024-01-01", 0), computed_at=14.0)  # older bar: ignored
+
+    snap = agg.snapshot(now=15.0)
+    assert snap["active_signals"] == 1
+    assert snap["volatility_regimes"] == {"high": 0, "low": 2, "unknown": 0}
+    assert snap["volatility_clusters"] is False
+    assert snap["freshness"] == {"latest_bar": "2024-01-03", "up_to_date": 1, "behind": 1, "no_signal": 1,
+                                 "last_update_at": 13.0, "age_s": 2.0}
+
+
+def test_sync_picks_up_rows_from_other_connections(tmp_path):
+    path = str(tmp_path / "signals.db")
+    reader, writer = SignalStore(path), SignalStore(path)
+    agg = SummaryAggregator(["AAA", "BBB"])
+
+    agg.sync(reader)
+    assert agg.snapshot()["active_signals"] == 0
+
+    writer.upsert(payload("AAA", "2024-01-02", 1, "high"), computed_at=100.0)
+    agg.sync(reader)
+    snap = agg.snapshot()
+    assert snap["active_signals"] == 1
+    assert snap["volatility_regimes"]["high"] == 1
+
+
+def test_sync_follows_commit_order_not_computed_at(tmp_path):
+    path = str(tmp_path / "signals.db")
+    reader, writer = SignalStore(path), SignalStore(path)
+    agg = SummaryAggregator(["AAA", "BBB"])
+
+    writer.upsert(payload("AAA", "2024-01-02", 1), computed_at=200.0)
+    agg.sync(reader)
+    # Computed before AAA's row but committed after it
+    writer.upsert(payload("BBB", "2024-01-02", 1), computed_at=150.0)
+    agg.sync(reader)
+
+    assert agg.snapshot()["active_signals"] == 2
@@ -0,0 +1,24 @@
+import pytest
+from xgboost import XGBClassifier
+from lightgbm import LGBMClassifier
+from app.core import thread_budget
+from app.core.thread_budget import threads_for, model_params, set_model_threads
+
+
+def test_budgets_and_params(monkeypatch):
+    monkeypatch.setitem(thread_budget.BUDGETS, "training", 3)
+    assert threads_for("training") == 3
+    assert model_params("training") == {"n_jobs": 3}
+    with pytest.raises(ValueError):
+        threads_for("bogus")
+
+
+def test_set_model_threads_reaches_the_booster(monkeypatch):
+    monkeypatch.setitem(thread_budget.BUDGETS, "inference", 1)
+    xgb = XGBClassifier(n_estimators=2, n_jobs=8).fit([[0], [1], [0], [1]], [0, 1, 0, 1])
+    set_model_threads(xgb, "inference")
+    assert xgb.n_jobs == 1
+    assert '"nthread":"1"' in xgb.get_booster().save_config().replace(" ", "")
+
+    lgb = LGBMClassifier(n_estimators=2, n_jobs=8, verbose=-1)
+    assert set_model_threads(lgb, "inference").n_jobs == 1
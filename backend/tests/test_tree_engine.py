@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from xgboost import XGBClassifier
+from lightgbm import LGBMClassifier
+from app.core.inference.tree_engine import compile_model
+
+
+def make_dataset(n=600, n_features=8, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features))
+    X[rng.random(X.shape) < 0.05] = np.nan
+    X[rng.random(X.shape) < 0.05] = 0.0
+    y = ((np.nan_to_num(X[:, 0]) + np.nan_to_num(X[:, 1]) * np.nan_to_num(X[:, 2])) > 0.2).astype(int)
+    columns = [f"F{i}" for i in range(n_features)]
+    return pd.DataFrame(X, columns=columns), y
+
+
+@pytest.mark.parametrize("model", [
+    XGBClassifier(n_estimators=60, max_depth=6),
+    LGBMClassifier(n_estimators=60, verbose=-1),
+    LGBMClassifier(n_estimators=30, verbose=-1, zero_as_missing=True),
+    LGBMClassifier(n_estimators=30, verbose=-1, use_missing=False),
+])
+def test_engine_matches_library(model):
+    X, y = make_dataset()
+    model.fit(X, y)
+    engine = compile_model(model, strict=True)
+
+    labels, proba = engine.predict(X)
+
+    np.testing.assert_allclose(proba, model.predict_proba(X)[:, 1], atol=1e-6)
+    np.testing.assert_array_equal(labels, model.predict(X))
+
+
+def test_engine_selects_columns_by_name():
+    X, y = make_dataset()
+    model = XGBClassifier(n_estimators=20, max_depth=3).fit(X, y)
+    engine = compile_model(model, strict=True)
+
+    shuffled = X[X.columns[::-1]]
+    np.testing.assert_allclose(engine.predict(shuffled)[1], engine.predict(X)[1])
+
+
+def test_rows_at_the_decision_threshold_are_positive():
+    # Tuned thresholds are cut-offs with score >= t (precision_recall_curve)
+    X, y = make_dataset()
+    model = XGBClassifier(n_estimators=20, max_depth=3).fit(X, y)
+    engine = compile_model(model, strict=True)
+    proba = engine.predict(X)[1]
+    engine.decision_threshold = float(proba[0])
+
+    assert engine.predict(X)[0][0] == 1
+    np.testing.assert_array_equal(engine.explain(X)[0], (engine.explain(X)[1] >= proba[0]).astype(int))
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from xgboost import XGBClassifier
+from app.core.inference.tree_engine import compile_model
+from app.services import warmup
+from app.services.trainer import ModelNotFoundError
+
+
+def test_warm_start_reports_loaded_and_missing(monkeypatch):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 4)), columns=list("abcd"))
+    engine = compile_model(XGBClassifier(n_estimators=5).fit(X, (X["a"] > 0).astype(int)))
+
+    def fake_load_engine(ticker):
+        if ticker == "NOPE":
+            raise ModelNotFoundError(ticker, "/nowhere")
+        return engine
+
+    monkeypatch.setattr(warmup, "load_engine", fake_load_engine)
+
+    state = warmup.warm_start(["AAPL", "NOPE"])
+
+    assert state["ready"] is True
+    assert state["loaded"] == ["AAPL"]
+    assert state["missing"] == ["NOPE"]
+    assert state["failed"] == {}